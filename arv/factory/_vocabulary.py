@@ -0,0 +1,599 @@
+# -*- coding: utf-8 -*-
+
+"""Vocabularies for the data providers in ``arv.factory.generators``.
+
+Each vocabulary is a single string with one entry per line. They are
+imported on first use and split into tables by the generators module,
+never import this module directly.
+
+"""
+
+FIRST_NAMES = """\
+Aaron
+Abigail
+Adam
+Adrian
+Alan
+Albert
+Alexander
+Alexis
+Alice
+Amanda
+Amber
+Amy
+Andrea
+Andrew
+Angela
+Anna
+Anthony
+Arthur
+Ashley
+Austin
+Barbara
+Benjamin
+Betty
+Beverly
+Billy
+Bobby
+Brandon
+Brenda
+Brian
+Brittany
+Bruce
+Bryan
+Carl
+Carol
+Carolyn
+Catherine
+Charles
+Charlotte
+Cheryl
+Christian
+Christina
+Christine
+Christopher
+Cynthia
+Daniel
+Danielle
+David
+Deborah
+Debra
+Denise
+Dennis
+Diana
+Diane
+Donald
+Donna
+Doris
+Dorothy
+Douglas
+Dylan
+Edward
+Elizabeth
+Emily
+Emma
+Eric
+Ethan
+Eugene
+Evelyn
+Frances
+Frank
+Gabriel
+Gary
+George
+Gerald
+Gloria
+Grace
+Gregory
+Hannah
+Harold
+Heather
+Helen
+Henry
+Isabella
+Jack
+Jacob
+Jacqueline
+James
+Janet
+Janice
+Jason
+Jean
+Jeffrey
+Jennifer
+Jeremy
+Jerry
+Jesse
+Jessica
+Joan
+Joe
+John
+Jonathan
+Jordan
+Jose
+Joseph
+Joshua
+Joyce
+Juan
+Judith
+Judy
+Julia
+Julie
+Justin
+Karen
+Katherine
+Kathleen
+Kathryn
+Kayla
+Keith
+Kelly
+Kenneth
+Kevin
+Kimberly
+Kyle
+Larry
+Laura
+Lauren
+Lawrence
+Linda
+Lisa
+Logan
+Louis
+Madison
+Margaret
+Maria
+Marie
+Marilyn
+Mark
+Martha
+Mary
+Matthew
+Megan
+Melissa
+Michael
+Michelle
+Nancy
+Natalie
+Nathan
+Nicholas
+Nicole
+Noah
+Olivia
+Pamela
+Patricia
+Patrick
+Paul
+Peter
+Philip
+Rachel
+Ralph
+Randy
+Raymond
+Rebecca
+Richard
+Robert
+Roger
+Ronald
+Rose
+Roy
+Russell
+Ruth
+Ryan
+Samantha
+Samuel
+Sandra
+Sara
+Sarah
+Scott
+Sean
+Sharon
+Shirley
+Sophia
+Stephanie
+Stephen
+Steven
+Susan
+Teresa
+Terry
+Theresa
+Thomas
+Timothy
+Tyler
+Victoria
+Vincent
+Virginia
+Walter
+Wayne
+William
+Zachary"""
+
+
+LAST_NAMES = """\
+Adams
+Allen
+Alvarez
+Anderson
+Bailey
+Baker
+Barnes
+Bell
+Bennett
+Brooks
+Brown
+Bryant
+Butler
+Campbell
+Carter
+Castillo
+Chavez
+Clark
+Coleman
+Collins
+Cook
+Cooper
+Cox
+Cruz
+Davis
+Diaz
+Edwards
+Evans
+Fisher
+Flores
+Foster
+Garcia
+Gomez
+Gonzales
+Gonzalez
+Gray
+Green
+Griffin
+Gutierrez
+Hall
+Harris
+Hayes
+Henderson
+Hernandez
+Hill
+Howard
+Hughes
+Jackson
+James
+Jenkins
+Johnson
+Jones
+Kelly
+Kim
+King
+Lee
+Lewis
+Long
+Lopez
+Martin
+Martinez
+Miller
+Mitchell
+Moore
+Morales
+Morgan
+Morris
+Murphy
+Myers
+Nelson
+Nguyen
+Ortiz
+Parker
+Patel
+Perez
+Perry
+Peterson
+Phillips
+Powell
+Price
+Ramirez
+Reed
+Reyes
+Richardson
+Rivera
+Roberts
+Robinson
+Rodriguez
+Rogers
+Ross
+Russell
+Sanchez
+Sanders
+Scott
+Smith
+Stewart
+Sullivan
+Taylor
+Thomas
+Thompson
+Torres
+Turner
+Walker
+Ward
+Washington
+Watson
+White
+Williams
+Wilson
+Wood
+Wright
+Young"""
+
+
+EMAIL_DOMAINS = """\
+example.com
+example.net
+example.org"""
+
+
+STREET_NAMES = """\
+Adams
+Ash
+Birch
+Cedar
+Center
+Cherry
+Chestnut
+Church
+Cleveland
+Dogwood
+Elm
+Forest
+Franklin
+Hickory
+Highland
+Hill
+Jackson
+Jefferson
+Johnson
+Lake
+Laurel
+Lincoln
+Madison
+Main
+Maple
+Meadow
+Mill
+Monroe
+North
+Oak
+Park
+Pine
+Poplar
+Railroad
+Ridge
+River
+South
+Spring
+Spruce
+Sunset
+Sycamore
+Valley
+View
+Walnut
+Washington
+West
+Willow
+Wilson
+Woodland"""
+
+
+STREET_SUFFIXES = """\
+Avenue
+Boulevard
+Circle
+Court
+Drive
+Lane
+Place
+Road
+Street
+Way"""
+
+
+CITIES = """\
+Ashford
+Bayview
+Bellmont
+Bridgeport
+Brookside
+Cedar Falls
+Clearwater
+Crestwood
+Eastwood
+Fairview
+Franklin
+Glenwood
+Greenville
+Harbor City
+Hillcrest
+Kingston
+Lakeside
+Maplewood
+Marion
+Midvale
+Millbrook
+Newport
+Northfield
+Oakdale
+Pinehurst
+Riverside
+Rockport
+Salem
+Springfield
+Stonebridge
+Summit
+Westfield
+Willowdale
+Winchester"""
+
+
+COMPANY_SUFFIXES = """\
+and Sons
+Group
+Holdings
+Inc
+Industries
+LLC
+Ltd
+Partners
+Systems
+Technologies"""
+
+
+LOREM_WORDS = """\
+a
+ac
+accumsan
+adipiscing
+aenean
+aliquam
+aliquet
+amet
+ante
+arcu
+at
+auctor
+augue
+bibendum
+blandit
+commodo
+condimentum
+congue
+consectetur
+consequat
+convallis
+cras
+curabitur
+cursus
+dapibus
+diam
+dictum
+dignissim
+dolor
+donec
+dui
+duis
+egestas
+eget
+eleifend
+elementum
+elit
+enim
+erat
+eros
+est
+et
+etiam
+eu
+euismod
+facilisis
+fames
+faucibus
+felis
+fermentum
+feugiat
+fringilla
+fusce
+gravida
+habitant
+hendrerit
+iaculis
+id
+imperdiet
+in
+integer
+interdum
+ipsum
+justo
+lacinia
+lacus
+laoreet
+lectus
+leo
+libero
+ligula
+lobortis
+lorem
+luctus
+maecenas
+magna
+malesuada
+massa
+mattis
+mauris
+metus
+mi
+molestie
+mollis
+morbi
+nam
+nec
+neque
+netus
+nibh
+nisi
+nisl
+non
+nulla
+nullam
+nunc
+odio
+orci
+ornare
+pellentesque
+pharetra
+phasellus
+placerat
+porta
+porttitor
+posuere
+praesent
+pretium
+proin
+pulvinar
+purus
+quam
+quis
+quisque
+rhoncus
+risus
+rutrum
+sagittis
+sapien
+scelerisque
+sed
+sem
+semper
+senectus
+sit
+sodales
+sollicitudin
+suscipit
+suspendisse
+tellus
+tempor
+tempus
+tincidunt
+tortor
+tristique
+turpis
+ullamcorper
+ultrices
+ultricies
+urna
+ut
+varius
+vehicula
+vel
+velit
+venenatis
+vestibulum
+vitae
+vivamus
+viverra
+volutpat
+vulputate"""
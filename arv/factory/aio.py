@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""Asynchronous value sources.
+
+Generators may produce awaitables: ``Gen`` accepts async iterators,
+``lazy`` async iterables and ``mkgen`` coroutine functions.
+
+.. code-block:: python
+
+   >>> class UserFactory(Factory):
+   ...     defaults = {
+   ...         "id": gen.mkgen(id_service.next_id),
+   ...         "avatar": gen.lazy(cache.avatars),
+   ...         "name": gen.name(),
+   ...     }
+   >>> user = await UserFactory().acall()
+   >>> users = await UserFactory().amany(100)
+
+``Factory.acall`` and ``Factory.amany`` await the values, nested
+objects included, before calling the constructors. The awaitables of
+all the objects created by ``amany`` are awaited concurrently, except
+those from the same async iterator, which are awaited in order.
+
+The objects are validated like the objects created by
+``Factory.many``, after being built. Calling the factory synchronously
+stores the awaitables in the objects. Computed attributes can't depend
+on asynchronous values, they raise ``TypeError``.
+
+"""
+import asyncio
+import collections
+import inspect
+import itertools
+
+from .records import LazyRecord
+from .records import materialize
+
+
+class _AsyncNext(object):
+    """Awaitable for the next value of an async iterator.
+
+    """
+
+    __slots__ = ("source", "index")
+
+    def __init__(self, source, index):
+        self.source = source
+        self.index = index
+
+    def __await__(self):
+        return (yield from self.source._aiterator.__anext__().__await__())
+
+
+class AsyncValues(object):
+    """Iterator of awaitables for the values of an async iterable.
+
+    ``Gen`` wraps async iterables with this class.
+
+    """
+
+    def __init__(self, aiterable):
+        self._aiterator = aiterable.__aiter__()
+        self._index = itertools.count()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return _AsyncNext(self, next(self._index))
+
+
+def _awaitables(values, pending, res):
+    for k, v in values.items():
+        if inspect.isawaitable(v):
+            res.append((values, k, v))
+    for _, nested_values, nested_pending in pending.values():
+        _awaitables(nested_values, nested_pending, res)
+    return res
+
+
+async def _await(slots):
+    # NOTE: an async iterator can't be awaited concurrently, its
+    # values are awaited in the order they were requested
+    for values, k, v in sorted(slots, key=lambda s: s[2].index):
+        values[k] = await v
+
+
+async def _await_one(values, k, v):
+    values[k] = await v
+
+
+async def resolve(reservations):
+    """Await the values of the reserved objects, see
+    ``Factory._reserve``.
+
+    """
+    sources = collections.OrderedDict()
+    tasks = []
+    for values, pending in reservations:
+        for slot in _awaitables(values, pending, []):
+            if isinstance(slot[2], _AsyncNext):
+                sources.setdefault(slot[2].source, []).append(slot)
+            else:
+                tasks.append(_await_one(*slot))
+    tasks.extend(_await(slots) for slots in sources.values())
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+async def build(factory, count, kwargs):
+    """Create ``count`` objects awaiting their values.
+
+    """
+    reservations = []
+    for _ in range(count):
+        d = factory._eval_factory_arguments(kwargs)
+        attrs = factory._classify_arguments(d) if d else {"": {}}
+        reservations.append(factory._reserve(attrs))
+    await resolve(reservations)
+    constructor = factory.constructor
+    if factory.deferred:
+        res = [LazyRecord(constructor, values, pending)
+               for values, pending in reservations]
+    else:
+        res = [materialize(constructor, values, pending)
+               for values, pending in reservations]
+    validate = factory._validate
+    if validate is not None:
+        step = factory.validation_sample \
+            if factory.validation == "sample" else 1
+        for obj in res[::step]:
+            validate(obj)
+    return res
+
+
+async def build_one(factory, kwargs):
+    """Create an object awaiting its values.
+
+    """
+    return (await build(factory, 1, kwargs))[0]
@@ -1,5 +1,41 @@
 # -*- coding: utf-8 -*-
 
-from . import generators as gen  # noqa: F401
-from .base import DELETE        # noqa: F401
-from .base import Factory       # noqa: F401
+"""Public API.
+
+The names are loaded on first use (PEP 562), importing this module is
+almost free. ``from arv.factory.api import gen`` only loads the
+generators, and the persistance support is loaded only when
+requested.
+
+"""
+import importlib
+
+
+# name -> (module, attribute or None for the module itself)
+_LAZY = {
+    "DELETE": (".base", "DELETE"),
+    "Factory": (".base", "Factory"),
+    "gen": (".generators", None),
+    "persistance": (".persistance", None),
+}
+
+__all__ = sorted(_LAZY)
+
+
+def __getattr__(name):
+    try:
+        module, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(
+            "module %r has no attribute %r" % (__name__, name)
+        ) from None
+    value = importlib.import_module(module, __package__)
+    if attr is not None:
+        value = getattr(value, attr)
+    # cache it, later lookups don't call this function
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
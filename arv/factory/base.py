@@ -2,16 +2,160 @@
 
 # marker utilitzar per les factories per indicar que s'omet un atribut
 
-from __future__ import unicode_literals
-from builtins import next
-from builtins import object
 
+import collections
+import copy
+import functools
+import inspect
+import operator
+
+from . import instrumentation
 from .generators import Gen
+from .generators import _Block
+from .generators import computed
+from .generators import _Related
 from .generators import lazy
+from .generators import related
+from .records import LazyRecord
+from .records import RecordConstructor
+from .records import materialize
 
 
 DELETE = object()
 
+# kinds of dynamic attributes in a compiled factory
+_GEN = 1
+_FACTORY = 2
+_COMPUTED = 3
+_RELATED = 4
+
+# attributes computed by ``Factory._resolve``
+_RESOLVED = frozenset(["_defaults", "_prototype", "_dynamic", "_validate"])
+
+# values of the ``validation`` attribute
+_VALIDATION_MODES = ("full", "sample", "off")
+
+# literal values copied by the ``copy_literals`` policy
+_MUTABLE_LITERALS = (list, dict, set, bytearray)
+
+
+def _shallow_copier(value):
+    """Return a function returning shallow copies of ``value``."""
+    if type(value) in _MUTABLE_LITERALS:
+        return value.copy
+    # subclasses, like ``defaultdict``, keep their type and state
+    return functools.partial(copy.copy, value)
+
+
+def _deep_copier(value):
+    """Return a function returning deep copies of ``value``.
+
+    Only the mutable containers are copied, any other value is shared
+    by all the copies. Subclasses of ``dict`` and ``list`` are copied
+    with ``copy.copy`` and then their items replaced.
+
+    """
+    if isinstance(value, dict):
+        items = [(k, _deep_copier(v)) for k, v in value.items()]
+        if type(value) is dict:
+            return lambda: dict([(k, f()) for k, f in items])
+
+        def copy_dict():
+            res = copy.copy(value)
+            for k, f in items:
+                res[k] = f()
+            return res
+        return copy_dict
+    if isinstance(value, list):
+        items = [_deep_copier(v) for v in value]
+        if type(value) is list:
+            return lambda: [f() for f in items]
+
+        def copy_list():
+            res = copy.copy(value)
+            res[:] = [f() for f in items]
+            return res
+        return copy_list
+    if isinstance(value, (set, bytearray)):
+        return _shallow_copier(value)
+    if isinstance(value, tuple) and any(
+            isinstance(v, _MUTABLE_LITERALS + (tuple, )) for v in value):
+        items = [_deep_copier(v) for v in value]
+        return lambda: tuple([f() for f in items])
+    return lambda: value
+
+
+def _fork_argument(value):
+    """Return a copy of the argument ``value`` for ``Factory.fork``.
+
+    """
+    if isinstance(value, Factory):
+        return value.fork()
+    if isinstance(value, Gen):
+        try:
+            return copy.deepcopy(value)
+        except Exception:
+            # the underlying iterator can't be copied, a python
+            # generator for instance
+            return value
+    return value
+
+
+def _getter(names):
+    """Like ``operator.itemgetter`` but always returns a tuple."""
+    if names:
+        return operator.itemgetter(*names)
+    return lambda d: ()
+
+
+def _count_generators(values, counts):
+    """Count in ``counts``, by id, the generators reachable from
+    ``values``: through factories, related objects and the generators
+    built from other generators.
+
+    """
+    seen = set()
+    stack = list(values)
+    while stack:
+        v = stack.pop()
+        if isinstance(v, Factory):
+            if id(v) not in seen:
+                seen.add(id(v))
+                stack.extend(v._defaults.values())
+        elif isinstance(v, _Related):
+            stack.extend((v.factory, v.count))
+        elif isinstance(v, Gen):
+            counts[id(v)] += 1
+            if not isinstance(v, _Block):
+                for a in vars(v).values():
+                    if isinstance(a, (list, tuple)):
+                        stack.extend(a)
+                    else:
+                        stack.append(a)
+    return counts
+
+
+_COPIERS = {
+    "shallow": _shallow_copier,
+    "deep": _deep_copier,
+}
+
+
+class RelatedList(list):
+    """List of related objects, see ``gen.related``.
+
+    ``factory`` is the factory that created the objects.
+
+    """
+
+    def __init__(self, factory, objs=()):
+        super(RelatedList, self).__init__(objs)
+        self.factory = factory
+
+
+def _related_list(factory, **objs):
+    return RelatedList(factory, objs.values())
+
 
 class Factory(object):
     """Class for defining dictionary factories.
@@ -19,35 +163,267 @@ class Factory(object):
     Instances of ``Factory`` classes are actual factories. Calling an
     instance creates a new dictionary.
 
+    Literal values are shared by all the objects created by the
+    factory. Lists, dictionaries, sets and bytearrays may be copied
+    for each object setting ``copy_literals`` to ``"shallow"``, a new
+    container sharing the items, or ``"deep"``.
+
+    ``constructor`` may be a record constructor from
+    :mod:`arv.factory.records`, the record class is generated when the
+    factory is created.
+
+    If ``deferred`` is true calling the factory returns a
+    ``LazyRecord`` and nested objects are built when first read, see
+    ``_reserve``.
+
+    If ``schema`` is given, see :mod:`arv.factory.schema`, the objects
+    are validated before calling the constructor. ``validation``
+    controls which objects created by ``many`` are validated: all of
+    them (``"full"``), one every ``validation_sample`` objects
+    (``"sample"``) or none (``"off"``). In ``"off"`` mode single
+    objects aren't validated either. Deferred objects are validated
+    only by ``many``.
+
+    Factories can be pickled, for instance for sending them to worker
+    processes, if their class and defaults can. Their generators keep
+    their position.
+
+    If ``seed`` is not ``None`` the random generators in the defaults
+    not seeded yet are seeded with it, keyed by the name of the class
+    and the attribute, see :mod:`arv.factory.rng`. The objects are
+    the same on every run, as long as the generators aren't shared
+    with other factories.
+
+    ``memo`` may be a ``BatchMemo`` reusing the values computed by
+    ``many`` for seeded generators, see :mod:`arv.factory.memo`.
+
     """
 
     defaults = {}
     constructor = dict
+    copy_literals = None
+    deferred = False
+    schema = None
+    validation = "full"
+    validation_sample = 10
+    instrumentation_name = None
+    seed = None
+    memo = None
 
     def __init__(self, **kwargs):
-        d = self._process_metafactory_defaults(
-            self.defaults,
-            exclude=set(kwargs.keys())
-        )
-        d.update(kwargs)
-        self._defaults = self._process_metafactory_arguments(d)
+        self._arguments = self._overrides = kwargs
+        if not self._class_analysis()[0].difference(kwargs):
+            self._resolve()
+
+    def __getattr__(self, name):
+        # the compiled defaults of factories with lazy constructors
+        # or metafactories are computed on first use
+        if name in _RESOLVED and "_overrides" in self.__dict__:
+            self._resolve()
+            return getattr(self, name)
+        raise AttributeError(name)
 
     def __call__(self, **kwargs):
-        attrs = self._classify_arguments(kwargs)
-        res = self._eval_factory_arguments(
-            self._defaults,
-            attrs,
-            exclude=set(attrs[""].keys())
-        )
-        for k, v in attrs[""].items():
-            if v is not DELETE:
-                res[k] = v
+        if instrumentation.active is not None:
+            return self._instrumented_call(instrumentation.active, kwargs)
+        if kwargs:
+            attrs = self._classify_arguments(kwargs)
+        else:
+            attrs = {"": {}}
+        # the constructor is looked up after evaluating the defaults,
+        # which may resolve it
+        if self.deferred:
+            values, pending = self._reserve(attrs)
+            return LazyRecord(self.constructor, values, pending)
+        res = self._build(attrs)
+        if self._validate is not None:
+            self._validate(res)
         return self.constructor(**res)
 
     def many(self, count, **kwargs):
-        return self._many(count, self.__call__, kwargs)
+        """Create ``count`` objects.
+
+        The nested objects are created first, with a single call to
+        the ``many`` method of each nested factory, so the cost per
+        object doesn't grow with the nesting depth. A generator shared
+        by the factory and a nested one spreads its values
+        differently: with a shared ``count()`` ``many(3)`` gives the
+        objects 3, 4 and 5 and the nested ones 0, 1 and 2, while
+        three calls give 0/1, 2/3 and 4/5. Don't rely on ``many(n)``
+        creating the same objects as ``n`` calls.
+
+        """
+        if instrumentation.active is not None:
+            instrumentation.active.incr(
+                instrumentation.factory_name(self), "many"
+            )
+        validate = self._validate
+        if validate is None or (self.validation == "full"
+                                and not self.deferred):
+            return self._many(count, self.__call__, kwargs)
+        # validate a sample of the objects after building them
+        self._validate = None
+        try:
+            res = self._many(count, self.__call__, kwargs)
+        finally:
+            self._validate = validate
+        step = self.validation_sample if self.validation == "sample" else 1
+        for obj in res[::step]:
+            validate(obj)
+        return res
+
+    def acall(self, **kwargs):
+        """Coroutine creating a new object.
+
+        Like calling the factory but the awaitables produced by the
+        generators are awaited, see :mod:`arv.factory.aio`.
+
+        """
+        from .aio import build_one
+        return build_one(self, kwargs)
+
+    def amany(self, count, **kwargs):
+        """Coroutine creating ``count`` objects.
+
+        The awaitables of all the objects are awaited concurrently.
+
+        """
+        from .aio import build
+        return build(self, count, kwargs)
+
+    def fork(self, **overrides):
+        """Return a new factory like this one with some defaults
+        overriden.
+
+        The arguments given when creating this factory are kept,
+        ``overrides`` take precedence. The new factory has its own
+        generators: the lazy constructors and metafactories create
+        new ones on its first use, the generators given as arguments
+        are copied and the factories given as arguments are forked.
+        The copies continue from the position of the originals,
+        generators that can't be copied are shared.
+
+        """
+        kwargs = {k: _fork_argument(v) for k, v in self._arguments.items()}
+        kwargs.update(overrides)
+        return type(self)(**kwargs)
+
+    def profile(self, count, **kwargs):
+        """Profile the creation of ``count`` objects.
+
+        Returns a ``ProfileReport``, see
+        :mod:`arv.factory.profiling`.
+
+        """
+        from .profiling import profile
+        return profile(self, count, kwargs)
+
+    def producer(self, n=None, queue_size=1024, workers=1, processes=False,
+                 **kwargs):
+        """Return an iterable of ``n`` objects, or endless if ``None``,
+        created in the background.
+
+        The objects are created in a thread, or in ``workers``
+        processes, into a queue of ``queue_size`` objects. See
+        :mod:`arv.factory.producer`.
+
+        """
+        from .producer import Producer
+        return Producer(self, n, queue_size, workers, processes, kwargs)
+
+    @classmethod
+    def _class_analysis(cls):
+        """Return the analysis of the class defaults.
+
+        It's a tuple with the ``defaults`` and ``copy_literals``
+        attributes it's based on, the set of names whose value is a
+        lazy constructor or a metafactory, and the compiled defaults
+        if there's none. Computed once per class.
+
+        """
+        analysis = cls.__dict__.get("_analysis")
+        if analysis is None or analysis[0] is not cls.defaults \
+                or analysis[1] is not cls.copy_literals:
+            constructors = frozenset(
+                k for k, v in cls.defaults.items() if cls._is_contructor(v)
+            )
+            compiled = None
+            if not constructors:
+                defaults = cls._process_metafactory_arguments(cls.defaults)
+                compiled = (defaults, ) + cls._compile(defaults)
+            analysis = (cls.defaults, cls.copy_literals, constructors,
+                        compiled)
+            cls._analysis = analysis
+        return analysis[2:]
+
+    def _resolve(self):
+        """Evaluate the lazy constructors and metafactories in the
+        defaults and compile them.
+
+        """
+        kwargs = self._overrides
+        compiled = self._class_analysis()[1]
+        if compiled is not None and not kwargs:
+            self._defaults, self._prototype, self._dynamic = compiled
+        else:
+            d = self._process_metafactory_defaults(
+                self.defaults,
+                exclude=set(kwargs.keys())
+            )
+            d.update(kwargs)
+            self._defaults = self._process_metafactory_arguments(d)
+            self._prototype, self._dynamic = self._compile(self._defaults)
+        self._resolve_constructor_and_validator()
+        # NOTE: removed last, if a lazy constructor raises the factory
+        # is resolved again on the next use
+        del self._overrides
+
+    def _resolve_constructor_and_validator(self):
+        if isinstance(self.constructor, RecordConstructor):
+            self._resolve_record_constructor(self.constructor)
+        self._validate = self._validator()
+
+    def __getstate__(self):
+        # the compiled defaults, the validator and the generated record
+        # classes can't be pickled, they're recomputed when unpickling
+        # from the evaluated defaults, whose generators keep their
+        # position
+        state = self.__dict__.copy()
+        for name in ("_prototype", "_dynamic", "_validate"):
+            state.pop(name, None)
+        if isinstance(type(self).constructor, RecordConstructor):
+            state.pop("constructor", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "_defaults" in state:
+            self._prototype, self._dynamic = self._compile(self._defaults)
+            self._resolve_constructor_and_validator()
+
+    def _validator(self):
+        """Return the function validating the objects or ``None``.
+
+        """
+        if self.validation not in _VALIDATION_MODES:
+            raise ValueError("invalid validation: %r" % (self.validation, ))
+        if self.schema is None or self.validation == "off":
+            return None
+        return functools.partial(
+            self.schema.validate,
+            path=instrumentation.factory_name(self) + "."
+        )
 
     def _many(self, count, builder, kwargs):
+        if builder == self.__call__ and type(self).__call__ is \
+                Factory.__call__ and not self.deferred and \
+                instrumentation.active is None:
+            return self._many_columns(count, kwargs)
+        for _, kind, _ in self._dynamic:
+            if kind == _RELATED or (kind == _FACTORY and not self.deferred):
+                return self._many_batched(count, builder, kwargs)
+        if not kwargs:
+            return [builder() for _ in range(count)]
         res = []
         while count > 0:
             count = count - 1
@@ -55,7 +431,149 @@ class Factory(object):
             res.append(builder(**d))
         return res
 
+    def _many_columns(self, count, kwargs):
+        """Create ``count`` objects like calling the factory.
+
+        The nested objects and the related objects are created first,
+        calling once the ``many`` method of each nested factory. Then
+        the objects are built like in ``_build``, taking the nested
+        objects from those columns.
+
+        """
+        attrs = self._classify_arguments(kwargs)
+        overrides = attrs[""]
+        plan = []
+        for k, kind, v in self._dynamic:
+            if k in overrides:
+                continue
+            if kind == _FACTORY:
+                v = v.many(count, **attrs.get(k, {}))
+            elif kind == _RELATED:
+                v = self._many_related(count, v, attrs.get(k, {}))
+                kind = _FACTORY
+            plan.append((k, kind, v))
+        if self.memo is not None:
+            # NOTE: after the nested objects, the generators are drawn
+            # in that order without the memo too
+            memoized = self._memoized(kwargs)
+            for i, (k, kind, v) in enumerate(plan):
+                if k in memoized:
+                    column = self.memo.column(self._defaults[k], count)
+                    if column is not None:
+                        plan[i] = (k, _FACTORY, column)
+        prototype = self._prototype
+        validate = self._validate
+        constructor = self.constructor
+        res = []
+        for i in range(count):
+            obj = prototype.copy()
+            if overrides:
+                d = self._eval_factory_arguments(overrides)
+                for k, v in d.items():
+                    if v is DELETE:
+                        obj.pop(k, None)
+                    else:
+                        obj[k] = v
+            for k, kind, v in plan:
+                if kind == _GEN:
+                    obj[k] = v()
+                elif kind == _FACTORY:
+                    obj[k] = v[i]
+                else:
+                    f, getter, unpack = v
+                    try:
+                        obj[k] = f(*getter(obj)) if unpack else f(getter(obj))
+                    except KeyError:
+                        self._check_dependencies(k, obj)
+                        raise
+            if validate is not None:
+                validate(obj)
+            res.append(constructor(**obj))
+        return res
+
+    def _memoized(self, kwargs):
+        """Return the names of the attributes whose values may be
+        taken from the memo, given the arguments ``kwargs`` of
+        ``many``.
+
+        Generators reachable from other attributes, nested factories
+        and related objects included, or from the arguments are
+        excluded, their values are interleaved.
+
+        """
+        gens = [(k, self._defaults[k]) for k, kind, _ in self._dynamic
+                if kind != _COMPUTED and k not in kwargs]
+        counts = _count_generators([g for _, g in gens],
+                                   collections.Counter())
+        _count_generators(kwargs.values(), counts)
+        return frozenset(
+            k for k, g in gens
+            if isinstance(g, _Block) and counts[id(g)] == 1
+        )
+
+    def _many_batched(self, count, builder, kwargs):
+        """Like ``_many`` but the nested objects and the related
+        objects of all the objects are created first, calling once the
+        ``many`` method of each nested factory, and then passed as
+        arguments. The lists of related objects are sized first.
+
+        Nested objects of deferred factories are still reserved per
+        object.
+
+        """
+        kwargs = dict(kwargs)
+        columns = []
+        registry = instrumentation.active
+        for k, kind, v in self._dynamic:
+            if k in kwargs or kind not in (_FACTORY, _RELATED) or (
+                    kind == _FACTORY and self.deferred):
+                continue
+            prefix = k + "__"
+            sub = {}
+            for name in [n for n in kwargs if n.startswith(prefix)]:
+                sub[name[len(prefix):]] = kwargs.pop(name)
+            if registry is not None:
+                t = instrumentation.clock()
+            if kind == _FACTORY:
+                values = v.many(count, **sub)
+            else:
+                values = self._many_related(count, v, sub)
+            if registry is not None:
+                registry.timing(
+                    instrumentation.factory_name(self), k,
+                    "factory" if kind == _FACTORY else "related",
+                    instrumentation.clock() - t, count
+                )
+            columns.append((k, values))
+        res = []
+        for i in range(count):
+            d = self._eval_factory_arguments(kwargs)
+            for k, values in columns:
+                d[k] = values[i]
+            res.append(builder(**d))
+        return res
+
+    @staticmethod
+    def _many_related(count, spec, kwargs):
+        """Return ``count`` lists of related objects, created by a
+        single call to the ``many`` method of the related factory.
+
+        """
+        factory, size = spec
+        sizes = [max(0, int(size())) for _ in range(count)]
+        objs = factory.many(sum(sizes), **kwargs)
+        res = []
+        start = 0
+        for n in sizes:
+            res.append(RelatedList(factory, objs[start:start + n]))
+            start += n
+        return res
+
     def _process_metafactory_defaults(self, d, exclude=()):
+        if instrumentation.active is not None:
+            return self._instrumented_process_metafactory_defaults(
+                instrumentation.active, d, exclude
+            )
         res = {}
         for k, v in d.items():
             if k not in exclude:
@@ -65,14 +583,258 @@ class Factory(object):
                     res[k] = v
         return res
 
-    def _process_metafactory_arguments(self, d):
+    @staticmethod
+    def _process_metafactory_arguments(d):
         res = {}
         for k, v in d.items():
-            if v is not DELETE:
+            if isinstance(v, related):
+                # related objects are supported as arguments too
+                res[k] = v()
+            elif v is not DELETE:
+                res[k] = v
+        return res
+
+    @classmethod
+    def _compile(cls, d):
+        """Compile the defaults ``d``.
+
+        Returns a *prototype*, a dictionary with the literal values
+        that is copied for each object, and a list of ``(name, kind,
+        value)`` tuples describing the dynamic attributes, in
+        evaluation order. For generators ``value`` is a function
+        returning the next value, see ``Gen._fetcher``. Literals
+        copied by the ``copy_literals`` policy are handled as
+        generators. Computed attributes come last, sorted so that
+        they're evaluated after the attributes they depend on.
+
+        The prototype holds a placeholder for the dynamic attributes
+        so that the order of the attributes is preserved.
+
+        """
+        policy = cls.copy_literals
+        if policy is not None and policy not in _COPIERS:
+            raise ValueError("invalid copy_literals: %r" % (policy, ))
+        if cls.seed is not None:
+            cls._seed_generators(d)
+        prototype = {}
+        dynamic = []
+        computed_attrs = {}
+        for k, v in d.items():
+            if isinstance(v, Factory):
+                prototype[k] = None
+                dynamic.append((k, _FACTORY, v))
+            elif isinstance(v, Gen):
+                prototype[k] = None
+                dynamic.append((k, _GEN, v._fetcher()))
+            elif isinstance(v, computed):
+                prototype[k] = None
+                computed_attrs[k] = v
+            elif isinstance(v, _Related):
+                prototype[k] = None
+                dynamic.append((k, _RELATED, (v.factory, v.count._fetcher())))
+            elif policy is not None and isinstance(v, _MUTABLE_LITERALS):
+                prototype[k] = None
+                dynamic.append((k, _GEN, _COPIERS[policy](v)))
+            else:
+                prototype[k] = v
+        for k in cls._sort_computed(computed_attrs, prototype):
+            v = computed_attrs[k]
+            if len(v._depends) == 1:
+                args = (v._f, operator.itemgetter(*v._depends), False)
+            else:
+                args = (v._f, _getter(v._depends), True)
+            dynamic.append((k, _COMPUTED, args))
+        return prototype, dynamic
+
+    def _check_dependencies(self, k, obj):
+        """Raise ``ValueError`` if a dependency of the computed
+        attribute ``k`` is missing from ``obj``, deleted with
+        ``DELETE``.
+
+        """
+        for d in self._defaults[k]._depends:
+            if d not in obj:
+                raise ValueError(
+                    "%s depends on %s, which was deleted" % (k, d)
+                ) from None
+
+    @classmethod
+    def _seed_generators(cls, d):
+        """Seed the random generators in ``d`` not seeded nor used
+        yet. Seeding restarts them, used ones would repeat values.
+
+        """
+        for k, v in d.items():
+            if isinstance(v, _Related):
+                k, v = k + ".count", v.count
+            if isinstance(v, _Block) and v._stream is None \
+                    and v._position() == 0:
+                v.seed(cls.seed, cls.__name__, k)
+
+    @staticmethod
+    def _sort_computed(attrs, names):
+        """Return the names of the computed attributes ``attrs`` sorted
+        so that every attribute comes after its dependencies.
+
+        Raises ``ValueError`` if an attribute depends on an attribute
+        not in ``names`` or there're circular dependencies.
+
+        """
+        res = []
+        done = set()
+
+        def visit(k, path):
+            if k in done:
+                return
+            if k in path:
+                raise ValueError(
+                    "circular dependency: %s" % " -> ".join(path + [k])
+                )
+            for dep in attrs[k]._depends:
+                if dep not in names:
+                    raise ValueError(
+                        "%s depends on unknown attribute %s" % (k, dep)
+                    )
+                if dep in attrs:
+                    visit(dep, path + [k])
+            done.add(k)
+            res.append(k)
+
+        for k in attrs:
+            visit(k, [])
+        return res
+
+    def _resolve_record_constructor(self, spec):
+        """Replace the record constructor ``spec`` with the record
+        class for the attributes of this factory.
+
+        If ``spec.nested`` the nested factories using the ``dict``
+        constructor are replaced by copies creating records.
+
+        """
+        self.constructor = spec.resolve(self, self._prototype)
+        if not spec.nested:
+            return
+        dynamic = []
+        for k, kind, v in self._dynamic:
+            if kind == _FACTORY and v.constructor is dict:
+                v = copy.copy(v)
+                v._resolve_record_constructor(
+                    type(spec)(name=k.title().replace("_", "") + "Record")
+                )
+            dynamic.append((k, kind, v))
+        self._dynamic = dynamic
+
+    def _build(self, attrs):
+        """Return the attributes for a new object.
+
+        ``attrs`` are the classified arguments, see
+        ``_classify_arguments``.
+
+        """
+        res = self._prototype.copy()
+        overrides = attrs[""]
+        for k, v in overrides.items():
+            if v is DELETE:
+                res.pop(k, None)
+            else:
                 res[k] = v
+        for k, kind, v in self._dynamic:
+            if k not in overrides:
+                if kind == _GEN:
+                    res[k] = v()
+                elif kind == _FACTORY:
+                    res[k] = v(**attrs.get(k, {}))
+                elif kind == _RELATED:
+                    res[k] = self._related(v, attrs.get(k, {}))
+                else:
+                    f, getter, unpack = v
+                    try:
+                        res[k] = f(*getter(res)) if unpack else f(getter(res))
+                    except KeyError:
+                        self._check_dependencies(k, res)
+                        raise
         return res
 
+    @staticmethod
+    def _related(spec, kwargs):
+        factory, size = spec
+        return RelatedList(factory, factory.many(max(0, int(size())),
+                                                 **kwargs))
+
+    def _reserve(self, attrs):
+        """Reserve the values of a new object.
+
+        Returns the values and a dictionary with the reservations of
+        the nested objects. Generators are consumed right away, so
+        that the values don't depend on the order in which the fields
+        are read, but the nested objects are built when first read,
+        see ``LazyRecord``. Computed attributes are computed right
+        away too, building the nested objects they depend on.
+
+        """
+        res = self._prototype.copy()
+        pending = {}
+        overrides = attrs[""]
+        for k, v in overrides.items():
+            if v is DELETE:
+                res.pop(k, None)
+            else:
+                res[k] = v
+        for k, kind, v in self._dynamic:
+            if k not in overrides:
+                if kind == _GEN:
+                    res[k] = v()
+                elif kind == _COMPUTED:
+                    for d in self._defaults[k]._depends:
+                        if d in pending:
+                            res[d] = materialize(*pending.pop(d))
+                        elif inspect.isawaitable(res.get(d)):
+                            # NOTE: the reserved awaitables are awaited
+                            # once, by slot, see ``aio.resolve``
+                            raise TypeError(
+                                "%s depends on %s, an asynchronous value"
+                                % (k, d)
+                            )
+                    f, getter, unpack = v
+                    try:
+                        res[k] = f(*getter(res)) if unpack else f(getter(res))
+                    except KeyError:
+                        self._check_dependencies(k, res)
+                        raise
+                elif kind == _RELATED:
+                    pending[k] = self._reserve_related(v, attrs.get(k))
+                else:
+                    sub = attrs.get(k)
+                    values, nested = v._reserve(
+                        v._classify_arguments(sub) if sub else {"": {}}
+                    )
+                    pending[k] = (v.constructor, values, nested)
+        return res, pending
+
+    @staticmethod
+    def _reserve_related(spec, kwargs):
+        """Return the reservation of a list of related objects.
+
+        It's built like an object whose fields are the reservations of
+        the related objects.
+
+        """
+        factory, size = spec
+        objs = {}
+        for i in range(max(0, int(size()))):
+            d = factory._eval_factory_arguments(kwargs or {})
+            values, nested = factory._reserve(
+                factory._classify_arguments(d) if d else {"": {}}
+            )
+            objs[str(i)] = (factory.constructor, values, nested)
+        return (functools.partial(_related_list, factory), {}, objs)
+
     def _eval_factory_arguments(self, d, attrs={}, exclude=()):
+        if instrumentation.active is not None:
+            return self._instrumented_eval_factory_arguments(
+                instrumentation.active, d, attrs, exclude
+            )
         res = {}
         for k, v in d.items():
             if k not in exclude:
@@ -100,6 +862,92 @@ class Factory(object):
             res.setdefault(p1, {})[p2] = v
         return res
 
-    def _is_contructor(self, v):
+    @staticmethod
+    def _is_contructor(v):
         return (isinstance(v, type) and issubclass(v, Factory)) \
             or isinstance(v, lazy)
+
+    # instrumented versions of the methods above. Kept apart so that
+    # the regular code path pays nothing for the instrumentation.
+
+    def _instrumented_call(self, registry, kwargs):
+        name = instrumentation.factory_name(self)
+        registry.incr(name, "calls")
+        attrs = self._classify_arguments(kwargs)
+        if self.deferred:
+            values, pending = self._reserve(attrs)
+            obj = LazyRecord(self.constructor, values, pending)
+            registry.incr(name, "built")
+            return obj
+        res = self._instrumented_build(registry, name, attrs)
+        if self._validate is not None:
+            self._validate(res)
+        obj = self.constructor(**res)
+        registry.incr(name, "built")
+        return obj
+
+    def _instrumented_build(self, registry, name, attrs):
+        clock = instrumentation.clock
+        res = self._prototype.copy()
+        overrides = attrs[""]
+        for k, v in overrides.items():
+            if v is DELETE:
+                res.pop(k, None)
+            else:
+                res[k] = v
+        for k, kind, v in self._dynamic:
+            if k not in overrides:
+                t = clock()
+                if kind == _GEN:
+                    res[k] = v()
+                    registry.timing(name, k, "gen", clock() - t)
+                elif kind == _FACTORY:
+                    res[k] = v(**attrs.get(k, {}))
+                    registry.timing(name, k, "factory", clock() - t)
+                elif kind == _RELATED:
+                    res[k] = self._related(v, attrs.get(k, {}))
+                    registry.timing(name, k, "related", clock() - t)
+                else:
+                    f, getter, unpack = v
+                    try:
+                        res[k] = f(*getter(res)) if unpack else f(getter(res))
+                    except KeyError:
+                        self._check_dependencies(k, res)
+                        raise
+                    registry.timing(name, k, "computed", clock() - t)
+        return res
+
+    def _instrumented_process_metafactory_defaults(self, registry, d,
+                                                   exclude=()):
+        name = instrumentation.factory_name(self)
+        clock = instrumentation.clock
+        res = {}
+        for k, v in d.items():
+            if k not in exclude:
+                if self._is_contructor(v):
+                    t = clock()
+                    res[k] = v()
+                    registry.timing(name, k, "lazy", clock() - t)
+                else:
+                    res[k] = v
+        return res
+
+    def _instrumented_eval_factory_arguments(self, registry, d, attrs={},
+                                             exclude=()):
+        name = instrumentation.factory_name(self)
+        clock = instrumentation.clock
+        res = {}
+        for k, v in d.items():
+            if k not in exclude:
+                if isinstance(v, Factory):
+                    kwargs = attrs.get(k, {})
+                    t = clock()
+                    res[k] = v(**kwargs)
+                    registry.timing(name, k, "factory", clock() - t)
+                elif isinstance(v, Gen):
+                    t = clock()
+                    res[k] = next(v)
+                    registry.timing(name, k, "gen", clock() - t)
+                else:
+                    res[k] = v
+        return res
@@ -3,17 +3,19 @@
 """Value generation for factories.
 
 """
-from __future__ import unicode_literals
-from builtins import next
-from builtins import object
-
-try:
-    from collections.abc import Iterable
-except ImportError:
-    from collections import Iterable
-
+import bisect
+import collections
+import datetime as _datetime
+import functools
 import itertools
+import math
+import operator
 import random
+import string as _string
+import sys
+import weakref
+from collections.abc import AsyncIterable
+from collections.abc import Iterable
 
 
 class Gen(object):
@@ -55,18 +57,57 @@ class Gen(object):
               ``Gen``. The magic is done in the ``__new__`` and
               ``__init__`` methods.
 
+    Generators can be transformed and combined with the methods
+    ``map``, ``filter``, ``zip``, ``chain`` and ``batched``:
+
+    .. code-block:: python
+
+       >>> from arv.factory.api import gen
+       >>> g = gen.count().filter(lambda i: i % 2).map(str)
+       >>> next(g), next(g)
+       ('1', '3')
+
+    The new generators are built with ``itertools`` and friends
+    directly over the underlying iterators, skipping the ``Gen``
+    layer, so chaining transformations doesn't add python level calls
+    per value. They consume the values of the original generators.
+
+    .. note:: subclasses that rebind ``_seq`` after initialization
+              must override ``__next__``. Otherwise the value
+              generators built from them, and the factories, may
+              keep consuming the old iterator.
+
+    Generators can be pickled if the underlying iterator can, as list,
+    tuple and range iterators. The built-in generators and
+    combinators can be pickled too, as long as the values and
+    functions they're built from can. Unpickled generators continue
+    from the position of the original at pickling time.
+
+    Async iterables are wrapped too, the generator produces awaitables
+    for their values, see :mod:`arv.factory.aio`.
+
     """
 
-    def __new__(cls, iterable):
-        if isinstance(iterable, cls):
-            return iterable
+    def __new__(cls, *args, **kwargs):
+        # NOTE: only ``Gen`` itself unwraps, subclasses may take
+        # arguments of any kind. Instances of subclasses are not
+        # unwrapped either, python would call their ``__init__`` with
+        # the wrong arguments.
+        if cls is Gen and args and type(args[0]) is Gen:
+            return args[0]
         else:
             return super(Gen, cls).__new__(cls)
 
     def __init__(self, iterable):
-        if not isinstance(iterable, Gen):
+        if iterable is not self:
             # NOTE: avoid infinite recursion wrapping a ``Gen``
-            self._seq = iter(iterable)
+            try:
+                self._seq = iter(iterable)
+            except TypeError:
+                if not isinstance(iterable, AsyncIterable):
+                    raise
+                from .aio import AsyncValues
+                self._seq = AsyncValues(iterable)
 
     def __iter__(self):
         return self
@@ -74,6 +115,114 @@ class Gen(object):
     def __next__(self):
         return next(self._seq)
 
+    def map(self, f):
+        """Generator of ``f(value)`` for each value.
+
+        """
+        return _Map(f, self)
+
+    def filter(self, predicate):
+        """Generator of the values for which ``predicate`` is true.
+
+        """
+        return _Filter(predicate, self)
+
+    def zip(self, *others):
+        """Generator of tuples with a value from each generator.
+
+        """
+        return _Zip(self, *others)
+
+    def chain(self, *others):
+        """Generator of the values of this generator followed by the
+        values of ``others``.
+
+        """
+        return _Chain(self, *others)
+
+    def batched(self, n):
+        """Generator of tuples of ``n`` consecutive values.
+
+        The last tuple may be shorter.
+
+        """
+        if n < 1:
+            raise ValueError("n must be positive")
+        return _Batched(self, n)
+
+    def _fetcher(self):
+        """Return a function that returns the next value.
+
+        For generators that don't override ``__next__`` that's the
+        ``__next__`` method of the underlying iterator, skipping the
+        delegation.
+
+        """
+        if type(self).__next__ is Gen.__next__:
+            return functools.partial(next, self._seq)
+        return self.__next__
+
+
+def _batch(iterator, n):
+    return tuple(itertools.islice(iterator, n))
+
+
+# Combinators. They consume the underlying iterators of their sources
+# directly, so their position is the position of the sources and
+# they're pickled as the function and the sources.
+
+class _Map(Gen):
+
+    def __init__(self, f, source):
+        self._f = f
+        self._source = source
+        self._seq = map(f, _iterator(source))
+
+    def __reduce__(self):
+        return (type(self), (self._f, self._source))
+
+
+class _Filter(_Map):
+
+    def __init__(self, predicate, source):
+        self._f = predicate
+        self._source = source
+        self._seq = filter(predicate, _iterator(source))
+
+
+def _as_gen(value):
+    # NOTE: ``Gen`` wraps instances of subclasses, adding a level of
+    # delegation
+    return value if isinstance(value, Gen) else Gen(value)
+
+
+class _Zip(Gen):
+
+    def __init__(self, *sources):
+        self._sources = [_as_gen(s) for s in sources]
+        self._seq = zip(*[_iterator(s) for s in self._sources])
+
+    def __reduce__(self):
+        return (type(self), tuple(self._sources))
+
+
+class _Chain(_Zip):
+
+    def __init__(self, *sources):
+        self._sources = [_as_gen(s) for s in sources]
+        self._seq = itertools.chain(*[_iterator(s) for s in self._sources])
+
+
+class _Batched(Gen):
+
+    def __init__(self, source, n):
+        self._source = source
+        self._n = n
+        self._seq = iter(functools.partial(_batch, _iterator(source), n), ())
+
+    def __reduce__(self):
+        return (_Batched, (self._source, self._n))
+
 
 class lazy(object):
     """Lazy callable.
@@ -92,11 +241,95 @@ class lazy(object):
 
     def __call__(self):
         res = self._f(*self._args, **self._kwargs)
-        if isinstance(res, Iterable):
+        if isinstance(res, (Iterable, AsyncIterable)) \
+           and not isinstance(res, Gen):
             res = Gen(res)
         return res
 
 
+class computed(object):
+    """Computed attribute.
+
+    Marker class for attributes whose value is computed from other
+    attributes of the same object. The ``Factory`` class calls ``f``
+    with the values of the attributes named in ``depends``, in that
+    order, after computing them. Deleting one of them with ``DELETE``
+    raises ``ValueError``.
+
+    >>> from arv.factory.api import gen
+    >>> full_name = gen.computed(
+    ...     lambda first, last: first + " " + last,
+    ...     depends=["first_name", "last_name"]
+    ... )
+
+    """
+    def __init__(self, f, depends=()):
+        if not callable(f):
+            raise TypeError("callable required")
+        self._f = f
+        self._depends = tuple(depends)
+
+
+class related(lazy):
+    """One-to-many related objects.
+
+    Marker class for attributes whose value is a list of objects
+    created by ``factory``, a factory, a factory class or a lazy
+    constructor returning a factory. ``count`` is the number of
+    objects in each list: an integer, a tuple ``(min, max)`` for a
+    uniform random number, or a generator or lazy constructor of
+    numbers, like the distributions in this module. Numbers are
+    truncated to integers, negative ones count as zero.
+
+    >>> from arv.factory.api import gen
+    >>> lines = gen.related(LineFactory, count=(1, 20))
+
+    The value of the attribute is a ``RelatedList``. When creating
+    several objects with ``Factory.many`` the lists are sized first
+    and all the related objects are created by a single call to the
+    ``many`` method of ``factory``. Arguments like ``lines__price=1``
+    apply to each related object.
+
+    """
+    def __init__(self, factory, count=1):
+        super(related, self).__init__(_Related, factory, count)
+
+
+class _Related(object):
+    """Related objects of a factory, see ``related``.
+
+    """
+
+    def __init__(self, factory, count):
+        if isinstance(factory, (type, lazy)):
+            factory = factory()
+        if isinstance(count, lazy):
+            count = count()
+        elif isinstance(count, tuple):
+            count = randint(*count)
+        elif not isinstance(count, Iterable):
+            count = cycle([count])
+        self.factory = factory
+        self.count = _as_gen(count)
+
+
+class _Call(Gen):
+    """Generator of the values returned by ``f(*args, **kwargs)``.
+
+    """
+
+    def __init__(self, f, args=(), kwargs=None):
+        self._f = f
+        self._args = args
+        self._kwargs = kwargs or {}
+        if self._kwargs:
+            f = functools.partial(f, **self._kwargs)
+        self._seq = itertools.starmap(f, itertools.repeat(args))
+
+    def __reduce__(self):
+        return (_Call, (self._f, self._args, self._kwargs))
+
+
 def mkgen(f, *args, **kwargs):
     """Create a generator from a function.
 
@@ -109,11 +342,33 @@ def mkgen(f, *args, **kwargs):
     >>> from arv.factory.api import gen
     >>> g = gen.mkgen(random.randint, 1, 100)
 
+    If ``f`` is a coroutine function the values are coroutines,
+    awaited by ``Factory.acall`` and ``Factory.amany``.
+
     """
-    def wrapper():
-        while True:
-            yield f(*args, **kwargs)
-    return Gen(wrapper())
+    return _Call(f, args, kwargs)
+
+
+class _Constructor(object):
+    """Lazy constructor built by ``mkconstructor``.
+
+    """
+
+    def __init__(self, iterable, args, kwargs):
+        self._iterable = iterable
+        self._args = args
+        self._kwargs = kwargs
+
+    def __call__(self):
+        if callable(self._iterable):
+            i = self._iterable(*self._args, **self._kwargs)
+        else:
+            i = self._iterable
+        if not isinstance(i, Iterable):
+            raise TypeError("not an iterable.")
+        if isinstance(i, Gen):
+            return i
+        return Gen(i)
 
 
 def mkconstructor(iterable, *args, **kwargs):
@@ -132,22 +387,175 @@ def mkconstructor(iterable, *args, **kwargs):
     >>> Cycle = gen.mkconstructor(itertools.cycle, (1, 2, 3))
 
     """
-    def constructor():
-        if callable(iterable):
-            i = iterable(*args, **kwargs)
+    return lazy(_Constructor(iterable, args, kwargs))
+
+
+class _Prefetch(Gen):
+    """Generator computing the values of another one in the
+    background, see ``prefetch``.
+
+    """
+
+    def __init__(self, inner, buffer=16, workers=1, processes=False):
+        if buffer < 1:
+            raise ValueError("buffer must be positive")
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        inner = _as_gen(inner)
+        if type(inner) is not _Call and (processes or workers > 1):
+            raise ValueError(
+                "only mkgen generators can be prefetched by several "
+                "workers or in processes"
+            )
+        self._inner = inner
+        self._buffer = buffer
+        self._workers = workers
+        self._processes = processes
+        self._futures = collections.deque()
+        self._executor = None
+        self._exhausted = False
+
+    def _start(self):
+        from concurrent import futures
+        if self._processes:
+            executor = futures.ProcessPoolExecutor(self._workers)
         else:
-            i = iterable
-        if not isinstance(i, Iterable):
-            raise TypeError("not an iterable.")
-        return Gen(i)
-    return lazy(constructor)
+            executor = futures.ThreadPoolExecutor(self._workers)
+        shutdown = functools.partial(executor.shutdown, wait=False)
+        if sys.version_info >= (3, 9):
+            shutdown = functools.partial(shutdown, cancel_futures=True)
+        # NOTE: the finalizer and the tasks must not reference ``self``
+        self._executor = executor
+        self._finalizer = weakref.finalize(self, shutdown)
+        inner = self._inner
+        if type(inner) is _Call:
+            self._submit = functools.partial(
+                executor.submit, inner._f, *inner._args, **inner._kwargs
+            )
+        else:
+            self._submit = functools.partial(
+                executor.submit, next, _iterator(inner)
+            )
+
+    def __next__(self):
+        futures = self._futures
+        if self._executor is None:
+            self._start()
+        if not self._exhausted:
+            submit = self._submit
+            for _ in range(self._buffer - len(futures)):
+                futures.append(submit())
+        if not futures:
+            raise StopIteration()
+        try:
+            return futures.popleft().result()
+        except StopIteration:
+            self._exhausted = True
+            for future in futures:
+                future.cancel()
+            futures.clear()
+            raise
+
+    def close(self):
+        """Shut down the workers.
+
+        The values not consumed yet are discarded.
+
+        """
+        self._exhausted = True
+        self._futures.clear()
+        if self._executor is not None:
+            self._finalizer()
+
+    def __getstate__(self):
+        # the values computed ahead are pickled, as they have already
+        # been consumed from the inner generator
+        state = self.__dict__.copy()
+        state["_futures"] = [_outcome(f) for f in self._futures]
+        state["_executor"] = None
+        state.pop("_finalizer", None)
+        state.pop("_submit", None)
+        return state
+
+    def __setstate__(self, state):
+        from concurrent.futures import Future
+        self.__dict__.update(state)
+        self._futures = collections.deque()
+        for ok, value in state["_futures"]:
+            future = Future()
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+            self._futures.append(future)
+
+
+def _outcome(future):
+    try:
+        return (True, future.result())
+    except Exception as e:
+        return (False, e)
+
+
+def prefetch(inner, buffer=16, workers=1, processes=False):
+    """Generator computing the values of ``inner`` ahead of time.
+
+    Up to ``buffer`` values are computed in the background, by a pool
+    of ``workers`` threads or, if ``processes`` is true, processes.
+    Useful for slow functions, like hashing passwords:
+
+    >>> from arv.factory.api import gen
+    >>> g = gen.prefetch(gen.mkgen(make_password, "secret"), workers=4)
+
+    The values and the exceptions are produced in the same order as
+    by ``inner``. Only ``mkgen`` generators can be computed by several
+    workers or in processes, the values of other generators are
+    computed one after the other by a single thread.
+
+    The workers are started on first use and shut down when the
+    generator is garbage collected or closed with its ``close``
+    method.
+
+    """
+    return _Prefetch(inner, buffer, workers, processes)
+
+
+def _count_value(counter):
+    """Return the next value of the ``itertools.count`` ``counter``
+    without consuming it.
+
+    """
+    # NOTE: pickling ``itertools`` objects is deprecated, the repr
+    # is the only public way of reading the state of a counter. Only
+    # needed when pickling, hence the local imports.
+    import ast
+    import pickle
+
+    r = repr(counter)
+    try:
+        return ast.literal_eval("(%s, )" % r[r.index("(") + 1:-1])[0]
+    except (ValueError, SyntaxError):
+        raise pickle.PicklingError("can't pickle %s" % r)
+
+
+class _Count(Gen):
+    """Generator version of ``itertools.count``.
+
+    """
+
+    def __init__(self, start=0, step=1):
+        self._step = step
+        self._seq = itertools.count(start, step)
+
+    def __reduce__(self):
+        return (_Count, (_count_value(self._seq), self._step))
 
 
 def count(start=0, step=1):
     """Generator version of ``itertools.count``.
 
     """
-    return Gen(itertools.count(start, step))
+    return _Count(start, step)
 
 
 def Count(start=0, step=1):
@@ -160,8 +568,10 @@ def Count(start=0, step=1):
 def cycle(seq):
     """Generator version of ``itertools.cycle``.
 
+    ``seq`` must be finite.
+
     """
-    return Gen(itertools.cycle(seq))
+    return _Cycle(seq)
 
 
 def Cycle(seq):
@@ -171,6 +581,250 @@ def Cycle(seq):
     return lazy(cycle, seq)
 
 
+class _String(Gen):
+    """Generator of strings formatting the values of a counter.
+
+    """
+
+    def __init__(self, format, counter):
+        self._format = format
+        self._counter = counter
+        self._seq = map(format.__mod__, _iterator(counter))
+
+    def __reduce__(self):
+        return (_String, (self._format, self._counter))
+
+
+def string(format="%i", counter=None):
+    """Generator of strings formatting the values of a counter.
+
+    Each value is ``format % i`` where ``i`` is the next value from
+    ``counter``, by default ``count()``. See also ``template``.
+
+    """
+    return _String(format, _Count() if counter is None else _as_gen(counter))
+
+
+def _iterator(gen):
+    """Return the fastest iterator over the values of ``gen``.
+
+    That's the underlying iterator for generators that don't override
+    ``Gen.__next__``, bypassing the delegation.
+
+    """
+    if type(gen).__next__ is Gen.__next__:
+        return gen._seq
+    return gen
+
+
+class _Block(Gen):
+    """Base class for generators that produce values in blocks.
+
+    Subclasses must implement ``_fill(n, random)``, returning a list
+    of ``n`` values. ``random`` is the source of randomness, a
+    function returning floats in the interval [0, 1). Finite
+    generators may return shorter lists, the generator gets exhausted
+    when ``_fill`` returns an empty list.
+
+    Values are consumed from the blocks by ``itertools`` iterators, so
+    the per value cost is the same as for a ``Gen`` wrapping a list.
+
+    Block generators can be seeded, drawing from a stream of
+    :mod:`arv.factory.rng`, and moved to any position with ``seek`` if
+    the values of a block don't depend on the previous blocks.
+    Subclasses with other sources of randomness get them from
+    ``_rng``, subclasses with state must override ``_reseed`` and
+    ``_seek_block``.
+
+    When pickled the values left in the current block and the stream
+    are kept. Subclasses holding state that can't be pickled must
+    override ``__getstate__`` and ``__setstate__``.
+
+    The values of seeded generators can be memoized, see
+    :mod:`arv.factory.memo`. The state not in ``_POSITION`` must be
+    the configuration of the generator, it's part of the memo keys.
+
+    Subclasses may implement ``_draw(n)``, returning an iterator of
+    ``n`` values drawn one by one from the ``random`` module, used
+    while the generator isn't seeded. Then no values are computed
+    ahead and seeding the ``random`` module makes them reproducible.
+
+    """
+
+    block_size = 256
+
+    #: false if the values depend on the values of previous blocks
+    _seekable = True
+
+    #: attributes holding the position or derived from the stream
+    _POSITION = frozenset([
+        "_seq", "_current", "_blocks", "_skip", "_next", "_permutation",
+        "_shuffled", "_fingerprint",
+    ])
+
+    def __init__(self, block_size=None):
+        if block_size is not None:
+            self.block_size = block_size
+        self._stream = None
+        self._blocks = 0
+        self._skip = 0
+        self._current = iter(())
+        self._seq = itertools.chain.from_iterable(
+            iter(self._next_block, None)
+        )
+
+    def _next_block(self):
+        # NOTE: ``None`` is the sentinel that stops the iteration
+        if self._stream is None and self._draws():
+            self._blocks += 1
+            self._skip = 0
+            self._current = self._draw(self.block_size)
+            return self._current
+        block = self._fill(self.block_size, self._rng(self._blocks).random)
+        self._blocks += 1
+        if self._skip:
+            block = block[self._skip:]
+            self._skip = 0
+        if not block:
+            return None
+        self._current = iter(block)
+        return self._current
+
+    def _fill(self, n, random):
+        raise NotImplementedError()
+
+    def _draw(self, n):
+        raise NotImplementedError()
+
+    def _draws(self):
+        return type(self)._draw is not _Block._draw
+
+    def _rng(self, block):
+        """Return the source of randomness for ``block``, an object
+        with the methods of ``random.Random``.
+
+        """
+        if self._stream is None:
+            return random
+        return self._stream.generator(block)
+
+    def _reseed(self):
+        """Discard the state derived from the source of randomness.
+
+        """
+
+    def _seek_block(self, block):
+        """Prepare the generation of ``block``.
+
+        """
+
+    def seed(self, seed, *key):
+        """Draw the values from the stream for ``seed`` and ``key``,
+        see :mod:`arv.factory.rng`.
+
+        The generator restarts from the first value of the stream.
+        Returns the generator.
+
+        """
+        from .rng import Stream
+        self._stream = Stream(seed, *key)
+        self._fingerprint = None
+        self._reseed()
+        self._restart(0)
+        return self
+
+    def seek(self, index):
+        """Move the generator to the value at position ``index``.
+
+        Only the block holding the value is computed, unseeded
+        generators produce new random values. Raises ``TypeError`` if
+        the values depend on the previous ones.
+
+        """
+        if not self._seekable:
+            raise TypeError("%s can't seek" % type(self).__name__)
+        if index < 0:
+            raise ValueError("index must be non negative")
+        self._restart(index)
+
+    def _restart(self, index):
+        self._blocks, self._skip = divmod(index, self.block_size)
+        self._seek_block(self._blocks)
+        # NOTE: the iterators built from ``_seq`` hold the current
+        # block, exhausting it makes them request the new block
+        collections.deque(self._current, maxlen=0)
+
+    def _position(self):
+        """Return the index of the next value.
+
+        """
+        return self._blocks * self.block_size + self._skip \
+            - operator.length_hint(self._current)
+
+    def _memo_key(self):
+        """Return the key of the next values for
+        :mod:`arv.factory.memo`, or ``None`` if they can't be
+        memoized.
+
+        The key is the pickled configuration of the generator,
+        including the stream, and the position.
+
+        """
+        if self.__dict__.get("_stream") is None or not self._seekable:
+            return None
+        fingerprint = self.__dict__.get("_fingerprint")
+        if fingerprint is None:
+            import pickle
+
+            state = self.__getstate__()
+            config = sorted(
+                (k, v) for k, v in state.items() if k not in self._POSITION
+            )
+            try:
+                fingerprint = pickle.dumps((type(self), config), 4)
+            except Exception:
+                # the configuration can't be pickled, a lambda for
+                # instance, the values are never memoized
+                fingerprint = False
+            self._fingerprint = fingerprint
+        if fingerprint is False:
+            return None
+        return (fingerprint, self._position())
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_seq"]
+        if state["_stream"] is None and self._draws():
+            # the values aren't drawn yet, unpickled generators draw
+            # them from the ``random`` module of the process
+            state["_current"] = iter(())
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._seq = itertools.chain(
+            self._current,
+            itertools.chain.from_iterable(iter(self._next_block, None))
+        )
+
+
+class _Cycle(_Block):
+    """Generator version of ``itertools.cycle``.
+
+    """
+
+    def __init__(self, seq):
+        super(_Cycle, self).__init__()
+        items = tuple(seq)
+        # the items are repeated up to a block, short sequences would
+        # call ``_next_block`` too often
+        self._block = items * max(1, self.block_size // (len(items) or 1))
+        self.block_size = len(self._block) or 1
+
+    def _fill(self, n, random):
+        return self._block
+
+
 def choice(seq):
     """Generator version fo ``random.choice``.
 
@@ -178,22 +832,895 @@ def choice(seq):
     values a lazy constructor is not required.
 
     """
-    return mkgen(random.choice, seq)
+    return _Choice(seq)
+
+
+class _Choice(_Block):
+    """Generator version of ``random.choice``.
+
+    """
+
+    def __init__(self, seq):
+        super(_Choice, self).__init__()
+        self._domain = ("seq", seq)
+
+    def _draw(self, n):
+        return map(random.choice, itertools.repeat(self._domain[1], n))
+
+    def _fill(self, n, random):
+        floor = math.floor
+        seq = self._domain[1]
+        size = float(len(seq))
+        return [seq[floor(random() * size)] for _ in range(n)]
+
+
+#: Ranges up to this size are sampled with a single float per value.
+_FLOAT_RANGE = 1 << 52
+
+
+def _randbelow(random, n):
+    """Return an integer in ``range(n)`` for large ``n``, combining
+    several floats from ``random``.
+
+    """
+    value = 0
+    for _ in range(n.bit_length() // 52 + 2):
+        value = (value << 52) | int(random() * _FLOAT_RANGE)
+    return value % n
+
+
+class _RandInt(_Block):
+    """Generator version of ``random.randint``.
+
+    """
+
+    def __init__(self, min, max):
+        if max < min:
+            raise ValueError("empty range for randint(%r, %r)" % (min, max))
+        super(_RandInt, self).__init__()
+        self._domain = ("range", min, max)
+
+    def _draw(self, n):
+        min, max = self._domain[1:]
+        repeat = itertools.repeat
+        return map(random.randrange, repeat(min, n), repeat(max + 1, n))
+
+    def _fill(self, n, random):
+        min, max = self._domain[1:]
+        span = max - min + 1
+        if span > _FLOAT_RANGE:
+            return [min + _randbelow(random, span) for _ in range(n)]
+        floor = math.floor
+        span = float(span)
+        return [min + floor(random() * span) for _ in range(n)]
 
 
 def randint(min, max):
     """Generator version for ``random.randint``.
 
     """
-    return mkgen(random.randint, min, max)
+    return _RandInt(min, max)
 
 
-def string(format="%i", counter=None):
-    if counter is None:
-        counter = itertools.count()
+class _Template(_Block):
+    """Render a constant ``str.format`` template in blocks.
+
+    """
+
+    def __init__(self, format, block_size=None):
+        super(_Template, self).__init__(block_size)
+        self._format = format
+
+    def _fill(self, n, random):
+        return [self._format.format()] * n
+
+
+class _BoundTemplate(Gen):
+    """Render a compiled ``str.format`` template with positional
+    fields only, field ``i`` takes its value from ``gens[i]``.
+
+    """
+
+    def __init__(self, format, gens):
+        self._format = format
+        self._gens = gens
+        self._seq = map(format.format, *[_iterator(g) for g in gens])
+
+    def __reduce__(self):
+        return (_BoundTemplate, (self._format, self._gens))
+
+
+def _escape_braces(s):
+    return s.replace("{", "{{").replace("}", "}}")
+
+
+def template(format, **bindings):
+    """Generator of strings rendering a ``str.format`` template.
+
+    Each placeholder in ``format`` must be bound, using a keyword
+    argument, to a generator or to a constant value:
+
+    >>> from arv.factory.api import gen
+    >>> emails = gen.template(
+    ...     "user-{id:06d}@{domain}",
+    ...     id=gen.count(1),
+    ...     domain="example.com",
+    ... )
+    >>> next(emails)
+    'user-000001@example.com'
+
+    The template is parsed once. Constants are rendered into the
+    template at that time and placeholders bound to the same name
+    share a single value, so ``"{id}-{id}"`` consumes one value from
+    ``id`` per string. Attribute and index lookups are allowed,
+    ``"{user.name}"`` or ``"{point[0]}"``, but the lookup is done on
+    each value.
+
+    Each string consumes one value from each bound generator, when
+    it's rendered. A generator bound to a template and also used by
+    another attribute of a factory gives its values alternately to
+    both of them; use ``computed`` for strings built from other
+    attributes of the object:
+
+    >>> email = gen.computed("user-{:03d}@x.com".format, depends=["id"])
+
+    """
+    formatter = _string.Formatter()
+    parts = []
+    names = []
+    gens = []
+    for literal, field, spec, conversion in formatter.parse(format):
+        parts.append(_escape_braces(literal))
+        if field is None:
+            continue
+        if field == "" or field[0].isdigit():
+            raise ValueError("positional fields are not supported")
+        if "{" in spec:
+            raise ValueError("nested fields are not supported")
+        root = field.split(".", 1)[0].split("[", 1)[0]
+        if root not in bindings:
+            raise KeyError(root)
+        suffix = field[len(root):]
+        conversion = "!" + conversion if conversion else ""
+        spec = ":" + spec if spec else ""
+        value = bindings[root]
+        if isinstance(value, Gen):
+            if root not in names:
+                names.append(root)
+                gens.append(value)
+            parts.append(
+                "{%i%s%s%s}" % (names.index(root), suffix, conversion, spec)
+            )
+        else:
+            rendered = ("{0%s%s%s}" % (suffix, conversion, spec)).format(
+                value
+            )
+            parts.append(_escape_braces(rendered))
+    if gens:
+        return _BoundTemplate("".join(parts), gens)
+    return _Template("".join(parts))
+
 
-    def generator():
-        for i in counter:
-            yield format % i
+# Realistic data providers
+#
+# The vocabularies live in the ``_vocabulary`` module, a string per
+# vocabulary with one entry per line. They are loaded on first use and
+# split into ``_Table`` objects.
 
-    return Gen(generator())
+class _Table(object):
+    """Table of strings.
+
+    """
+
+    def __init__(self, text):
+        # NOTE: the sampled values share the string objects of the
+        # table, the objects built by the factories don't hold a
+        # private copy of each string
+        self._entries = tuple(text.split("\n"))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, i):
+        return self._entries[i]
+
+    def sample(self, n, random):
+        """Return a list of ``n`` entries chosen at random.
+
+        """
+        entries = self._entries
+        floor = math.floor
+        size = float(len(entries))
+        return [entries[floor(random() * size)] for _ in range(n)]
+
+
+_tables = {}
+
+
+def _table(name, case=None):
+    """Return the table for the vocabulary ``name``.
+
+    ``case`` may be ``"lower"`` or ``"title"``.
+
+    """
+    key = (name, case)
+    table = _tables.get(key)
+    if table is None:
+        from . import _vocabulary
+        text = getattr(_vocabulary, name)
+        if case == "lower":
+            text = text.lower()
+        elif case == "title":
+            text = "\n".join(w[:1].upper() + w[1:] for w in text.split("\n"))
+        table = _tables[key] = _Table(text)
+    return table
+
+
+class _TableColumn(object):
+    """Column of entries sampled from a vocabulary."""
+
+    def __init__(self, name, case=None):
+        self._name = name
+        self._case = case
+        self._table = None
+
+    def __call__(self, n, random):
+        if self._table is None:
+            self._table = _table(self._name, self._case)
+        return self._table.sample(n, random)
+
+    def __getstate__(self):
+        return (self._name, self._case)
+
+    def __setstate__(self, state):
+        self._name, self._case = state
+        self._table = None
+
+
+class _IntColumn(object):
+    """Column of integers uniformly distributed in ``[min, max]``."""
+
+    def __init__(self, min, max):
+        self._min = min
+        self._span = float(max - min + 1)
+
+    def __call__(self, n, random):
+        floor = math.floor
+        min, span = self._min, self._span
+        return [min + floor(random() * span) for _ in range(n)]
+
+
+class _BlockColumn(object):
+    """Column of values from another block generator."""
+
+    def __init__(self, gen):
+        self._gen = gen
+
+    def __call__(self, n, random):
+        return self._gen._fill(n, random)
+
+
+class _Compose(_Block):
+    """Compose values from columns with a ``%`` style template.
+
+    If ``template`` is ``None`` there must be a single column and its
+    values are produced unchanged.
+
+    """
+
+    def __init__(self, template, columns, block_size=None):
+        super(_Compose, self).__init__(block_size)
+        self._template = template
+        self._columns = columns
+
+    def _fill(self, n, random):
+        columns = [c(n, random) for c in self._columns]
+        if self._template is None:
+            return columns[0]
+        return list(map(self._template.__mod__, zip(*columns)))
+
+
+def _escape(s):
+    return s.replace("%", "%%")
+
+
+def first_name():
+    """Generator of first names.
+
+    """
+    return _Compose(None, [_TableColumn("FIRST_NAMES")])
+
+
+def last_name():
+    """Generator of last names.
+
+    """
+    return _Compose(None, [_TableColumn("LAST_NAMES")])
+
+
+def name():
+    """Generator of full names, first name plus last name.
+
+    """
+    return _Compose("%s %s", [
+        _TableColumn("FIRST_NAMES"),
+        _TableColumn("LAST_NAMES"),
+    ])
+
+
+def email(domain=None):
+    """Generator of email addresses.
+
+    Addresses look like ``first.last@domain``. If ``domain`` is not
+    given one of the domains reserved for documentation,
+    ``example.com`` and friends, is used.
+
+    """
+    columns = [
+        _TableColumn("FIRST_NAMES", "lower"),
+        _TableColumn("LAST_NAMES", "lower"),
+    ]
+    if domain is None:
+        columns.append(_TableColumn("EMAIL_DOMAINS"))
+        return _Compose("%s.%s@%s", columns)
+    return _Compose("%s.%s@" + _escape(domain), columns)
+
+
+def username():
+    """Generator of user names, like ``alice1234``.
+
+    """
+    return _Compose("%s%i", [
+        _TableColumn("FIRST_NAMES", "lower"),
+        _IntColumn(1, 9999),
+    ])
+
+
+def phone_number():
+    """Generator of fictitious phone numbers, like ``555-0123``.
+
+    """
+    return _Compose("555-%04i", [_IntColumn(0, 9999)])
+
+
+def street_address():
+    """Generator of street addresses, like ``123 Main Street``.
+
+    """
+    return _Compose("%i %s %s", [
+        _IntColumn(1, 9999),
+        _TableColumn("STREET_NAMES"),
+        _TableColumn("STREET_SUFFIXES"),
+    ])
+
+
+def city():
+    """Generator of city names.
+
+    """
+    return _Compose(None, [_TableColumn("CITIES")])
+
+
+def postcode():
+    """Generator of five digit postcodes.
+
+    """
+    return _Compose("%05i", [_IntColumn(0, 99999)])
+
+
+def address():
+    """Generator of full addresses, street, city and postcode.
+
+    """
+    return _Compose("%i %s %s, %s %05i", [
+        _IntColumn(1, 9999),
+        _TableColumn("STREET_NAMES"),
+        _TableColumn("STREET_SUFFIXES"),
+        _TableColumn("CITIES"),
+        _IntColumn(0, 99999),
+    ])
+
+
+def company():
+    """Generator of company names, like ``Smith Holdings``.
+
+    """
+    return _Compose("%s %s", [
+        _TableColumn("LAST_NAMES"),
+        _TableColumn("COMPANY_SUFFIXES"),
+    ])
+
+
+def word():
+    """Generator of *lorem ipsum* words.
+
+    """
+    return _Compose(None, [_TableColumn("LOREM_WORDS")])
+
+
+def sentence(words=8):
+    """Generator of *lorem ipsum* sentences with ``words`` words.
+
+    """
+    if words < 1:
+        raise ValueError("words must be positive")
+    columns = [_TableColumn("LOREM_WORDS", "title")]
+    columns.extend(_TableColumn("LOREM_WORDS") for _ in range(words - 1))
+    return _Compose(" ".join(["%s"] * words) + ".", columns)
+
+
+def paragraph(sentences=4, words=8):
+    """Generator of *lorem ipsum* paragraphs.
+
+    Paragraphs have ``sentences`` sentences of ``words`` words.
+
+    """
+    if sentences < 1:
+        raise ValueError("sentences must be positive")
+    s = sentence(words)
+    return _Compose(
+        " ".join(["%s"] * sentences),
+        [_BlockColumn(s) for _ in range(sentences)]
+    )
+
+
+# Unique values
+
+#: Domains up to this size are shuffled in memory, larger ones are
+#: permuted with a Feistel network.
+UNIQUE_SMALL_DOMAIN = 10000
+
+
+class _Feistel(object):
+    """Pseudo random permutation of ``range(size)``.
+
+    A balanced Feistel network over the smallest even number of bits
+    that can represent ``size - 1`` is a bijection on ``range(2 **
+    bits)``. Values out of ``range(size)`` are fed back to the network
+    (*cycle walking*) until they fall into the range. Since ``2 **
+    bits < 4 * size`` that requires less than four rounds on average.
+
+    """
+
+    ROUNDS = 4
+    MULTIPLIER = 0x9E3779B97F4A7C15
+    MASK64 = (1 << 64) - 1
+
+    def __init__(self, size, rounds=ROUNDS, getrandbits=None):
+        if size < 1:
+            raise ValueError("empty domain")
+        getrandbits = getrandbits or random.getrandbits
+        bits = max((size - 1).bit_length(), 2)
+        bits += bits % 2
+        self._size = size
+        self._half = bits // 2
+        self._mask = (1 << self._half) - 1
+        self._keys = [getrandbits(64) for _ in range(rounds)]
+
+    def __call__(self, x):
+        half, mask, size = self._half, self._mask, self._size
+        keys, mult, mask64 = self._keys, self.MULTIPLIER, self.MASK64
+        while True:
+            left, right = x >> half, x & mask
+            for k in keys:
+                h = ((right ^ k) * mult) & mask64
+                left, right = right, left ^ ((h ^ (h >> 29)) & mask)
+            x = (left << half) | right
+            if x < size:
+                return x
+
+
+class _UniqueRange(_Block):
+    """Integers from ``[min, max]`` in random order, without repeats.
+
+    Memory usage is constant. The generator gets exhausted after
+    producing all the integers in the range.
+
+    """
+
+    def __init__(self, min, max, block_size=None):
+        super(_UniqueRange, self).__init__(block_size)
+        self._min = min
+        self._size = max - min + 1
+        self._permutation = self._permute(self._size, self._rng(-1))
+        self._next = 0
+
+    def _permute(self, size, rng):
+        return _Feistel(size, getrandbits=rng.getrandbits)
+
+    def _reseed(self):
+        self._permutation = self._permute(self._size, self._rng(-1))
+
+    def _seek_block(self, block):
+        self._next = min(block * self.block_size, self._size)
+
+    def _fill(self, n, random):
+        start = self._next
+        stop = self._next = min(start + n, self._size)
+        base, permutation = self._min, self._permutation
+        return [base + permutation(i) for i in range(start, stop)]
+
+    def _position(self):
+        return self._next + self._skip - operator.length_hint(self._current)
+
+
+class _UniqueChoice(_UniqueRange):
+    """Values from a sequence in random order, without repeats.
+
+    """
+
+    def __init__(self, values, block_size=None):
+        super(_UniqueChoice, self).__init__(0, len(values) - 1, block_size)
+        self._values = values
+
+    def _fill(self, n, random):
+        values = self._values
+        return [values[i] for i in super(_UniqueChoice, self)._fill(n, random)]
+
+
+class _Shuffled(_UniqueChoice):
+    """Values from a small sequence in random order, without repeats.
+
+    The values are shuffled in memory.
+
+    """
+
+    def __init__(self, values, block_size=None):
+        super(_Shuffled, self).__init__(values, block_size)
+        self._shuffled = None
+
+    def _permute(self, size, rng):
+        # Fisher-Yates, ``random.shuffle`` doesn't take the source of
+        # randomness
+        order = list(range(size))
+        random = rng.random
+        for i in range(size - 1, 0, -1):
+            j = int(random() * (i + 1))
+            order[i], order[j] = order[j], order[i]
+        return order
+
+    def _reseed(self):
+        super(_Shuffled, self)._reseed()
+        self._shuffled = None
+
+    def _fill(self, n, random):
+        shuffled = self._shuffled
+        if shuffled is None:
+            values = self._values
+            shuffled = [values[i] for i in self._permutation]
+            self._shuffled = shuffled
+        start = self._next
+        self._next = min(start + n, self._size)
+        return shuffled[start:self._next]
+
+
+class _UniqueSet(Gen):
+    """Filter repeated values out of a generator.
+
+    Remembers all the values produced. Raises ``ValueError`` if the
+    inner generator produces ``max_tries`` repeated values in a row.
+
+    """
+
+    def __init__(self, inner, max_tries):
+        self._inner = Gen(inner)
+        self._seen = set()
+        self._max_tries = max_tries
+
+    def __next__(self):
+        seen = self._seen
+        for _ in range(self._max_tries):
+            value = next(self._inner)
+            if value not in seen:
+                seen.add(value)
+                return value
+        raise ValueError(
+            "no unique value after %i tries" % self._max_tries
+        )
+
+
+def unique(inner, max_tries=100, small_domain=None):
+    """Generator of unique values.
+
+    Returns a generator that produces values from ``inner`` without
+    repeating any of them.
+
+    If the domain of ``inner`` is known, as for ``choice`` and
+    ``randint``, the values are produced in random order from a
+    permutation of the domain, the generator gets exhausted after
+    producing all the values in the domain. Domains with up to
+    ``small_domain`` values are shuffled in memory, larger domains are
+    permuted with a Feistel network, using constant memory and time
+    per value:
+
+    >>> from arv.factory.api import gen
+    >>> ids = gen.unique(gen.randint(1, 10 ** 12))
+
+    For other generators the values already produced are remembered
+    and repeated values skipped. ``ValueError`` is raised if
+    ``max_tries`` repeated values are found in a row.
+
+    """
+    if small_domain is None:
+        small_domain = UNIQUE_SMALL_DOMAIN
+    domain = getattr(inner, "_domain", None)
+    if domain is None:
+        return _UniqueSet(inner, max_tries)
+    if domain[0] == "range":
+        min, max = domain[1:]
+        if max - min < small_domain:
+            return _Shuffled(range(min, max + 1))
+        return _UniqueRange(min, max)
+    values = list(domain[1])
+    try:
+        values = list(collections.OrderedDict.fromkeys(values))
+    except TypeError:
+        pass
+    if len(values) <= small_domain:
+        return _Shuffled(values)
+    return _UniqueChoice(values)
+
+
+# Numeric distributions and temporal values
+
+class _Normal(_Block):
+    """Normally distributed floats, Box-Muller transform."""
+
+    def __init__(self, mu, sigma, block_size=None):
+        if sigma < 0:
+            raise ValueError("sigma must be non negative")
+        super(_Normal, self).__init__(block_size)
+        self._mu = mu
+        self._sigma = sigma
+
+    def _fill(self, n, random):
+        mu, sigma = self._mu, self._sigma
+        sqrt, log, cos, sin = math.sqrt, math.log, math.cos, math.sin
+        two_pi = 2.0 * math.pi
+        res = []
+        for _ in range((n + 1) // 2):
+            r = sigma * sqrt(-2.0 * log(1.0 - random()))
+            a = two_pi * random()
+            res.append(mu + r * cos(a))
+            res.append(mu + r * sin(a))
+        if len(res) > n:
+            res.pop()
+        return res
+
+
+class _LogNormal(_Normal):
+    """Log-normally distributed floats."""
+
+    def _fill(self, n, random):
+        return list(map(math.exp, super(_LogNormal, self)._fill(n, random)))
+
+
+class _Exponential(_Block):
+    """Exponentially distributed floats."""
+
+    def __init__(self, lambd, block_size=None):
+        if lambd <= 0:
+            raise ValueError("lambd must be positive")
+        super(_Exponential, self).__init__(block_size)
+        self._scale = -1.0 / lambd
+
+    def _fill(self, n, random):
+        log, scale = math.log, self._scale
+        return [scale * log(1.0 - random()) for _ in range(n)]
+
+
+class _Zipf(_Block):
+    """Integers in ``[1, n]`` following Zipf's law."""
+
+    def __init__(self, s, n, block_size=None):
+        if n < 1:
+            raise ValueError("n must be positive")
+        super(_Zipf, self).__init__(block_size)
+        cdf = []
+        total = 0.0
+        for k in range(1, n + 1):
+            total += 1.0 / k ** s
+            cdf.append(total)
+        self._cdf = cdf
+        self._total = total
+        self._n = n
+
+    def _fill(self, n, random):
+        cdf, total, last = self._cdf, self._total, self._n
+        search = bisect.bisect_right
+        return [
+            min(search(cdf, random() * total) + 1, last) for _ in range(n)
+        ]
+
+
+class _Date(_Block):
+    """Dates uniformly distributed in ``[start, end]``."""
+
+    def __init__(self, start, end, block_size=None):
+        if end < start:
+            raise ValueError("end must not be before start")
+        super(_Date, self).__init__(block_size)
+        self._start = start.toordinal()
+        self._span = float(end.toordinal() - self._start + 1)
+
+    def _fill(self, n, random):
+        start, span, floor = self._start, self._span, math.floor
+        return list(map(
+            _datetime.date.fromordinal,
+            [start + floor(random() * span) for _ in range(n)]
+        ))
+
+
+class _DateTime(_Block):
+    """Datetimes uniformly distributed in ``[start, end)``."""
+
+    def __init__(self, start, end, block_size=None):
+        if end < start:
+            raise ValueError("end must not be before start")
+        super(_DateTime, self).__init__(block_size)
+        self._start = start
+        self._span = (end - start).total_seconds()
+
+    def _fill(self, n, random):
+        start, span = self._start, self._span
+        delta = _datetime.timedelta
+        return [start + delta(0, random() * span) for _ in range(n)]
+
+
+def _seconds(value):
+    if isinstance(value, _datetime.timedelta):
+        return value.total_seconds()
+    return float(value)
+
+
+class _Timestamps(_Block):
+    """Increasing timestamps, ``step`` apart plus a random jitter."""
+
+    _seekable = False
+
+    def __init__(self, start, step, jitter, block_size=None):
+        step, jitter = _seconds(step), _seconds(jitter)
+        if step < 0 or jitter < 0:
+            raise ValueError("step and jitter must be non negative")
+        super(_Timestamps, self).__init__(block_size)
+        self._start = start
+        self._step = step
+        self._jitter = jitter
+        self._reseed()
+
+    def _reseed(self):
+        self._offset = 0.0
+        self._first = True
+
+    def _fill(self, n, random):
+        step, jitter = self._step, self._jitter
+        deltas = [step + jitter * random() for _ in range(n)]
+        if self._first:
+            self._first = False
+            deltas[0] = 0.0
+        deltas[0] += self._offset
+        offsets = list(itertools.accumulate(deltas))
+        self._offset = offsets[-1]
+        start = self._start
+        if isinstance(start, _datetime.date):
+            delta = _datetime.timedelta
+            return [start + delta(0, o) for o in offsets]
+        return [start + o for o in offsets]
+
+
+def normal(mu=0.0, sigma=1.0):
+    """Generator of normally distributed floats.
+
+    """
+    return _Normal(mu, sigma)
+
+
+def Normal(mu=0.0, sigma=1.0):
+    """Lazy constructor for ``normal``.
+
+    """
+    return lazy(normal, mu, sigma)
+
+
+def lognormal(mu=0.0, sigma=1.0):
+    """Generator of log-normally distributed floats.
+
+    The logarithm of the values is normally distributed with mean
+    ``mu`` and standard deviation ``sigma``.
+
+    """
+    return _LogNormal(mu, sigma)
+
+
+def LogNormal(mu=0.0, sigma=1.0):
+    """Lazy constructor for ``lognormal``.
+
+    """
+    return lazy(lognormal, mu, sigma)
+
+
+def exponential(lambd=1.0):
+    """Generator of exponentially distributed floats.
+
+    ``lambd`` is the rate, the mean of the values is ``1 / lambd``.
+
+    """
+    return _Exponential(lambd)
+
+
+def Exponential(lambd=1.0):
+    """Lazy constructor for ``exponential``.
+
+    """
+    return lazy(exponential, lambd)
+
+
+def zipf(s=1.0, n=1000):
+    """Generator of integers in ``[1, n]`` following Zipf's law.
+
+    The probability of ``k`` is proportional to ``1 / k ** s``.
+
+    """
+    return _Zipf(s, n)
+
+
+def Zipf(s=1.0, n=1000):
+    """Lazy constructor for ``zipf``.
+
+    """
+    return lazy(zipf, s, n)
+
+
+def date(start, end):
+    """Generator of dates uniformly distributed in ``[start, end]``.
+
+    """
+    return _Date(start, end)
+
+
+def Date(start, end):
+    """Lazy constructor for ``date``.
+
+    """
+    return lazy(date, start, end)
+
+
+def datetime(start, end):
+    """Generator of datetimes uniformly distributed in ``[start, end)``.
+
+    """
+    return _DateTime(start, end)
+
+
+def DateTime(start, end):
+    """Lazy constructor for ``datetime``.
+
+    """
+    return lazy(datetime, start, end)
+
+
+def timestamps(start, step=1, jitter=0):
+    """Generator of monotonically increasing timestamps.
+
+    The first value is ``start``, each of the following is ``step``
+    plus a random amount between 0 and ``jitter`` after the previous
+    one. ``start`` may be a number or a ``datetime``, ``step`` and
+    ``jitter`` may be numbers of seconds or ``timedelta`` objects.
+
+    >>> import datetime
+    >>> from arv.factory.api import gen
+    >>> events = gen.timestamps(
+    ...     datetime.datetime(2024, 1, 1),
+    ...     step=datetime.timedelta(minutes=1),
+    ...     jitter=datetime.timedelta(seconds=30),
+    ... )
+
+    """
+    return _Timestamps(start, step, jitter)
+
+
+def Timestamps(start, step=1, jitter=0):
+    """Lazy constructor for ``timestamps``.
+
+    """
+    return lazy(timestamps, start, step, jitter)
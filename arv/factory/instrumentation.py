@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+"""Opt-in instrumentation for factories.
+
+Instrumentation is disabled by default. When disabled factories only
+pay for a single attribute lookup per object. Enabling it makes
+factories record:
+
+- counters: ``calls`` (calls to the factory), ``built`` (objects
+  successfully built), ``many`` (calls to ``many``) and, for
+  persistent factories, ``saves``.
+
+- per field timings: time spent consuming value generators
+  (``gen``), building sub-objects with nested factories (``factory``),
+  computing computed attributes (``computed``) and evaluating lazy
+  constructors and metafactories when the factory is first used
+  (``lazy``).
+
+- histograms: latency of the ``_save`` calls (``save``) and of the
+  ``_save_many`` calls (``save_many``), and the sizes of the batches
+  saved by ``make_many`` (``batch_size``).
+
+Metrics are grouped by factory name, the ``instrumentation_name``
+attribute of the factory or, if not defined, the name of its class.
+
+.. code-block:: python
+
+   >>> from arv.factory import instrumentation
+   >>> instrumentation.enable()
+   >>> objs = factory.many(100)
+   >>> instrumentation.registry.dump()
+   {'PersonFactory': {'counters': {...}, 'fields': {...}, ...}}
+   >>> instrumentation.disable()
+
+Metrics can be forwarded to an external system subscribing a callback
+to the registry. The callback receives the kind of metric
+(``"counter"``, ``"timing"`` or ``"histogram"``), the factory name,
+the metric name and the value:
+
+.. code-block:: python
+
+   >>> def to_statsd(kind, factory, metric, value):
+   ...     name = "factory.%s.%s" % (factory, metric)
+   ...     if kind == "counter":
+   ...         statsd.incr(name, value)
+   ...     else:
+   ...         statsd.timing(name, value * 1000)
+   >>> instrumentation.registry.subscribe(to_statsd)
+
+"""
+import bisect
+import contextlib
+import time
+
+
+clock = time.perf_counter
+
+
+#: The registry used by the factories or ``None`` if instrumentation
+#: is disabled.
+active = None
+
+#: Histogram bounds for sizes, see ``Registry.observe``.
+SIZE_BOUNDS = (1, 10, 100, 1000, 10000, 100000)
+
+
+class Histogram(object):
+    """Fixed buckets histogram.
+
+    ``bounds`` are the upper bounds of the buckets, in increasing
+    order. Values greater than the last bound are counted in an extra
+    overflow bucket.
+
+    """
+
+    BOUNDS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0)
+
+    def __init__(self, bounds=None):
+        self.bounds = tuple(bounds or self.BOUNDS)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def as_dict(self):
+        return {
+            "bounds": list(self.bounds),
+            "buckets": list(self.buckets),
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class Registry(object):
+    """Storage for the metrics collected by the factories.
+
+    """
+
+    def __init__(self):
+        self._callbacks = []
+        self.reset()
+
+    def reset(self):
+        """Forget all the collected metrics.
+
+        Subscribed callbacks are kept.
+
+        """
+        self.counters = {}
+        self.timings = {}
+        self.histograms = {}
+
+    def subscribe(self, callback):
+        self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        self._callbacks.remove(callback)
+
+    def incr(self, factory, name, value=1):
+        key = (factory, name)
+        self.counters[key] = self.counters.get(key, 0) + value
+        self._emit("counter", factory, name, value)
+
+    def timing(self, factory, field, kind, seconds, calls=1):
+        # ``calls`` > 1 records the time of a batch of calls
+        key = (factory, field, kind)
+        t = self.timings.get(key)
+        if t is None:
+            t = self.timings[key] = [0, 0.0]
+        t[0] += calls
+        t[1] += seconds
+        self._emit("timing", factory, "%s.%s" % (field, kind), seconds)
+
+    def observe(self, factory, name, value, bounds=None):
+        # ``bounds`` are used when the histogram is created
+        key = (factory, name)
+        h = self.histograms.get(key)
+        if h is None:
+            h = self.histograms[key] = Histogram(bounds)
+        h.observe(value)
+        self._emit("histogram", factory, name, value)
+
+    def dump(self):
+        """Return the collected metrics as a dictionary.
+
+        The dictionary is keyed by factory name. Each value is a
+        dictionary with the keys ``counters``, ``fields`` and
+        ``histograms``.
+
+        """
+        res = {}
+
+        def entry(factory):
+            return res.setdefault(
+                factory,
+                {"counters": {}, "fields": {}, "histograms": {}}
+            )
+
+        for (factory, name), value in self.counters.items():
+            entry(factory)["counters"][name] = value
+        for (factory, field, kind), (count, total) in self.timings.items():
+            fields = entry(factory)["fields"]
+            fields.setdefault(field, {})[kind] = {
+                "count": count,
+                "total": total,
+            }
+        for (factory, name), h in self.histograms.items():
+            entry(factory)["histograms"][name] = h.as_dict()
+        return res
+
+    def _emit(self, kind, factory, name, value):
+        for callback in self._callbacks:
+            callback(kind, factory, name, value)
+
+
+#: The default registry.
+registry = Registry()
+
+
+def enable(reg=None):
+    """Enable instrumentation.
+
+    Metrics are recorded in ``reg`` or in the default registry.
+
+    """
+    global active
+    active = registry if reg is None else reg
+
+
+def disable():
+    """Disable instrumentation.
+
+    """
+    global active
+    active = None
+
+
+@contextlib.contextmanager
+def recording(reg=None):
+    """Context manager that enables instrumentation temporarily.
+
+    Returns the registry in use. If ``reg`` is ``None`` a new
+    registry is created.
+
+    """
+    global active
+    previous = active
+    active = Registry() if reg is None else reg
+    try:
+        yield active
+    finally:
+        active = previous
+
+
+def factory_name(factory):
+    """Name used to group the metrics of ``factory``.
+
+    """
+    return getattr(factory, "instrumentation_name", None) \
+        or type(factory).__name__
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""Memo of the values produced by ``Factory.many``.
+
+Test suites often create the same batch of objects several times, or
+batches differing in a few attributes:
+
+.. code-block:: python
+
+   >>> from arv.factory.memo import BatchMemo
+   >>> class OrderFactory(Factory):
+   ...     seed = 42
+   ...     memo = BatchMemo(max_bytes=64 * 2 ** 20)
+   ...     defaults = {...}
+   >>> open_orders = OrderFactory().many(10000)
+   >>> closed_orders = OrderFactory().many(10000, status="closed")
+
+A factory with a ``memo`` stores the values of each attribute
+computed by ``many`` as a column. The key of a column is the
+configuration of the generator, its seed and its position. When
+``many`` needs the same values again, because the factory was
+created again or the generator moved back with ``seek``, the column
+is reused and the generator moved forward as if it had computed the
+values. Overridden attributes and computed attributes are computed
+again, so the objects are the same created without the memo.
+
+Only the values of seeded generators that can seek are memoized, see
+:mod:`arv.factory.rng`, and not if they're shared with other
+attributes, nested factories or the arguments of ``many``. The
+least recently used columns are evicted when the estimated size
+exceeds ``max_bytes``. A memo may be shared by several factories,
+setting it on a base class for instance.
+
+"""
+import collections
+import itertools
+import sys
+
+from .generators import _Block
+
+
+class BatchMemo(object):
+    """LRU memo of columns, bounded by their estimated size.
+
+    ``hits``, ``misses`` and ``evictions`` count the columns reused,
+    computed and evicted.
+
+    """
+
+    #: number of values whose size is measured for estimating the
+    #: size of a column
+    SAMPLE = 64
+
+    def __init__(self, max_bytes=64 * 2 ** 20):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._columns = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._columns)
+
+    def clear(self):
+        """Remove all the columns.
+
+        """
+        self._columns.clear()
+        self.bytes = 0
+
+    def column(self, gen, count):
+        """Return the next ``count`` values of ``gen`` as a list.
+
+        Returns ``None`` if the values of ``gen`` can't be memoized.
+
+        """
+        key = gen._memo_key() if isinstance(gen, _Block) else None
+        if key is None:
+            return None
+        entry = self._columns.get(key)
+        if entry is not None and len(entry[0]) >= count:
+            self._columns.move_to_end(key)
+            self.hits += 1
+            gen.seek(key[1] + count)
+            values = entry[0]
+            return values if len(values) == count else values[:count]
+        self.misses += 1
+        fetch = gen._fetcher()
+        values = [fetch() for _ in range(count)]
+        self._store(key, values)
+        return values
+
+    def _store(self, key, values):
+        size = self._size(values)
+        if size > self.max_bytes:
+            return
+        old = self._columns.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._columns[key] = (values, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted) = self._columns.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    @classmethod
+    def _size(cls, values):
+        """Return the estimated size of ``values``, in bytes.
+
+        """
+        getsizeof = sys.getsizeof
+        size = getsizeof(values)
+        if values:
+            sample = list(itertools.islice(values, cls.SAMPLE))
+            size += sum(map(getsizeof, sample)) * len(values) // len(sample)
+        return size
@@ -2,8 +2,133 @@
 
 # $Id:$
 
-from __future__ import unicode_literals
-from builtins import object
+
+from . import instrumentation
+from .base import RelatedList
+from .generators import Gen
+from .generators import lazy
+
+
+class HiLo(Gen):
+    """Generator of IDs reserved in blocks from a backend sequence.
+
+    The first time a value is requested, and each time a block is
+    exhausted, ``block_size`` consecutive IDs are reserved calling the
+    ``allocator`` with the name of the sequence and the size of the
+    block. The allocator must return the first ID of the block.
+
+    IDs are handed out locally, without contacting the backend, so
+    the IDs of related objects are known before any of them is
+    saved. Different processes reserve different blocks so the IDs
+    never collide. Pickled copies start with a new block.
+
+    When used in a persistent factory the allocator is the factory's
+    ``_reserve_ids`` method, there's no need to pass it explicitly.
+
+    """
+
+    def __init__(self, sequence=None, block_size=100, allocator=None):
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        self.sequence = sequence
+        self.block_size = block_size
+        self._allocator = allocator
+        self._seq = iter(())
+
+    def bind(self, allocator):
+        """Set the allocator if not already set.
+
+        """
+        if self._allocator is None:
+            self._allocator = allocator
+
+    def __next__(self):
+        for value in self._seq:
+            return value
+        if self._allocator is None:
+            raise RuntimeError("no allocator for the IDs")
+        first = self._allocator(self.sequence, self.block_size)
+        self._seq = iter(range(first + 1, first + self.block_size))
+        return first
+
+    def __getstate__(self):
+        # the IDs left in the current block aren't pickled, so the
+        # copies never hand out the same IDs
+        state = self.__dict__.copy()
+        state["_seq"] = iter(())
+        return state
+
+
+def hilo(sequence=None, block_size=100):
+    """Lazy constructor for ``HiLo`` generators.
+
+    >>> class UserFactory(DjangoFactory):
+    ...     defaults = {
+    ...         "id": hilo("user_id_seq", block_size=1000),
+    ...         "name": "Bob",
+    ...     }
+
+    """
+    return lazy(HiLo, sequence, block_size)
+
+
+class AdaptiveBatchSize(object):
+    """Batch size tuned for saving the most objects per second.
+
+    Used as the ``batch_size`` of a persistent factory. After saving a
+    batch of ``size`` objects the size is multiplied, or divided, by
+    ``factor``, within ``[min, max]``. The direction is reversed when
+    the throughput drops, and the factor shrinks, down to
+    ``MIN_FACTOR``, so the size settles around the best one. Batches
+    taking longer than ``max_latency`` seconds, if given, always
+    shrink the size.
+
+    ``size`` is the current size. Once it settles it may be pinned,
+    setting it as the ``batch_size`` of the factory.
+
+    """
+
+    MIN_FACTOR = 1.1
+
+    #: relative drop of the throughput considered noise
+    TOLERANCE = 0.05
+
+    def __init__(self, min=10, max=10000, start=None, factor=2.0,
+                 max_latency=None):
+        if not 1 <= min <= max:
+            raise ValueError("bounds must satisfy 1 <= min <= max")
+        if factor <= 1:
+            raise ValueError("factor must be greater than 1")
+        if start is None:
+            start = 100
+        self.min = min
+        self.max = max
+        self.factor = factor
+        self.max_latency = max_latency
+        self.size = self._clamp(start)
+        self._direction = 1
+        self._throughput = None
+
+    def _clamp(self, size):
+        return int(round(max(self.min, min(size, self.max))))
+
+    def record(self, size, seconds):
+        """Record that saving ``size`` objects took ``seconds`` and
+        update ``size``.
+
+        """
+        throughput = size / seconds if seconds > 0 else float("inf")
+        if self.max_latency is not None and seconds > self.max_latency:
+            self._direction = -1
+        elif self._throughput is not None and \
+                throughput < self._throughput * (1 - self.TOLERANCE):
+            self._direction = -self._direction
+            self.factor = max(self.MIN_FACTOR, self.factor ** 0.5)
+        self._throughput = throughput
+        if self._direction > 0:
+            self.size = self._clamp(max(size * self.factor, size + 1))
+        else:
+            self.size = self._clamp(min(size / self.factor, size - 1))
 
 
 class PersistanceMixin(object):
@@ -26,23 +151,147 @@ class PersistanceMixin(object):
     - ``_save(obj)``: persists the object in the backend and returns
       the object.
 
+    Factories using ``HiLo`` generators must define the method
+    ``_reserve_ids(sequence, count)`` too. It must reserve ``count``
+    consecutive IDs from the backend's ``sequence``, in a single round
+    trip if possible, and return the first one.
+
+    Lists of related objects, see ``gen.related``, are saved after
+    the object. ``link_children(parent, name, children)`` links them
+    to the saved parent, and they're saved calling ``_save_many(objs)``
+    of the factory that created them, or of this factory if it isn't
+    persistent. By default ``_save_many`` calls ``_save`` for each
+    object, backends supporting bulk inserts should override it.
+
+    ``make_many`` saves the objects one by one, unless ``batch_size``
+    is given. Then the objects are created with ``many`` and saved
+    with ``_save_many`` in batches of that size. ``batch_size`` may
+    be an ``AdaptiveBatchSize``, tuning the size while saving. The
+    sizes are recorded by the instrumentation (``batch_size``).
+
     """
 
+    batch_size = None
+
+    def _resolve(self):
+        super(PersistanceMixin, self)._resolve()
+        for v in self._defaults.values():
+            if isinstance(v, HiLo):
+                v.bind(self._reserve_ids)
+
     def make(self, **kwargs):
         obj = self(**kwargs)
+        if self.deferred:
+            obj = obj.materialize()
         if self._is_persistable(obj):
             return self._persist(obj)
         raise ValueError("Non persistable object.")
 
     def make_many(self, count, **kwargs):
-        return self._many(count, self.make, kwargs)
+        if self.batch_size is None:
+            return self._many(count, self.make, kwargs)
+        return self._make_batches(count, kwargs)
+
+    def _make_batches(self, count, kwargs):
+        tuner = self.batch_size
+        if not isinstance(tuner, AdaptiveBatchSize):
+            if tuner < 1:
+                raise ValueError("batch_size must be positive")
+            tuner = None
+        clock = instrumentation.clock
+        res = []
+        while len(res) < count:
+            size = self.batch_size if tuner is None else tuner.size
+            n = min(size, count - len(res))
+            objs = self.many(n, **kwargs)
+            if self.deferred:
+                objs = [obj.materialize() for obj in objs]
+            for obj in objs:
+                if not self._is_persistable(obj):
+                    raise ValueError("Non persistable object.")
+            t = clock()
+            objs = self._persist_many(objs)
+            if tuner is not None and n == size:
+                # the last batch is usually smaller, not comparable
+                tuner.record(n, clock() - t)
+            if instrumentation.active is not None:
+                instrumentation.active.observe(
+                    instrumentation.factory_name(self), "batch_size", n,
+                    instrumentation.SIZE_BOUNDS
+                )
+            res.extend(objs)
+        return res
+
+    def profile_make(self, count, **kwargs):
+        """Profile the creation and persistance of ``count`` objects.
+
+        Like ``profile`` but using ``make_many``.
+
+        """
+        from .profiling import profile
+        return profile(self, count, kwargs, persist=True)
 
     def _persist(self, obj):
+        related = self._persist_fields(obj)
+        if instrumentation.active is not None:
+            obj = self._instrumented_save(instrumentation.active, obj)
+        else:
+            obj = self._save(obj)
+        if related:
+            self._persist_related(obj, related)
+        return obj
+
+    def _persist_many(self, objs):
+        related = [self._persist_fields(obj) for obj in objs]
+        if instrumentation.active is not None:
+            objs = self._instrumented_save_many(instrumentation.active, objs)
+        else:
+            objs = self._save_many(objs)
+        for obj, r in zip(objs, related):
+            if r:
+                self._persist_related(obj, r)
+        return objs
+
+    def _persist_fields(self, obj):
+        """Persist the subobjects of ``obj``.
+
+        Returns the lists of related objects, to be persisted after
+        ``obj``.
+
+        """
+        related = []
         for k, v in self._get_fields(obj):
-            if self._is_persistable(v):
+            if isinstance(v, RelatedList):
+                related.append((k, v))
+            elif self._is_persistable(v):
                 v = self._persist(v)
                 self._link_to_parent(obj, k, v)
-        return self._save(obj)
+        return related
+
+    def _persist_related(self, parent, related):
+        for k, children in related:
+            factory = children.factory
+            if not isinstance(factory, PersistanceMixin):
+                factory = self
+            if children and factory._is_persistable(children[0]):
+                self._link_children(parent, k, children)
+                factory._persist_many(children)
+
+    def _instrumented_save(self, registry, obj):
+        name = instrumentation.factory_name(self)
+        t = instrumentation.clock()
+        res = self._save(obj)
+        registry.observe(name, "save", instrumentation.clock() - t)
+        registry.incr(name, "saves")
+        return res
+
+    def _instrumented_save_many(self, registry, objs):
+        name = instrumentation.factory_name(self)
+        t = instrumentation.clock()
+        res = self._save_many(objs)
+        registry.observe(name, "save_many", instrumentation.clock() - t)
+        registry.incr(name, "saves", len(objs))
+        return res
 
     def _get_fields(self, obj):
         raise NotImplementedError()
@@ -53,5 +302,14 @@ class PersistanceMixin(object):
     def _link_to_parent(self, parent, name, child):
         pass
 
+    def _link_children(self, parent, name, children):
+        pass
+
     def _save(self, obj):
         raise NotImplementedError()
+
+    def _save_many(self, objs):
+        return [self._save(obj) for obj in objs]
+
+    def _reserve_ids(self, sequence, count):
+        raise NotImplementedError()
@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+
+"""Objects created in the background.
+
+Load generators consuming objects as fast as they can send them
+shouldn't spend their time creating them. ``Factory.producer``
+creates the objects in a background thread, or in worker processes,
+into a bounded queue:
+
+.. code-block:: python
+
+   >>> with UserFactory().producer(n=100000, queue_size=2048) as users:
+   ...     for user in users:
+   ...         client.post("/users", json=user)
+   >>> users.stats()
+   {'consumed': 100000, 'queued': 0, 'max_queued': 2048, ...}
+
+The producer works ahead of the consumer until the queue is full, then
+waits for it, so memory usage is bounded. Producers are iterables and
+async iterables, waiting for the objects in a thread of the default
+executor doesn't block the event loop:
+
+.. code-block:: python
+
+   >>> async for user in UserFactory().producer():
+   ...     await session.post("/users", json=user)
+
+The objects are created with ``many``, in chunks of up to ``CHUNK``
+objects, and queued in chunks. A thread producer uses the factory, it
+must not be used by other threads meanwhile. Process producers,
+``processes=True``, use ``workers`` pickled copies of the factory
+and the workers pickle the chunks of objects too, objects that can't
+be pickled raise in the consumer.
+
+Each worker gets its own slice of the values of the generators: the
+copies of the counters and of the generators that can ``seek`` start
+where the previous worker stops, or ``SPAN`` values apart if ``n`` is
+``None``; finite generators like ``unique`` need ``n``. Functions,
+``mkgen``, are called by each worker and ``HiLo`` generators reserve
+their own blocks. Factories with other generators, with related
+objects or with generators used by several attributes can't be split,
+they raise ``ValueError`` if there're several workers.
+
+Errors raised while creating the objects are raised by the consumer.
+Iterating the producer stops the background work when all the
+objects are consumed; ``close`` stops it before.
+
+"""
+import asyncio
+import copyreg
+import io
+import pickle
+import queue as _queue
+import threading
+import time
+import weakref
+
+from . import instrumentation
+from .base import Factory
+from .generators import Gen
+from .generators import _BoundTemplate
+from .generators import _Block
+from .generators import _Call
+from .generators import _Count
+from .generators import _count_value
+from .generators import _Map
+from .generators import _Related
+from .generators import _String
+from .generators import _Zip
+from .persistance import HiLo
+
+
+#: maximum number of objects created and queued at once
+CHUNK = 64
+
+#: distance between the slices of values of the workers of endless
+#: producers
+SPAN = 2 ** 32
+
+# seconds between checks of the stop event and of the workers
+_POLL = 0.1
+
+
+class _Failure(object):
+    """Exception raised by a worker, queued for the consumer.
+
+    """
+
+    def __init__(self, exc):
+        self.exc = exc
+
+
+def _put(q, item, stop):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL)
+            return True
+        except _queue.Full:
+            continue
+    return False
+
+
+def _dumps(obj):
+    """Pickle ``obj`` for a process queue.
+
+    """
+    from multiprocessing.reduction import ForkingPickler
+    return bytes(ForkingPickler.dumps(obj))
+
+
+def _work(factory, n, kwargs, chunk, q, stop, encode=None):
+    """Create ``n`` objects, or until stopped if ``None``, and put
+    them in ``q`` in chunks, encoded with ``encode`` if given.
+    ``None`` is put at the end.
+
+    """
+    try:
+        while n is None or n > 0:
+            size = chunk if n is None else min(chunk, n)
+            objs = factory.many(size, **kwargs)
+            if encode is not None:
+                # NOTE: process queues pickle the items in a feeder
+                # thread, which only prints the errors
+                objs = encode(objs)
+            if not _put(q, objs, stop):
+                return
+            # let a consumer back from I/O take the GIL
+            time.sleep(0)
+            if n is not None:
+                n -= size
+    except Exception as e:
+        _put(q, _Failure(e), stop)
+        return
+    _put(q, None, stop)
+
+
+def _shares(n, workers):
+    """Return the number of objects and the offset of each worker.
+
+    """
+    if n is None:
+        return [(None, i * SPAN) for i in range(workers)]
+    share, extra = divmod(n, workers)
+    res = []
+    offset = 0
+    for i in range(workers):
+        size = share + (i < extra)
+        res.append((size, offset))
+        offset += size
+    return res
+
+
+def _blocks(values, seen):
+    """Return the block generators among the generators in
+    ``values``, factories and overrides included.
+
+    Raises ``ValueError`` if some values can't be split among
+    workers.
+
+    """
+    res = []
+    stack = list(values)
+    while stack:
+        value = stack.pop()
+        if isinstance(value, (Factory, Gen)):
+            if id(value) in seen:
+                raise ValueError(
+                    "generators used by several attributes can't be split"
+                    " among workers"
+                )
+            seen.add(id(value))
+        if isinstance(value, Factory):
+            stack.extend(value._defaults.values())
+        elif isinstance(value, _Related):
+            raise ValueError(
+                "related objects can't be split among workers"
+            )
+        elif not isinstance(value, Gen):
+            continue
+        elif isinstance(value, _Block):
+            if not value._seekable:
+                raise ValueError(
+                    "%s can't be split among workers" % type(value).__name__
+                )
+            res.append(value)
+        elif type(value) is _Map:
+            stack.append(value._source)
+        elif type(value) is _String:
+            stack.append(value._counter)
+        elif type(value) is _Zip:
+            stack.extend(value._sources)
+        elif type(value) is _BoundTemplate:
+            stack.extend(value._gens)
+        elif not isinstance(value, (_Count, _Call, HiLo)):
+            raise ValueError(
+                "%s can't be split among workers" % type(value).__name__
+            )
+    return res
+
+
+def _partition(factory, kwargs, offset):
+    """Return copies of ``factory`` and ``kwargs`` whose generators
+    start ``offset`` values ahead.
+
+    """
+    _blocks([factory] + list(kwargs.values()), set())
+    buf = io.BytesIO()
+    pickler = pickle.Pickler(buf, pickle.HIGHEST_PROTOCOL)
+    # NOTE: counters can't seek, the copies start ahead
+    pickler.dispatch_table = dict(copyreg.dispatch_table)
+    pickler.dispatch_table[_Count] = lambda c: (
+        _Count, (_count_value(c._seq) + offset * c._step, c._step)
+    )
+    pickler.dump((factory, kwargs))
+    factory, kwargs = pickle.loads(buf.getvalue())
+    for g in _blocks([factory] + list(kwargs.values()), set()):
+        g.seek(g._position() + offset)
+    return factory, kwargs
+
+
+class Producer(object):
+    """Iterable of objects created in the background, see
+    ``Factory.producer``.
+
+    """
+
+    def __init__(self, factory, n=None, queue_size=1024, workers=1,
+                 processes=False, kwargs=None):
+        if queue_size < 1:
+            raise ValueError("queue_size must be positive")
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        if workers > 1 and not processes:
+            raise ValueError("threads can't create objects concurrently")
+        chunk = min(CHUNK, queue_size)
+        self._chunk = chunk
+        maxsize = max(1, queue_size // chunk)
+        kwargs = kwargs or {}
+        shares = _shares(n, workers)
+        if workers > 1:
+            shares = [
+                (size, _partition(factory, kwargs, offset))
+                for size, offset in shares
+            ]
+        else:
+            shares = [(size, (factory, kwargs)) for size, _ in shares]
+        if processes:
+            import multiprocessing
+            self._queue = multiprocessing.Queue(maxsize)
+            self._stop = multiprocessing.Event()
+            start = multiprocessing.Process
+            encode = _dumps
+        else:
+            self._queue = _queue.Queue(maxsize)
+            self._stop = threading.Event()
+            start = threading.Thread
+            encode = None
+        self._workers = [
+            start(target=_work, args=(f, size, kw, chunk, self._queue,
+                                      self._stop, encode))
+            for size, (f, kw) in shares
+        ]
+        self._running = len(self._workers)
+        self._lock = threading.Lock()
+        self.consumed = 0
+        self.max_queued = 0
+        self.starved = 0
+        self._start = instrumentation.clock()
+        # NOTE: the workers don't reference ``self``, an abandoned
+        # producer stops them when collected
+        weakref.finalize(self, self._stop.set)
+        for w in self._workers:
+            w.daemon = True
+            w.start()
+
+    def __iter__(self):
+        while True:
+            chunk = self._next_chunk()
+            if chunk is None:
+                return
+            yield from chunk
+
+    async def _aiter(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            chunk = await loop.run_in_executor(None, self._next_chunk)
+            if chunk is None:
+                return
+            for obj in chunk:
+                yield obj
+
+    def __aiter__(self):
+        return self._aiter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _next_chunk(self):
+        """Return the next chunk of objects, waiting for it, or
+        ``None`` when there're no more.
+
+        """
+        with self._lock:
+            while self._running:
+                queued = self._queued()
+                if queued is not None and queued > self.max_queued:
+                    self.max_queued = queued
+                try:
+                    item = self._queue.get_nowait()
+                except _queue.Empty:
+                    self.starved += 1
+                    item = self._wait()
+                if item is None:
+                    self._running -= 1
+                elif isinstance(item, _Failure):
+                    self._close()
+                    raise item.exc
+                else:
+                    if isinstance(item, bytes):
+                        item = pickle.loads(item)
+                    self.consumed += len(item)
+                    return item
+            self._close()
+            return None
+
+    def _wait(self):
+        while True:
+            try:
+                return self._queue.get(timeout=_POLL)
+            except _queue.Empty:
+                if not any(w.is_alive() for w in self._workers):
+                    # NOTE: the queue of processes is fed by a thread,
+                    # the last items may arrive after the worker exits
+                    try:
+                        return self._queue.get(timeout=_POLL)
+                    except _queue.Empty:
+                        self._close()
+                        raise RuntimeError("the workers died")
+
+    def _queued(self):
+        try:
+            return self._queue.qsize() * self._chunk
+        except NotImplementedError:  # pragma: no cover
+            # not available for process queues on some platforms
+            return None
+
+    def close(self):
+        """Stop the background work and wait for the workers.
+
+        """
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        self._running = 0
+        self._stop.set()
+        # the workers waiting for room in the queue see the event
+        # after a poll interval. Worker processes exit once the chunks
+        # they queued are written to the pipe, so the queue is drained
+        # while waiting for them. The objects left are discarded.
+        workers = self._workers
+        while True:
+            self._drain()
+            workers = [w for w in workers if w.is_alive()]
+            if not workers:
+                break
+            workers[0].join(_POLL / 10)
+        self._drain()
+        if hasattr(self._queue, "close"):
+            self._queue.close()
+            self._queue.join_thread()
+
+    def _drain(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except (_queue.Empty, OSError, ValueError):
+                return
+
+    def stats(self):
+        """Return a dictionary with the statistics of the producer.
+
+        - ``consumed``: objects handed to the consumer.
+        - ``queued``: objects waiting in the queue, approximately.
+        - ``max_queued``: maximum of ``queued`` seen by the consumer.
+        - ``starved``: times the consumer found the queue empty and
+          had to wait for the workers.
+        - ``seconds``: time since the producer was created.
+        - ``throughput``: objects consumed per second.
+
+        """
+        seconds = instrumentation.clock() - self._start
+        return {
+            "consumed": self.consumed,
+            "queued": self._queued() if self._running else 0,
+            "max_queued": self.max_queued,
+            "starved": self.starved,
+            "seconds": seconds,
+            "throughput": self.consumed / seconds if seconds else 0.0,
+        }
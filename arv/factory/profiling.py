@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+
+"""One-shot profiling of factories.
+
+``profile`` creates some objects with a factory while tracing memory
+allocations with ``tracemalloc``, recording instrumentation metrics
+(see :mod:`arv.factory.instrumentation`) and sampling the stack of the
+running thread at regular intervals. The result is a
+``ProfileReport``:
+
+.. code-block:: python
+
+   >>> report = PersonFactory().profile(1000)
+   >>> print(report.as_text())
+   >>> report.as_json()
+
+It's also available from the command line:
+
+.. code-block:: sh
+
+   $ python -m arv.factory.profiling myproject.factories:PersonFactory -n 1000
+
+.. note:: memory tracing and the instrumentation slow down the
+          factories, the reported times are useful for comparing
+          fields and factories against each other, not as absolute
+          values.
+
+"""
+import argparse
+import collections
+import importlib
+import json
+import sys
+import threading
+import tracemalloc
+
+from . import instrumentation
+
+
+DEFAULT_INTERVAL = 0.001
+DEFAULT_TOP = 10
+
+
+class Sampler(threading.Thread):
+    """Sample the stack of a thread at regular intervals.
+
+    Counts how many times each function, identified by ``(filename,
+    lineno, name)`` of its definition, is found at the top of the
+    stack of the sampled thread.
+
+    """
+
+    def __init__(self, thread_id, interval=DEFAULT_INTERVAL):
+        super(Sampler, self).__init__()
+        self.daemon = True
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = collections.Counter()
+        self.total = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            code = frame.f_code
+            self.samples[
+                (code.co_filename, code.co_firstlineno, code.co_name)
+            ] += 1
+            self.total += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class ProfileReport(object):
+    """Result of profiling a factory.
+
+    """
+
+    def __init__(self, factory, count, elapsed, allocated, peak, metrics,
+                 samples, total_samples, top=DEFAULT_TOP):
+        self.factory = factory
+        self.count = count
+        self.elapsed = elapsed
+        self.allocated = allocated
+        self.peak = peak
+        self.metrics = metrics
+        self.samples = samples
+        self.total_samples = total_samples
+        self.top = top
+
+    def nested_factories(self):
+        """Time spent in nested factories.
+
+        Returns a list of dictionaries with the keys ``factory``,
+        ``field``, ``count``, ``total`` and ``mean``, sorted by total
+        time in decreasing order.
+
+        """
+        return self._field_timings("factory")
+
+    def generators(self):
+        """Time spent consuming generators, slowest first.
+
+        """
+        return self._field_timings("gen")[:self.top]
+
+    def hotspots(self):
+        """Functions found more often on top of the stack.
+
+        """
+        res = []
+        for (filename, lineno, name), n in self.samples.most_common(self.top):
+            res.append({
+                "function": name,
+                "location": "%s:%i" % (filename, lineno),
+                "samples": n,
+                "ratio": float(n) / self.total_samples,
+            })
+        return res
+
+    def as_dict(self):
+        count = self.count or 1
+        return {
+            "factory": self.factory,
+            "count": self.count,
+            "elapsed": self.elapsed,
+            "time_per_object": self.elapsed / count,
+            "bytes_per_object": float(self.allocated) / count,
+            "allocated": self.allocated,
+            "peak": self.peak,
+            "nested_factories": self.nested_factories(),
+            "generators": self.generators(),
+            "hotspots": self.hotspots(),
+            "metrics": self.metrics,
+        }
+
+    def as_json(self, indent=2):
+        return json.dumps(self.as_dict(), indent=indent, sort_keys=True)
+
+    def as_text(self):
+        d = self.as_dict()
+        lines = [
+            "Factory: %s" % d["factory"],
+            "Objects: %i" % d["count"],
+            "Elapsed: %.6f s (%.3f us/object)" % (
+                d["elapsed"], d["time_per_object"] * 1e6
+            ),
+            "Memory: %.1f bytes/object, %i bytes peak" % (
+                d["bytes_per_object"], d["peak"]
+            ),
+        ]
+        if d["nested_factories"]:
+            lines.append("")
+            lines.append("Nested factories:")
+            for t in d["nested_factories"]:
+                lines.append(self._format_timing(t))
+        if d["generators"]:
+            lines.append("")
+            lines.append("Slowest generators:")
+            for t in d["generators"]:
+                lines.append(self._format_timing(t))
+        if d["hotspots"]:
+            lines.append("")
+            lines.append("Hotspots (%i samples):" % self.total_samples)
+            for h in d["hotspots"]:
+                lines.append("  %5.1f%% %s (%s)" % (
+                    h["ratio"] * 100, h["function"], h["location"]
+                ))
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.as_text()
+
+    def _field_timings(self, kind):
+        res = []
+        for factory, m in self.metrics.items():
+            for field, kinds in m["fields"].items():
+                if kind in kinds:
+                    t = kinds[kind]
+                    res.append({
+                        "factory": factory,
+                        "field": field,
+                        "count": t["count"],
+                        "total": t["total"],
+                        "mean": t["total"] / t["count"],
+                    })
+        res.sort(key=lambda t: t["total"], reverse=True)
+        return res
+
+    @staticmethod
+    def _format_timing(t):
+        return "  %s.%s: %i calls, %.6f s total, %.3f us/call" % (
+            t["factory"], t["field"], t["count"], t["total"], t["mean"] * 1e6
+        )
+
+
+def profile(factory, count, kwargs=None, persist=False,
+            interval=DEFAULT_INTERVAL, top=DEFAULT_TOP):
+    """Profile the creation of ``count`` objects with ``factory``.
+
+    ``kwargs`` are passed to ``many``, or to ``make_many`` if
+    ``persist`` is true. ``interval`` is the sampling interval in
+    seconds and ``top`` the number of generators and hotspots
+    reported.
+
+    """
+    kwargs = kwargs or {}
+    builder = factory.make_many if persist else factory.many
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    sampler = Sampler(threading.current_thread().ident, interval)
+    try:
+        with instrumentation.recording() as registry:
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            sampler.start()
+            t = instrumentation.clock()
+            objs = builder(count, **kwargs)
+            elapsed = instrumentation.clock() - t
+            sampler.stop()
+            after, peak = tracemalloc.get_traced_memory()
+    finally:
+        if sampler.is_alive():
+            sampler.stop()
+        if started:
+            tracemalloc.stop()
+    del objs
+    return ProfileReport(
+        factory=instrumentation.factory_name(factory),
+        count=max(count, 0),
+        elapsed=elapsed,
+        allocated=after - before,
+        peak=peak - before,
+        metrics=registry.dump(),
+        samples=sampler.samples,
+        total_samples=sampler.total,
+        top=top,
+    )
+
+
+def _load(spec):
+    module_name, _, attr = spec.partition(":")
+    obj = importlib.import_module(module_name)
+    for name in attr.split("."):
+        obj = getattr(obj, name)
+    if isinstance(obj, type):
+        obj = obj()
+    return obj
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m arv.factory.profiling")
+    parser.add_argument(
+        "factory",
+        help="factory or factory class, as 'package.module:name'"
+    )
+    parser.add_argument("-n", "--count", type=int, default=1000)
+    parser.add_argument("--make", action="store_true",
+                        help="persist the objects using 'make_many'")
+    parser.add_argument("--json", action="store_true",
+                        help="output the report as JSON")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    args = parser.parse_args(argv)
+
+    report = profile(_load(args.factory), args.count, persist=args.make,
+                     interval=args.interval, top=args.top)
+    print(report.as_json() if args.json else report.as_text())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
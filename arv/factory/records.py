@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+"""Compact record constructors.
+
+By default factories create dictionaries. For big in-memory datasets
+the constructors in this module create smaller objects: instances of
+a class with ``__slots__`` or tuples with named fields.
+
+.. code-block:: python
+
+   >>> from arv.factory.records import Slots
+   >>> class PersonFactory(Factory):
+   ...     constructor = Slots()
+   ...     defaults = {"name": "Bob", "age": 42}
+   >>> p = PersonFactory()()
+   >>> p.name, p.age
+   ('Bob', 42)
+
+The record class is generated when the factory is created, from the
+names of its attributes. Arguments not present in the defaults can't
+be passed when calling the factory and attributes can't be deleted
+with ``DELETE``. Attribute names must be valid python identifiers.
+
+Nested factories still using the ``dict`` constructor build records
+of the same kind unless ``nested=False``.
+
+Factories with ``deferred = True`` return a ``LazyRecord``, a mapping
+whose nested objects are built when first read.
+
+"""
+import collections
+import keyword
+import re
+from collections.abc import Mapping
+
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class RecordConstructor(object):
+    """Base class for the record constructor markers.
+
+    ``name`` is the name of the generated class, by default the name
+    of the factory class with the suffix ``Record``.
+
+    """
+
+    def __init__(self, name=None, nested=True):
+        self.name = name
+        self.nested = nested
+
+    def build(self, name, fields):
+        """Return a class for records with the given ``fields``.
+
+        """
+        raise NotImplementedError()
+
+    def resolve(self, factory, fields):
+        """Return the constructor to be used by ``factory``.
+
+        """
+        name = self.name or type(factory).__name__ + "Record"
+        return self.build(str(name), [str(f) for f in _check(fields)])
+
+
+class Slots(RecordConstructor):
+    """Create instances of a class with ``__slots__``.
+
+    The generated class supports equality, ``repr`` and has an
+    ``_asdict`` method.
+
+    """
+
+    def build(self, name, fields):
+        return make_slots_class(name, fields)
+
+
+class Tuple(RecordConstructor):
+    """Create named tuples, see ``collections.namedtuple``.
+
+    """
+
+    def build(self, name, fields):
+        return collections.namedtuple(name, fields)
+
+
+def _check(fields):
+    fields = list(fields)
+    for f in fields:
+        if not _IDENTIFIER.match(f) or keyword.iskeyword(f):
+            raise ValueError("invalid record field name: %r" % (f, ))
+    return fields
+
+
+class _SlotsRecord(object):
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, f) == getattr(other, f) for f in self.__slots__
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "%s(%s)" % (
+            type(self).__name__,
+            ", ".join("%s=%r" % (f, getattr(self, f)) for f in self.__slots__)
+        )
+
+    def _asdict(self):
+        return collections.OrderedDict(
+            (f, getattr(self, f)) for f in self.__slots__
+        )
+
+
+def make_slots_class(name, fields):
+    """Return a class with ``__slots__`` for ``fields``.
+
+    Its ``__init__`` takes a value for each field, all of them are
+    required.
+
+    """
+    fields = tuple(_check(fields))
+    if fields:
+        body = "\n".join("    __self.%s = %s" % (f, f) for f in fields)
+    else:
+        body = "    pass"
+    source = "def __init__(%s):\n%s\n" % (
+        ", ".join(("__self", ) + fields), body
+    )
+    namespace = {}
+    exec(source, namespace)
+    return type(name, (_SlotsRecord, ), {
+        "__slots__": fields,
+        "__init__": namespace["__init__"],
+    })
+
+
+def materialize(constructor, values, pending):
+    """Build a reserved object, see ``Factory._reserve``.
+
+    """
+    for key, reservation in pending.items():
+        values[key] = materialize(*reservation)
+    return constructor(**values)
+
+
+class LazyRecord(Mapping):
+    """Mapping returned by deferred factories.
+
+    ``values`` has an entry for each field, in order. The fields in
+    ``pending`` hold the reservation of a nested object, a tuple
+    ``(constructor, values, pending)``, that is built the first time
+    the field is read. Fields can be read as items or as attributes.
+
+    ``materialize`` builds the object the factory would have built
+    without ``deferred``.
+
+    """
+
+    __slots__ = ("_constructor", "_values", "_pending")
+
+    def __init__(self, constructor, values, pending):
+        self._constructor = constructor
+        self._values = values
+        self._pending = pending
+
+    def __getitem__(self, key):
+        if key in self._pending:
+            self._values[key] = materialize(*self._pending.pop(key))
+        return self._values[key]
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setitem__(self, key, value):
+        self._pending.pop(key, None)
+        self._values[key] = value
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return "LazyRecord(%s)" % ", ".join(
+            "%s=%s" % (k, "<pending>" if k in self._pending else repr(v))
+            for k, v in self._values.items()
+        )
+
+    def is_pending(self, key):
+        """Return ``True`` if the field ``key`` hasn't been built yet.
+
+        """
+        return key in self._pending
+
+    def materialize(self):
+        """Build all the pending fields and return the actual object.
+
+        """
+        pending, self._pending = self._pending, {}
+        return materialize(self._constructor, self._values, pending)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""Counter based random streams.
+
+By default the random generators draw from the global ``random``
+module, their values can't be reproduced. A seeded generator draws
+from a ``Stream`` instead, a deterministic function of a seed and a
+key:
+
+.. code-block:: python
+
+   >>> from arv.factory.api import gen
+   >>> ages = gen.randint(18, 99).seed(42, "Person", "age")
+   >>> ages.seek(5000000)
+   >>> next(ages)  # the 5000000th age, computed directly
+
+The values are produced in blocks, see ``Gen`` subclasses
+implementing ``seek``. Block ``i`` is drawn from a Mersenne Twister
+seeded with a hash of the stream key and ``i``, so any block can be
+computed without computing the previous ones. That makes the i-th
+value of a seeded generator cheap to regenerate, and the values of a
+generator may be split among processes.
+
+Factories with a ``seed`` seed their generators, the key is the name
+of the factory class and the name of the attribute. Hashes are
+stable, the values are the same on every run, platform and process.
+
+"""
+import random
+
+
+MASK64 = (1 << 64) - 1
+
+
+def mix(x):
+    """Return the *splitmix64* finalizer of ``x``, a 64 bits hash.
+
+    """
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def digest(*parts):
+    """Return a 64 bits hash of ``parts``.
+
+    Unlike ``hash`` the value doesn't change between processes.
+    ``parts`` must have a stable ``repr``, as numbers and strings.
+
+    """
+    # NOTE: hashlib is imported only when seeding
+    import hashlib
+
+    h = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=8)
+    return int.from_bytes(h.digest(), "little")
+
+
+class Stream(object):
+    """Random stream for ``seed`` and ``key``.
+
+    """
+
+    def __init__(self, seed, *key):
+        self.seed = seed
+        self.key = key
+        self._hash = digest(seed, *key)
+        self._generator = random.Random()
+
+    def __reduce__(self):
+        return (Stream, (self.seed, ) + self.key)
+
+    def __eq__(self, other):
+        return isinstance(other, Stream) and \
+            (self.seed, self.key) == (other.seed, other.key)
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return "Stream(%s)" % ", ".join(
+            repr(p) for p in (self.seed, ) + self.key
+        )
+
+    def generator(self, index):
+        """Return a ``random.Random`` for the block ``index``.
+
+        Negative indexes are meant for the values that don't belong
+        to a block, like a permutation. The instance is reused, it's
+        valid until the next call.
+
+        """
+        generator = self._generator
+        generator.seed(mix(self._hash ^ mix(index & MASK64)))
+        return generator
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""Schemas for validating the objects created by factories.
+
+A schema maps attribute names to fields describing their values:
+
+.. code-block:: python
+
+   >>> from arv.factory.schema import Schema, field
+   >>> class PersonFactory(Factory):
+   ...     schema = Schema({
+   ...         "id": field(int, min=1),
+   ...         "name": field(str),
+   ...         "age": field(int, min=0, max=150, nullable=True),
+   ...         "email": field(str, required=False),
+   ...         "pet": Schema({"name": field(str)}),
+   ...     })
+   ...     defaults = {...}
+
+Factories with a schema validate the objects they create and raise
+``SchemaError`` if they don't conform. Nested schemas validate the
+sub-objects, which may be dictionaries or objects with attributes.
+Attributes not in the schema are not checked.
+
+A schema is compiled into a specialized python function the first
+time it's used, and again after being unpickled.
+
+"""
+from collections.abc import Mapping
+
+
+class SchemaError(ValueError):
+    """Raised when an object doesn't conform to a schema.
+
+    """
+
+
+# marker for missing attributes in the generated validators
+_MISSING = object()
+
+
+def _fail(name, message):
+    raise SchemaError("%s: %s" % (name, message))
+
+
+class Field(object):
+    """Description of an attribute, see ``field``.
+
+    """
+
+    def __init__(self, type=None, required=True, nullable=False,
+                 min=None, max=None, choices=None, check=None):
+        self.type = type
+        self.required = required
+        self.nullable = nullable
+        self.min = min
+        self.max = max
+        self.choices = choices
+        self.check = check
+
+
+def field(type=None, required=True, nullable=False, min=None, max=None,
+          choices=None, check=None):
+    """Describe an attribute.
+
+    - ``type``: a type or tuple of types the value must be an
+      instance of, or a ``Schema`` for sub-objects.
+
+    - ``required``: if false the attribute may be missing.
+
+    - ``nullable``: if true the value may be ``None``.
+
+    - ``min`` and ``max``: inclusive bounds of the value.
+
+    - ``choices``: collection of valid values.
+
+    - ``check``: function returning a true value if the value is
+      valid.
+
+    """
+    return Field(type, required, nullable, min, max, choices, check)
+
+
+class Schema(object):
+    """Collection of fields.
+
+    ``fields`` maps attribute names to ``Field`` instances, as
+    returned by ``field``, or to ``Schema`` instances for required
+    sub-objects.
+
+    """
+
+    def __init__(self, fields):
+        self.fields = dict(fields)
+        self._validators = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_validators"] = None
+        return state
+
+    def validate(self, obj, path=""):
+        """Raise ``SchemaError`` if ``obj`` doesn't conform to the
+        schema.
+
+        ``obj`` is a mapping or an object with attributes. ``path`` is
+        prepended to the attribute names in the error messages.
+
+        """
+        if self._validators is None:
+            self._validators = (
+                self._compile("get(%r, _MISSING)", "get = obj.get"),
+                self._compile("getattr(obj, %r, _MISSING)"),
+            )
+        if type(obj) is dict or isinstance(obj, Mapping):
+            return self._validators[0](obj, path)
+        return self._validators[1](obj, path)
+
+    def _compile(self, getter, setup=None):
+        """Return a function validating objects.
+
+        ``getter`` is the expression used for reading an attribute of
+        ``obj``, as a format string taking the attribute name.
+        ``setup`` is a statement executed before reading the
+        attributes.
+
+        """
+        namespace = {"_MISSING": _MISSING, "_fail": _fail}
+        lines = ["def validate(obj, path):"]
+        if setup is not None:
+            lines.append("    " + setup)
+        for i, (name, f) in enumerate(sorted(self.fields.items())):
+            if isinstance(f, Schema):
+                f = Field(f)
+            name = str(name)
+            lines.append("    v = " + getter % name)
+            lines.append("    if v is _MISSING:")
+            if f.required:
+                lines.append("        _fail(path + %r, 'required')" % name)
+            else:
+                lines.append("        pass")
+            if f.nullable:
+                lines.append("    elif v is None:")
+                lines.append("        pass")
+            else:
+                lines.append("    elif v is None:")
+                lines.append(
+                    "        _fail(path + %r, 'must not be None')" % name
+                )
+            lines.append("    else:")
+            lines.extend(self._checks(i, name, f, namespace))
+        lines.append("    return obj")
+        exec("\n".join(lines), namespace)
+        return namespace["validate"]
+
+    @staticmethod
+    def _checks(i, name, f, namespace):
+        res = []
+        if isinstance(f.type, Schema):
+            namespace["s%i" % i] = f.type
+            res.append(
+                "        s%i.validate(v, path + %r)" % (i, name + ".")
+            )
+        elif f.type is not None:
+            namespace["t%i" % i] = f.type
+            res.append("        if not isinstance(v, t%i):" % i)
+            res.append(
+                "            _fail(path + %r, 'unexpected type ' + "
+                "type(v).__name__)" % name
+            )
+        if f.min is not None:
+            namespace["min%i" % i] = f.min
+            res.append("        if v < min%i:" % i)
+            res.append(
+                "            _fail(path + %r, '%%r < %%r' %% (v, min%i))"
+                % (name, i)
+            )
+        if f.max is not None:
+            namespace["max%i" % i] = f.max
+            res.append("        if v > max%i:" % i)
+            res.append(
+                "            _fail(path + %r, '%%r > %%r' %% (v, max%i))"
+                % (name, i)
+            )
+        if f.choices is not None:
+            try:
+                namespace["c%i" % i] = frozenset(f.choices)
+            except TypeError:
+                namespace["c%i" % i] = tuple(f.choices)
+            res.append("        if v not in c%i:" % i)
+            res.append(
+                "            _fail(path + %r, 'invalid choice %%r' %% (v, ))"
+                % name
+            )
+        if f.check is not None:
+            namespace["k%i" % i] = f.check
+            res.append("        if not k%i(v):" % i)
+            res.append(
+                "            _fail(path + %r, 'check failed for %%r' %% (v, ))"
+                % name
+            )
+        if not res:
+            res.append("        pass")
+        return res
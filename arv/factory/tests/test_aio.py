@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import time
+from unittest import TestCase
+
+from ..base import Factory
+from ..generators import Gen, computed, count, lazy, mkgen, related
+from ..records import LazyRecord, Slots
+from ..schema import Schema, SchemaError, field
+
+
+class Source(object):
+    """Async iterator failing if awaited concurrently."""
+
+    def __init__(self, values, delay=0.01):
+        self.values = list(values)
+        self.delay = delay
+        self.running = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.running:
+            raise AssertionError("awaited concurrently")
+        if not self.values:
+            raise StopAsyncIteration
+        self.running = True
+        await asyncio.sleep(self.delay)
+        self.running = False
+        return self.values.pop(0)
+
+
+async def fetch(value, delay=0.05):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def numbers(n):
+    for i in range(n):
+        await asyncio.sleep(0)
+        yield i
+
+
+async def wait(awaitable):
+    return await awaitable
+
+
+def run(awaitable):
+    return asyncio.run(wait(awaitable))
+
+
+class TestGen(TestCase):
+
+    def test_async_iterators_produce_awaitables(self):
+        g = Gen(Source([1, 2]))
+        first, second = next(g), next(g)
+        self.assertEqual(run(first), 1)
+        self.assertEqual(run(second), 2)
+
+    def test_lazy_async_iterables(self):
+        g = lazy(numbers, 3)()
+        self.assertIsInstance(g, Gen)
+        self.assertEqual(run(next(g)), 0)
+
+    def test_not_iterable_raises_TypeError(self):
+        with self.assertRaises(TypeError):
+            Gen(1)
+
+
+class TestAcall(TestCase):
+
+    def setUp(self):
+        class PetFactory(Factory):
+            defaults = {"id": Gen(Source(range(100, 110))), "name": "Rocky"}
+
+        class PersonFactory(Factory):
+            defaults = {
+                "id": lazy(count, 1),
+                "name": mkgen(fetch, "Bob", 0),
+                "pet": PetFactory,
+            }
+
+        self.PersonFactory = PersonFactory
+
+    def test_acall(self):
+        person = run(self.PersonFactory().acall(pet__name="Toby"))
+        self.assertEqual(person, {"id": 1, "name": "Bob",
+                                  "pet": {"id": 100, "name": "Toby"}})
+
+    def test_amany(self):
+        people = run(self.PersonFactory().amany(3))
+        self.assertEqual([p["id"] for p in people], [1, 2, 3])
+        self.assertEqual([p["pet"]["id"] for p in people], [100, 101, 102])
+        self.assertEqual({p["name"] for p in people}, {"Bob"})
+
+    def test_awaitable_arguments(self):
+        person = run(self.PersonFactory().acall(name=fetch("Alice", 0)))
+        self.assertEqual(person["name"], "Alice")
+
+    def test_awaitables_are_gathered(self):
+        factory = Factory(a=mkgen(fetch, 1), b=mkgen(fetch, 2))
+        start = time.time()
+        res = run(factory.amany(10))
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEqual(res, [{"a": 1, "b": 2}] * 10)
+
+    def test_records(self):
+        self.PersonFactory.constructor = Slots()
+        person = run(self.PersonFactory().acall())
+        self.assertEqual((person.name, person.pet.id), ("Bob", 100))
+
+    def test_deferred(self):
+        self.PersonFactory.deferred = True
+        person = run(self.PersonFactory().acall())
+        self.assertIsInstance(person, LazyRecord)
+        self.assertEqual(person.pet, {"id": 100, "name": "Rocky"})
+
+    def test_validation(self):
+        self.PersonFactory.schema = Schema({"name": field(int)})
+        with self.assertRaises(SchemaError):
+            run(self.PersonFactory().amany(2))
+
+    def test_related(self):
+        factory = Factory(lines=related(Factory(name=mkgen(fetch, "a", 0)),
+                                        count=2))
+        order = run(factory.acall())
+        self.assertEqual(order["lines"], [{"name": "a"}, {"name": "a"}])
+
+    def test_computed_attributes_of_async_values_raise_TypeError(self):
+        source = Source(range(3))
+        factory = Factory(a=Gen(source),
+                          b=computed(lambda a: a, depends=["a"]))
+        with self.assertRaises(TypeError):
+            run(factory.acall())
+        self.assertEqual(source.values, [0, 1, 2])
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+import subprocess
+import sys
+from unittest import TestCase
+
+from .. import api
+from .. import base
+from .. import generators
+from .. import persistance
+
+
+def imported_modules(code):
+    """Return the ``arv`` modules imported after running ``code`` in a
+    fresh interpreter.
+
+    """
+    code += "\nimport sys; print(' '.join(sorted(sys.modules)))"
+    out = subprocess.check_output([sys.executable, "-c", code],
+                                  universal_newlines=True)
+    return {m for m in out.split() if m.startswith("arv.")}
+
+
+class TestApi(TestCase):
+
+    def test_names(self):
+        self.assertIs(api.Factory, base.Factory)
+        self.assertIs(api.DELETE, base.DELETE)
+        self.assertIs(api.gen, generators)
+        self.assertIs(api.persistance, persistance)
+
+    def test_unknown_name_raises_AttributeError(self):
+        with self.assertRaises(AttributeError):
+            api.spam
+
+    def test_dir(self):
+        self.assertLessEqual({"DELETE", "Factory", "gen", "persistance"},
+                             set(dir(api)))
+
+    def test_import_is_lazy(self):
+        self.assertEqual(imported_modules("import arv.factory.api"),
+                         {"arv.factory", "arv.factory.api"})
+
+    def test_gen_does_not_load_the_factories(self):
+        modules = imported_modules("from arv.factory.api import gen")
+        self.assertIn("arv.factory.generators", modules)
+        self.assertNotIn("arv.factory.base", modules)
+        self.assertNotIn("arv.factory.persistance", modules)
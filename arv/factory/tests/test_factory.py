@@ -1,18 +1,35 @@
 # -*- coding: utf-8 -*-
 
-from __future__ import unicode_literals
-from builtins import object
-
 import collections
+import pickle
+import random
 from unittest import TestCase
+from unittest import mock
+
+from ..base import DELETE, Factory, RelatedList
+from ..generators import Gen, computed, count, cycle, lazy, related
+from ..generators import Normal, choice, randint, template, timestamps
+from ..generators import unique
+from ..records import Slots
+from ..schema import Schema, SchemaError, field
+
+
+class PetFactory(Factory):
+    defaults = {"id": lazy(count, 100), "name": "Rocky"}
+
+
+class PersonFactory(Factory):
+    schema = Schema({"id": field(int, min=1)})
+    defaults = {
+        "id": lazy(count, 1),
+        "name": "Bob",
+        "pet": PetFactory,
+        "tags": [],
+    }
 
-try:
-    from unittest import mock
-except ImportError:
-    import mock
 
-from ..base import DELETE, Factory
-from ..generators import Gen, lazy
+class PersonRecordFactory(PersonFactory):
+    constructor = Slots()
 
 
 class TestProcessMetafactoryDefaults(TestCase):
@@ -126,6 +143,91 @@ class TestEvalFactoryArguments(TestCase):
         self.assertNotIn("bar", res)
 
 
+class TestCompile(TestCase):
+
+    def setUp(self):
+        self.factory = Factory()
+
+    def test_prototype_and_dynamic_attributes(self):
+        sub = Factory()
+        g = Gen([1, 2])
+        prototype, dynamic = self.factory._compile(
+            {"foo": 1, "bar": g, "baz": sub}
+        )
+        self.assertEqual(prototype, {"foo": 1, "bar": None, "baz": None})
+        dynamic = dict((k, (kind, v)) for k, kind, v in dynamic)
+        self.assertEqual(dynamic["baz"], (2, sub))
+        self.assertEqual(dynamic["bar"][0], 1)
+        self.assertEqual(dynamic["bar"][1](), 1)
+
+    def test_build(self):
+        factory = Factory(foo=1, bar=Gen([1, 2]), baz=Factory(spam=1))
+        self.assertEqual(
+            factory._build({"": {"foo": DELETE}, "baz": {"spam": 2}}),
+            {"bar": 1, "baz": {"spam": 2}}
+        )
+
+    def test_preserves_attribute_order(self):
+        factory = Factory(a=1, b=Gen([2]), c=3)
+        self.assertEqual(list(factory()), ["a", "b", "c"])
+
+    def test_invalid_copy_literals_raises_ValueError(self):
+        class MyFactory(Factory):
+            copy_literals = "always"
+
+        with self.assertRaises(ValueError):
+            MyFactory()
+
+
+class TestCopyLiterals(TestCase):
+
+    def make_factory(self, policy):
+        class MyFactory(Factory):
+            copy_literals = policy
+            defaults = {"tags": [["a"]], "name": "Bob"}
+
+        return MyFactory()
+
+    def test_literals_are_shared_by_default(self):
+        factory = self.make_factory(None)
+        self.assertIs(factory()["tags"], factory()["tags"])
+
+    def test_shallow(self):
+        factory = self.make_factory("shallow")
+        obj1, obj2 = factory(), factory()
+        self.assertEqual(obj1["tags"], [["a"]])
+        self.assertIsNot(obj1["tags"], obj2["tags"])
+        self.assertIs(obj1["tags"][0], obj2["tags"][0])
+
+    def test_deep(self):
+        factory = self.make_factory("deep")
+        obj1, obj2 = factory(), factory()
+        self.assertEqual(obj1["tags"], [["a"]])
+        self.assertIsNot(obj1["tags"][0], obj2["tags"][0])
+
+    def test_immutable_literals_are_not_copied(self):
+        factory = self.make_factory("deep")
+        self.assertEqual(factory._prototype["name"], "Bob")
+
+    def test_subclasses_keep_their_type(self):
+        for policy in ("shallow", "deep"):
+            class MyFactory(Factory):
+                copy_literals = policy
+                defaults = {
+                    "counts": collections.defaultdict(int, a=1),
+                    "order": collections.OrderedDict([("b", [1]), ("a", 2)]),
+                }
+
+            obj1, obj2 = MyFactory()(), MyFactory()()
+            obj1["counts"]["x"] += 1
+            self.assertEqual(obj1["counts"], {"a": 1, "x": 1})
+            self.assertEqual(obj2["counts"], {"a": 1})
+            self.assertIsInstance(obj2["order"], collections.OrderedDict)
+            self.assertEqual(list(obj2["order"]), ["b", "a"])
+            self.assertIsNot(obj1["order"], obj2["order"])
+        self.assertIsNot(obj1["order"]["b"], obj2["order"]["b"])
+
+
 class TestIsConstructor(TestCase):
 
     def setUp(self):
@@ -176,6 +278,386 @@ class TestMetafactoryConstructor(TestCase):
         self.assertIsInstance(factory._defaults["baz"], Factory)
 
 
+class TestLazyResolution(TestCase):
+
+    def setUp(self):
+        self.constructor = mock.Mock(return_value=Gen([1, 2]))
+
+        class MyFactory(Factory):
+            defaults = {
+                "foo": 1,
+                "bar": lazy(self.constructor),
+                "baz": Factory,
+            }
+
+        self.MyFactory = MyFactory
+
+    def test_constructors_are_called_on_first_use(self):
+        factory = self.MyFactory()
+        self.assertFalse(self.constructor.called)
+        self.assertEqual(factory(), {"foo": 1, "bar": 1, "baz": {}})
+        factory()
+        self.assertEqual(self.constructor.call_count, 1)
+
+    def test_failed_resolution_is_retried(self):
+        self.constructor.side_effect = [TypeError("not an iterable."),
+                                        Gen([1, 2])]
+        factory = self.MyFactory()
+        with self.assertRaises(TypeError):
+            factory()
+        self.assertEqual(factory()["bar"], 1)
+
+    def test_overriden_constructors_are_not_pending(self):
+        factory = self.MyFactory(bar=2, baz=3)
+        self.assertIn("_prototype", factory.__dict__)
+        self.assertFalse(self.constructor.called)
+
+    def test_each_instance_gets_its_own_generators(self):
+        self.constructor.side_effect = lambda: Gen([1, 2])
+        f1, f2 = self.MyFactory(), self.MyFactory()
+        self.assertEqual(f1()["bar"], 1)
+        self.assertEqual(f2()["bar"], 1)
+
+    def test_class_is_analyzed_once(self):
+        with mock.patch.object(
+                self.MyFactory, "_is_contructor",
+                wraps=Factory._is_contructor) as method:
+            self.MyFactory()
+            self.MyFactory(foo=2)
+            self.assertEqual(method.call_count, 3)
+
+    def test_reassigning_defaults_is_noticed(self):
+        self.MyFactory()
+        self.MyFactory.defaults = {"spam": 1}
+        self.assertEqual(self.MyFactory()(), {"spam": 1})
+
+    def test_instances_without_constructors_share_compiled_defaults(self):
+        class MyFactory(Factory):
+            defaults = {"foo": 1, "bar": Gen([1, 2, 3])}
+
+        self.assertIs(MyFactory()._prototype, MyFactory()._prototype)
+
+
+class TestFork(TestCase):
+
+    def setUp(self):
+        class MyFactory(Factory):
+            defaults = {"id": lazy(Gen, [1, 2, 3]), "name": "Bob"}
+
+        self.factory = MyFactory(name="Alice")
+
+    def test_keeps_arguments(self):
+        self.assertEqual(self.factory.fork()(), {"id": 1, "name": "Alice"})
+
+    def test_overrides(self):
+        fork = self.factory.fork(name="Eve", age=42)
+        self.assertEqual(fork(), {"id": 1, "name": "Eve", "age": 42})
+        self.assertEqual(self.factory(), {"id": 1, "name": "Alice"})
+
+    def test_fresh_generators(self):
+        self.factory()
+        self.assertEqual(self.factory.fork()()["id"], 1)
+        self.assertEqual(self.factory()["id"], 2)
+
+    def test_same_class(self):
+        self.assertIs(type(self.factory.fork()), type(self.factory))
+
+    def test_generator_arguments_are_copied(self):
+        factory = Factory(a=count())
+        factory()
+        fork = factory.fork(b=1)
+        self.assertEqual([fork()["a"], fork()["a"]], [1, 2])
+        self.assertEqual(factory()["a"], 1)
+
+    def test_factory_arguments_are_forked(self):
+        factory = Factory(child=Factory(a=count()))
+        fork = factory.fork()
+        self.assertEqual([fork()["child"]["a"], fork()["child"]["a"]], [0, 1])
+        self.assertEqual(factory()["child"]["a"], 0)
+
+    def test_generators_that_cant_be_copied_are_shared(self):
+        factory = Factory(a=Gen(i for i in range(10)))
+        fork = factory.fork()
+        self.assertEqual([factory()["a"], fork()["a"]], [0, 1])
+
+
+class TestPickle(TestCase):
+
+    def roundtrip(self, obj):
+        return pickle.loads(pickle.dumps(obj))
+
+    def test_generators_keep_their_position(self):
+        factory = PersonFactory(name="Alice")
+        factory()
+        copy = self.roundtrip(factory)
+        self.assertEqual(copy(), factory())
+        self.assertEqual(copy(), {"id": 3, "name": "Alice",
+                                  "pet": {"id": 102, "name": "Rocky"},
+                                  "tags": []})
+
+    def test_unresolved_factory(self):
+        copy = self.roundtrip(PersonFactory(name="Alice"))
+        self.assertIn("_overrides", copy.__dict__)
+        self.assertEqual(copy()["name"], "Alice")
+
+    def test_copy_literals(self):
+        PersonFactory.copy_literals = "shallow"
+        try:
+            copy = self.roundtrip(PersonFactory())
+            self.assertIsNot(copy()["tags"], copy()["tags"])
+        finally:
+            del PersonFactory.copy_literals
+
+    def test_schema(self):
+        copy = self.roundtrip(PersonFactory())
+        with self.assertRaises(SchemaError):
+            copy(id=0)
+
+    def test_record_classes_are_regenerated(self):
+        factory = PersonRecordFactory()
+        copy = self.roundtrip(factory)
+        person = copy()
+        self.assertEqual(type(person).__name__, "PersonRecordFactoryRecord")
+        self.assertIsNot(type(person), type(factory()))
+        self.assertEqual(person.pet.name, "Rocky")
+
+    def test_fork(self):
+        self.assertEqual(self.roundtrip(PersonFactory(name="Eve")).fork()(),
+                         PersonFactory(name="Eve")())
+
+
+class TestRelated(TestCase):
+
+    def setUp(self):
+        class LineFactory(Factory):
+            defaults = {"id": lazy(count, 1), "price": 10}
+
+        class OrderFactory(Factory):
+            defaults = {
+                "id": lazy(count, 1),
+                "lines": related(LineFactory, count=lazy(Gen, [2, 0, 3])),
+                "total": computed(
+                    lambda lines: sum(l["price"] for l in lines),
+                    depends=["lines"],
+                ),
+            }
+
+        self.LineFactory = LineFactory
+        self.OrderFactory = OrderFactory
+
+    def test_call(self):
+        factory = self.OrderFactory()
+        order = factory()
+        self.assertIsInstance(order["lines"], RelatedList)
+        self.assertEqual(order["lines"], [{"id": 1, "price": 10},
+                                          {"id": 2, "price": 10}])
+        self.assertEqual(order["total"], 20)
+        self.assertEqual(factory()["lines"], [])
+
+    def test_many(self):
+        orders = self.OrderFactory().many(3, lines__price=1)
+        self.assertEqual([len(o["lines"]) for o in orders], [2, 0, 3])
+        self.assertEqual([l["id"] for l in orders[2]["lines"]], [3, 4, 5])
+        self.assertEqual([o["total"] for o in orders], [2, 0, 3])
+
+    def test_many_creates_related_objects_at_once(self):
+        factory = self.OrderFactory()
+        line_factory = factory._defaults["lines"].factory
+        with mock.patch.object(line_factory, "many",
+                               wraps=line_factory.many) as m:
+            factory.many(3)
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(m.call_args, ((5, ), {}))
+
+    def test_override(self):
+        orders = self.OrderFactory().many(2, lines=[])
+        self.assertEqual([o["lines"] for o in orders], [[], []])
+
+    def test_counts(self):
+        for c, expected in ((2, 2), (-1, 0), (1.7, 1)):
+            factory = Factory(lines=related(Factory, count=c))
+            self.assertEqual(len(factory()["lines"]), expected)
+        factory = Factory(lines=related(Factory(a=1), count=(1, 3)))
+        self.assertIn(len(factory()["lines"]), (1, 2, 3))
+
+    def test_factory_of_related_list(self):
+        lines = self.OrderFactory()()["lines"]
+        self.assertIsInstance(lines.factory, self.LineFactory)
+
+    def test_deferred(self):
+        self.OrderFactory.deferred = True
+        order = self.OrderFactory()()
+        self.assertFalse(order.is_pending("lines"))
+        self.assertEqual(order["total"], 20)
+        self.OrderFactory.defaults = {
+            "lines": related(self.LineFactory, count=2)
+        }
+        order = self.OrderFactory()()
+        self.assertTrue(order.is_pending("lines"))
+        self.assertEqual([l["id"] for l in order["lines"]], [1, 2])
+        self.assertIsInstance(order["lines"], RelatedList)
+
+
+class TestSeed(TestCase):
+
+    def make(self):
+        class PersonFactory(Factory):
+            seed = 42
+            defaults = {
+                "age": lazy(randint, 1, 100),
+                "height": Normal(170, 10),
+                "pets": related(Factory(kind="dog"), count=(0, 5)),
+            }
+
+        return PersonFactory
+
+    def test_objects_are_reproducible(self):
+        self.assertEqual(self.make()().many(50), self.make()().many(50))
+
+    def test_keys_are_the_class_and_attribute_names(self):
+        factory = self.make()()
+        stream = factory._defaults["age"]._stream
+        self.assertEqual((stream.seed, stream.key),
+                         (42, ("PersonFactory", "age")))
+        self.assertNotEqual(factory()["age"], factory()["height"])
+
+    def test_seeded_generators_are_kept(self):
+        g = choice("abc").seed(1, "mine")
+        with mock.patch.object(Factory, "seed", 0):
+            Factory(letter=g)()
+        self.assertEqual(g._stream.key, ("mine", ))
+
+    def test_unseeded_factories(self):
+        g = randint(1, 100)
+        Factory(n=g)()
+        self.assertIsNone(g._stream)
+
+    def test_generators_that_cant_seek(self):
+        def make():
+            class EventFactory(Factory):
+                seed = 7
+                defaults = {
+                    "at": lazy(timestamps, 0, 60, jitter=30),
+                    "kind": lazy(template, "ev-{n}", n=count()),
+                    "tag": lazy(template, "x"),
+                }
+
+            return EventFactory()
+
+        self.assertEqual(make().many(300), make().many(300))
+        self.assertEqual(make()()["kind"], "ev-0")
+
+    def test_global_random_seed_reproduces_unseeded_factories(self):
+        factory = Factory(n=randint(1, 10 ** 6), c=choice(range(100)))
+        values = []
+        for _ in range(2):
+            random.seed(1)
+            values.append([factory() for _ in range(3)])
+        self.assertEqual(values[0], values[1])
+
+    def test_used_generators_are_not_restarted(self):
+        ids = unique(randint(1, 50))
+        letters = cycle("abc")
+        drawn = [next(ids), next(ids)]
+        next(letters)
+
+        class ItemFactory(Factory):
+            seed = 7
+            defaults = {"id": ids, "letter": letters}
+
+        items = ItemFactory().many(48)
+        values = drawn + [i["id"] for i in items]
+        self.assertEqual(sorted(values), list(range(1, 51)))
+        self.assertEqual([i["letter"] for i in items[:3]], ["b", "c", "a"])
+        self.assertIsNone(ids._stream)
+
+
+class TestComputed(TestCase):
+
+    def setUp(self):
+        self.full_name = computed(
+            lambda first, last: first + " " + last,
+            depends=["first_name", "last_name"]
+        )
+        self.factory = Factory(
+            email=computed(lambda name: name.lower() + "@example.com",
+                           depends=["name"]),
+            name=self.full_name,
+            first_name=Gen(["Bob", "Alice"]),
+            last_name="Smith",
+        )
+
+    def test_computed_after_dependencies(self):
+        self.assertEqual(
+            self.factory(),
+            {"email": "bob smith@example.com", "name": "Bob Smith",
+             "first_name": "Bob", "last_name": "Smith"}
+        )
+
+    def test_evaluation_order(self):
+        names = [k for k, kind, v in self.factory._dynamic]
+        self.assertEqual(names, ["first_name", "name", "email"])
+
+    def test_override_dependency(self):
+        self.assertEqual(self.factory(last_name="Jones")["name"],
+                         "Bob Jones")
+
+    def test_deleted_dependency_raises_ValueError(self):
+        deferred = Factory(name=self.full_name, first_name="Bob",
+                           last_name="Smith")
+        deferred.deferred = True
+        for build in (lambda: self.factory(last_name=DELETE),
+                      lambda: self.factory.many(2, last_name=DELETE),
+                      lambda: deferred(last_name=DELETE)):
+            with self.assertRaisesRegex(ValueError, "name.*last_name"):
+                build()
+
+    def test_errors_of_the_function_are_kept(self):
+        factory = Factory(a=1, b=computed(lambda a: {}[a], depends=["a"]))
+        with self.assertRaises(KeyError):
+            factory()
+
+    def test_override_short_circuits_computation(self):
+        f = mock.Mock()
+        factory = Factory(foo=1, bar=computed(f, depends=["foo"]))
+        self.assertEqual(factory(bar=2), {"foo": 1, "bar": 2})
+        self.assertFalse(f.called)
+
+    def test_delete(self):
+        self.assertNotIn("email", self.factory(email=DELETE))
+
+    def test_depends_on_nested_factory(self):
+        factory = Factory(
+            pet=Factory(name="Rocky"),
+            pet_name=computed(lambda pet: pet["name"], depends=["pet"]),
+        )
+        self.assertEqual(factory(pet__name="Toby")["pet_name"], "Toby")
+
+    def test_circular_dependencies_raise_ValueError(self):
+        with self.assertRaises(ValueError):
+            Factory(
+                foo=computed(lambda bar: bar, depends=["bar"]),
+                bar=computed(lambda foo: foo, depends=["foo"]),
+            )
+
+    def test_unknown_dependency_raises_ValueError(self):
+        with self.assertRaises(ValueError):
+            Factory(foo=computed(lambda bar: bar, depends=["bar"]))
+
+    def test_deferred(self):
+        class MyFactory(Factory):
+            deferred = True
+            defaults = {
+                "pet": Factory(name="Rocky"),
+                "pet_name": computed(lambda pet: pet["name"],
+                                     depends=["pet"]),
+            }
+
+        obj = MyFactory()()
+        self.assertEqual(obj["pet_name"], "Rocky")
+        self.assertFalse(obj.is_pending("pet"))
+
+
 class TestObjectCreation(TestCase):
 
     def setUp(self):
@@ -250,6 +732,51 @@ class TestMany(TestCase):
         self.assertEqual(res[1]["baz"]["spam"], 2)
 
 
+class TestManyNested(TestCase):
+
+    def setUp(self):
+        self.pet = Factory(id=Gen(range(100, 200)), name="Rocky")
+        self.factory = Factory(id=Gen(range(1, 100)), pet=self.pet)
+
+    def test_nested_objects(self):
+        res = self.factory.many(3)
+        self.assertEqual([d["id"] for d in res], [1, 2, 3])
+        self.assertEqual([d["pet"]["id"] for d in res], [100, 101, 102])
+
+    def test_nested_factories_create_all_objects_at_once(self):
+        with mock.patch.object(self.pet, "many", wraps=self.pet.many) as m:
+            self.factory.many(3, pet__name="Toby")
+        self.assertEqual(m.call_args, ((3, ), {"name": "Toby"}))
+
+    def test_subattribute_overrides(self):
+        res = self.factory.many(2, pet__name=Gen(["Toby", "Max"]))
+        self.assertEqual([d["pet"]["name"] for d in res], ["Toby", "Max"])
+
+    def test_overridden_nested_factory(self):
+        res = self.factory.many(2, pet=DELETE)
+        self.assertEqual(res, [{"id": 1}, {"id": 2}])
+        with self.assertRaises(ValueError):
+            self.factory.many(2, pet=None, pet__name="Toby")
+
+    def test_deep_nesting(self):
+        factory = self.factory
+        for i in range(4):
+            factory = Factory(level=i, child=factory)
+        res = factory.many(2, child__child__child__child__pet__name="Max")
+        pet = res[1]["child"]["child"]["child"]["child"]["pet"]
+        self.assertEqual(pet, {"id": 101, "name": "Max"})
+
+    def test_subclasses_overriding_call(self):
+        class MyFactory(Factory):
+            def __call__(self, **kwargs):
+                obj = super(MyFactory, self).__call__(**kwargs)
+                obj["extra"] = True
+                return obj
+
+        res = MyFactory(pet=self.pet).many(2)
+        self.assertTrue(all(d["extra"] for d in res))
+
+
 class TestSpecifyingAlternateObjectConstructor(TestCase):
 
     def setUp(self):
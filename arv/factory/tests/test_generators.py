@@ -1,18 +1,20 @@
 # -*- coding: utf-8 -*-
 
-from __future__ import unicode_literals
-from builtins import next
-from builtins import range
-
+import datetime
+import itertools
+import pickle
+import random
+import re
+import time
+import weakref
 from unittest import TestCase
+from unittest import mock
 
-try:
-    from unittest import mock
-except ImportError:
-    import mock
-
+from .. import generators
+from ..base import Factory
 from ..generators import Gen
 from ..generators import choice
+from ..generators import computed
 from ..generators import count
 from ..generators import Count
 from ..generators import cycle
@@ -20,8 +22,11 @@ from ..generators import Cycle
 from ..generators import lazy
 from ..generators import mkconstructor
 from ..generators import mkgen
+from ..generators import prefetch
 from ..generators import randint
 from ..generators import string
+from ..generators import template
+from ..generators import unique
 
 
 class TestGenerator(TestCase):
@@ -44,6 +49,74 @@ class TestGenerator(TestCase):
         self.assertIs(g, self.generator)
 
 
+class TestCombinators(TestCase):
+
+    def test_map(self):
+        g = Gen([1, 2]).map(str)
+        self.assertIsInstance(g, Gen)
+        self.assertEqual(list(g), ["1", "2"])
+
+    def test_filter(self):
+        self.assertEqual(list(Gen([1, 2, 3, 4]).filter(lambda i: i % 2)),
+                         [1, 3])
+
+    def test_zip(self):
+        self.assertEqual(list(Gen([1, 2]).zip("ab", count())),
+                         [(1, "a", 0), (2, "b", 1)])
+
+    def test_chain(self):
+        self.assertEqual(list(Gen([1]).chain([2], Gen([3]))), [1, 2, 3])
+
+    def test_batched(self):
+        self.assertEqual(list(Gen(range(5)).batched(2)),
+                         [(0, 1), (2, 3), (4, )])
+
+    def test_batched_requires_positive_size(self):
+        with self.assertRaises(ValueError):
+            Gen([]).batched(0)
+
+    def test_combinators_share_the_underlying_iterator(self):
+        g = Gen([1, 2, 3])
+        m = g.map(str)
+        self.assertEqual(next(m), "1")
+        self.assertEqual(next(g), 2)
+
+    def test_fused_generators_skip_the_Gen_layer(self):
+        g = count().map(str)
+        self.assertNotIsInstance(g._seq, Gen)
+
+    def test_combinators_honor_overridden_next(self):
+        class Squares(Gen):
+            def __init__(self):
+                self._i = 0
+
+            def __next__(self):
+                self._i += 1
+                return self._i ** 2
+
+        self.assertEqual(next(Squares().map(str)), "1")
+
+
+class TestFetcher(TestCase):
+
+    def test_plain_generators(self):
+        g = Gen([1, 2])
+        f = g._fetcher()
+        self.assertEqual(f(), 1)
+        self.assertEqual(next(g), 2)
+
+    def test_generators_overriding_next(self):
+        class Ones(Gen):
+            def __init__(self):
+                pass
+
+            def __next__(self):
+                return 1
+
+        g = Ones()
+        self.assertEqual(g._fetcher(), g.__next__)
+
+
 class TestLazy(TestCase):
 
     def test_calling_lazy_object_calls_function(self):
@@ -65,6 +138,16 @@ class TestLazy(TestCase):
             lazy(2)
 
 
+class TestComputed(TestCase):
+
+    def test_depends(self):
+        self.assertEqual(computed(len, depends=["foo"])._depends, ("foo", ))
+
+    def test_raises_TypeError_if_argument_not_callable(self):
+        with self.assertRaises(TypeError):
+            computed(2, depends=["foo"])
+
+
 class TestMkgen(TestCase):
 
     def test_type(self):
@@ -94,6 +177,72 @@ class TestMkgen(TestCase):
         self.assertEqual(next(gen), 2)
 
 
+def _slow_square(x, delay=0.05):
+    time.sleep(delay)
+    return x * x
+
+
+class TestPrefetch(TestCase):
+
+    def test_values_are_computed_ahead(self):
+        function = mock.Mock(side_effect=range(100))
+        gen = prefetch(mkgen(function), buffer=4)
+        self.assertEqual(function.call_count, 0)
+        self.assertEqual(next(gen), 0)
+        time.sleep(0.1)
+        self.assertEqual(function.call_count, 4)
+        gen.close()
+
+    def test_keeps_order(self):
+        gen = prefetch(count(), buffer=3)
+        self.assertEqual([next(gen) for _ in range(10)], list(range(10)))
+        gen.close()
+
+    def test_workers(self):
+        gen = prefetch(mkgen(_slow_square, 3), buffer=8, workers=8)
+        start = time.time()
+        self.assertEqual([next(gen) for _ in range(8)], [9] * 8)
+        self.assertLess(time.time() - start, 0.3)
+        gen.close()
+
+    def test_exceptions(self):
+        function = mock.Mock(side_effect=[1, KeyError(), 2])
+        gen = prefetch(mkgen(function))
+        self.assertEqual(next(gen), 1)
+        with self.assertRaises(KeyError):
+            next(gen)
+        self.assertEqual(next(gen), 2)
+        gen.close()
+
+    def test_exhaustion(self):
+        gen = prefetch(Gen([1, 2]), buffer=5)
+        self.assertEqual(list(gen), [1, 2])
+        with self.assertRaises(StopIteration):
+            next(gen)
+
+    def test_only_mkgen_supports_several_workers(self):
+        with self.assertRaises(ValueError):
+            prefetch(count(), workers=2)
+        with self.assertRaises(ValueError):
+            prefetch(count(), processes=True)
+
+    def test_pickle_keeps_computed_values(self):
+        gen = prefetch(count(), buffer=3)
+        next(gen)
+        copy = pickle.loads(pickle.dumps(gen))
+        self.assertEqual([next(copy) for _ in range(4)], [1, 2, 3, 4])
+        gen.close()
+        copy.close()
+
+    def test_workers_stop_when_collected(self):
+        gen = prefetch(mkgen(int, "1"), workers=2)
+        next(gen)
+        ref, finalizer = weakref.ref(gen), gen._finalizer
+        del gen
+        self.assertIsNone(ref())
+        self.assertFalse(finalizer.alive)
+
+
 class TestCount(TestCase):
 
     def assertRange(self, g, start, end, step):
@@ -251,3 +400,509 @@ class TestRandint(TestCase):
         for i, v in zip(range(1000), randint(0, 100)):
             self.assertGreaterEqual(v, 0)
             self.assertLessEqual(v, 100)
+
+
+class TestTable(TestCase):
+
+    def setUp(self):
+        self.table = generators._Table("foo\nbar\nspam eggs")
+
+    def test_len(self):
+        self.assertEqual(len(self.table), 3)
+
+    def test_getitem(self):
+        self.assertEqual(self.table[0], "foo")
+        self.assertEqual(self.table[1], "bar")
+        self.assertEqual(self.table[2], "spam eggs")
+
+    def test_sample(self):
+        values = self.table.sample(3, mock.Mock(side_effect=[0.9, 0.0, 0.5]))
+        self.assertEqual(values, ["spam eggs", "foo", "bar"])
+
+    def test_tables_are_loaded_lazily_and_cached(self):
+        generators._tables.clear()
+        g = generators.first_name()
+        self.assertEqual(generators._tables, {})
+        next(g)
+        table = generators._tables[("FIRST_NAMES", None)]
+        next(generators.first_name())
+        self.assertIs(generators._tables[("FIRST_NAMES", None)], table)
+
+    def test_case(self):
+        self.assertEqual(generators._table("LOREM_WORDS", "title")[0], "A")
+        self.assertEqual(generators._table("CITIES", "lower")[0], "ashford")
+
+
+class TestProviders(TestCase):
+
+    def assertValues(self, g, regexp, n=300):
+        self.assertIsInstance(g, Gen)
+        for _, v in zip(range(n), g):
+            self.assertIsNotNone(re.match(regexp, v), v)
+
+    def test_first_name(self):
+        self.assertValues(generators.first_name(), r"^[A-Z][a-z]+$")
+
+    def test_last_name(self):
+        self.assertValues(generators.last_name(), r"^[A-Z][a-z]+$")
+
+    def test_name(self):
+        self.assertValues(generators.name(), r"^[A-Z][a-z]+ [A-Z][a-z]+$")
+
+    def test_email(self):
+        self.assertValues(
+            generators.email(),
+            r"^[a-z]+\.[a-z]+@example\.(com|net|org)$"
+        )
+
+    def test_email_honors_domain(self):
+        self.assertValues(
+            generators.email("100%.test"),
+            r"^[a-z]+\.[a-z]+@100%\.test$"
+        )
+
+    def test_username(self):
+        self.assertValues(generators.username(), r"^[a-z]+[0-9]{1,4}$")
+
+    def test_phone_number(self):
+        self.assertValues(generators.phone_number(), r"^555-[0-9]{4}$")
+
+    def test_street_address(self):
+        self.assertValues(
+            generators.street_address(),
+            r"^[0-9]{1,4} [A-Z][a-z]+ [A-Z][a-z]+$"
+        )
+
+    def test_city(self):
+        self.assertValues(generators.city(), r"^[A-Z][a-z]+( [A-Z][a-z]+)?$")
+
+    def test_postcode(self):
+        self.assertValues(generators.postcode(), r"^[0-9]{5}$")
+
+    def test_address(self):
+        self.assertValues(
+            generators.address(),
+            r"^[0-9]{1,4} [A-Z][a-z]+ [A-Z][a-z]+, [A-Za-z ]+ [0-9]{5}$"
+        )
+
+    def test_company(self):
+        self.assertValues(generators.company(), r"^[A-Z][a-z]+ [A-Za-z ]+$")
+
+    def test_word(self):
+        self.assertValues(generators.word(), r"^[a-z]+$")
+
+    def test_sentence(self):
+        self.assertValues(
+            generators.sentence(3),
+            r"^[A-Z][a-z]* [a-z]+ [a-z]+\.$"
+        )
+
+    def test_paragraph(self):
+        self.assertValues(
+            generators.paragraph(2, 2),
+            r"^[A-Z][a-z]* [a-z]+\. [A-Z][a-z]* [a-z]+\.$"
+        )
+
+    def test_sentence_requires_words(self):
+        with self.assertRaises(ValueError):
+            generators.sentence(0)
+
+    def test_paragraph_requires_sentences(self):
+        with self.assertRaises(ValueError):
+            generators.paragraph(0)
+
+    def test_block_size(self):
+        g = generators._Compose(None, [generators._IntColumn(1, 1)], 4)
+        with mock.patch.object(g, "_fill", wraps=g._fill) as fill:
+            for _, v in zip(range(9), g):
+                pass
+        self.assertEqual(fill.call_count, 3)
+        self.assertEqual(fill.call_args[0][0], 4)
+
+
+class TestGenSubclasses(TestCase):
+
+    def test_wrapping_a_subclass_instance_creates_a_new_Gen(self):
+        g = generators.word()
+        w = Gen(g)
+        self.assertIsNot(w, g)
+        self.assertIsInstance(next(w), type(""))
+
+    def test_lazy_does_not_wrap_Gen_subclasses(self):
+        g = generators.word()
+        self.assertIs(lazy(lambda: g)(), g)
+
+
+class TestPickle(TestCase):
+
+    def assertContinues(self, g, n=3):
+        next(g)
+        copy = pickle.loads(pickle.dumps(g))
+        self.assertIsInstance(copy, Gen)
+        self.assertEqual([next(copy) for _ in range(n)],
+                         [next(g) for _ in range(n)])
+
+    def test_gen(self):
+        self.assertContinues(Gen([1, 2, 3, 4]))
+
+    def test_builtin_generators(self):
+        self.assertContinues(count(10, 2))
+        self.assertContinues(cycle("abc"), 5)
+        self.assertContinues(mkgen(int, "42"))
+        self.assertContinues(string("user%i"))
+        self.assertContinues(template("{a}-{b}", a=count(), b="x"))
+
+    def test_combinators(self):
+        self.assertContinues(count().map(str).filter(None))
+        self.assertContinues(count().zip(cycle("ab")))
+        self.assertContinues(Gen([1]).chain([2, 3, 4]), 2)
+        self.assertContinues(count().batched(3))
+
+    def test_block_generators_keep_the_current_block(self):
+        self.assertContinues(generators.name())
+        self.assertContinues(unique(randint(0, 10 ** 12)))
+        self.assertContinues(unique(choice(range(1000))))
+
+    def test_random_generators(self):
+        for g in (choice([1, 2]), randint(1, 2)):
+            self.assertIn(next(pickle.loads(pickle.dumps(g))), (1, 2))
+
+    def test_lazy_constructors(self):
+        for c in (Count(5), Cycle([1, 2]), lazy(string, "u%i"),
+                  mkconstructor(itertools.count, 1)):
+            self.assertEqual(next(pickle.loads(pickle.dumps(c))()), next(c()))
+
+
+class TestFeistel(TestCase):
+
+    def test_is_a_permutation(self):
+        for size in (1, 2, 3, 17, 256, 1000):
+            p = generators._Feistel(size)
+            self.assertEqual(sorted(p(i) for i in range(size)),
+                             list(range(size)))
+
+    def test_requires_a_non_empty_domain(self):
+        with self.assertRaises(ValueError):
+            generators._Feistel(0)
+
+    def test_keys_change_the_permutation(self):
+        p1 = generators._Feistel(1000)
+        p2 = generators._Feistel(1000)
+        self.assertNotEqual([p1(i) for i in range(10)],
+                            [p2(i) for i in range(10)])
+
+
+class TestUnique(TestCase):
+
+    def test_type(self):
+        self.assertIsInstance(unique(randint(1, 10)), Gen)
+
+    def test_small_range(self):
+        values = list(unique(randint(1, 100)))
+        self.assertEqual(sorted(values), list(range(1, 101)))
+
+    def test_large_range(self):
+        values = list(unique(randint(1, 100), small_domain=10))
+        self.assertIsInstance(unique(randint(1, 100), small_domain=10),
+                              generators._UniqueRange)
+        self.assertEqual(sorted(values), list(range(1, 101)))
+
+    def test_huge_range_uses_constant_memory(self):
+        g = unique(randint(0, 10 ** 18))
+        self.assertIsInstance(g, generators._UniqueRange)
+        values = [next(g) for _ in range(1000)]
+        self.assertEqual(len(set(values)), 1000)
+        for v in values:
+            self.assertTrue(0 <= v <= 10 ** 18)
+
+    def test_choice(self):
+        values = list(unique(choice("abcab")))
+        self.assertEqual(sorted(values), ["a", "b", "c"])
+
+    def test_large_choice(self):
+        seq = list(range(50))
+        values = list(unique(choice(seq), small_domain=10))
+        self.assertEqual(sorted(values), seq)
+
+    def test_unknown_domain(self):
+        g = unique(Gen([1, 1, 2, 1, 3]))
+        self.assertEqual(list(g), [1, 2, 3])
+
+    def test_unknown_domain_max_tries(self):
+        g = unique(Gen([1, 1, 1, 1]), max_tries=2)
+        next(g)
+        with self.assertRaises(ValueError):
+            next(g)
+
+
+class TestTemplate(TestCase):
+
+    def test_type(self):
+        self.assertIsInstance(template("foo"), Gen)
+
+    def test_constant_template(self):
+        g = template("foo")
+        self.assertEqual([next(g), next(g)], ["foo", "foo"])
+
+    def test_generators_and_constants(self):
+        g = template("user-{id:03d}@{domain}", id=count(1), domain="x.com")
+        self.assertEqual(next(g), "user-001@x.com")
+        self.assertEqual(next(g), "user-002@x.com")
+
+    def test_repeated_placeholders_share_value(self):
+        g = template("{n}-{n}", n=count())
+        self.assertEqual(next(g), "0-0")
+        self.assertEqual(next(g), "1-1")
+
+    def test_conversion_attributes_and_indices(self):
+        g = template("{s!r} {p[1]} {c.real}", s=Gen(["a"]), p=(1, 2),
+                     c=Gen([3]))
+        self.assertEqual(next(g), "'a' 2 3")
+
+    def test_braces_in_literals_and_constants(self):
+        g = template("{{{x}}}", x="{}")
+        self.assertEqual(next(g), "{{}}")
+
+    def test_unbound_placeholder_raises_KeyError(self):
+        with self.assertRaises(KeyError):
+            template("{foo}")
+
+    def test_positional_fields_raise_ValueError(self):
+        with self.assertRaises(ValueError):
+            template("{}", x=1)
+        with self.assertRaises(ValueError):
+            template("{0}", x=1)
+
+    def test_nested_fields_raise_ValueError(self):
+        with self.assertRaises(ValueError):
+            template("{x:{w}}", x=1, w=3)
+
+    def test_exhausted_when_a_generator_is_exhausted(self):
+        g = template("{a}{b}", a=Gen([1, 2, 3]), b=Gen("xy"))
+        self.assertEqual(list(g), ["1x", "2y"])
+
+    def test_consumes_one_value_per_string(self):
+        c = count()
+        g = template("{n}", n=c)
+        next(g)
+        self.assertEqual(next(c), 1)
+
+    def test_sibling_attributes(self):
+        ids = count(1)
+        factory = Factory(
+            id=ids,
+            shared=template("user-{id:03d}", id=ids),
+            email=computed("user-{:03d}".format, depends=["id"]),
+        )
+        self.assertEqual(factory.many(2), [
+            {"id": 1, "shared": "user-002", "email": "user-001"},
+            {"id": 3, "shared": "user-004", "email": "user-003"},
+        ])
+
+
+class TestDistributions(TestCase):
+
+    N = 2000
+
+    def values(self, g):
+        return list(itertools.islice(g, self.N))
+
+    def mean(self, values):
+        return sum(values) / len(values)
+
+    def test_types(self):
+        for g in (generators.normal(), generators.lognormal(),
+                  generators.exponential(), generators.zipf()):
+            self.assertIsInstance(g, Gen)
+
+    def test_normal(self):
+        values = self.values(generators.normal(10.0, 1.0))
+        self.assertAlmostEqual(self.mean(values), 10.0, delta=0.2)
+
+    def test_normal_odd_block_size(self):
+        g = generators.normal()
+        self.assertEqual(len(g._fill(3, generators.random.random)), 3)
+
+    def test_lognormal(self):
+        values = self.values(generators.lognormal(0.0, 0.5))
+        self.assertTrue(all(v > 0 for v in values))
+
+    def test_exponential(self):
+        values = self.values(generators.exponential(4.0))
+        self.assertTrue(all(v >= 0 for v in values))
+        self.assertAlmostEqual(self.mean(values), 0.25, delta=0.05)
+
+    def test_zipf(self):
+        values = self.values(generators.zipf(1.0, 5))
+        self.assertTrue(all(1 <= v <= 5 for v in values))
+        self.assertGreater(values.count(1), values.count(5))
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            generators.normal(sigma=-1)
+        with self.assertRaises(ValueError):
+            generators.exponential(0)
+        with self.assertRaises(ValueError):
+            generators.zipf(n=0)
+
+    def test_lazy_constructors(self):
+        for c, f in ((generators.Normal, generators.normal),
+                     (generators.LogNormal, generators.lognormal),
+                     (generators.Exponential, generators.exponential),
+                     (generators.Zipf, generators.zipf)):
+            self.assertIsInstance(c(), lazy)
+            self.assertIs(c()._f, f)
+
+
+class TestTemporal(TestCase):
+
+    def test_date(self):
+        start, end = datetime.date(2020, 1, 1), datetime.date(2020, 1, 3)
+        values = set(itertools.islice(generators.date(start, end), 300))
+        self.assertEqual(values, set([
+            start, datetime.date(2020, 1, 2), end
+        ]))
+
+    def test_datetime(self):
+        start = datetime.datetime(2020, 1, 1)
+        end = datetime.datetime(2020, 1, 2)
+        for v in itertools.islice(generators.datetime(start, end), 300):
+            self.assertTrue(start <= v < end)
+
+    def test_end_before_start_raises_ValueError(self):
+        start, end = datetime.date(2020, 1, 2), datetime.date(2020, 1, 1)
+        with self.assertRaises(ValueError):
+            generators.date(start, end)
+        with self.assertRaises(ValueError):
+            generators.datetime(start, end)
+
+    def test_timestamps_without_jitter(self):
+        g = generators.timestamps(10, step=2)
+        self.assertEqual(list(itertools.islice(g, 3)), [10, 12, 14])
+
+    def test_timestamps_are_monotonic(self):
+        start = datetime.datetime(2020, 1, 1)
+        g = generators.timestamps(start, datetime.timedelta(seconds=1),
+                                  datetime.timedelta(seconds=5))
+        values = list(itertools.islice(g, 1000))
+        self.assertEqual(values[0], start)
+        for a, b in zip(values, values[1:]):
+            self.assertTrue(
+                datetime.timedelta(seconds=1) <= b - a
+                <= datetime.timedelta(seconds=6)
+            )
+
+    def test_timestamps_continue_across_blocks(self):
+        g = generators.timestamps(0, 1)
+        g.block_size = 3
+        self.assertEqual(list(itertools.islice(g, 7)), list(range(7)))
+
+    def test_timestamps_negative_step_raises_ValueError(self):
+        with self.assertRaises(ValueError):
+            generators.timestamps(0, -1)
+
+    def test_lazy_constructors(self):
+        d = datetime.date(2020, 1, 1)
+        self.assertIs(generators.Date(d, d)._f, generators.date)
+        self.assertIs(generators.DateTime(d, d)._f, generators.datetime)
+        self.assertIs(generators.Timestamps(d)._f, generators.timestamps)
+        g1 = generators.Timestamps(0)()
+        g2 = generators.Timestamps(0)()
+        next(g1)
+        self.assertEqual(next(g2), 0)
+
+
+class TestSeed(TestCase):
+
+    def seekable(self):
+        d = datetime.date(2020, 1, 1)
+        return [
+            lambda: choice("abcdefgh"),
+            lambda: randint(1, 10 ** 6),
+            lambda: randint(0, 10 ** 30),
+            lambda: cycle([1, 2, 3]),
+            lambda: template("x"),
+            lambda: unique(randint(1, 10 ** 6)),
+            lambda: unique(randint(1, 1000)),
+            lambda: unique(choice(list(range(2000)))),
+            lambda: generators.normal(),
+            lambda: generators.zipf(),
+            lambda: generators.date(d, datetime.date(2021, 1, 1)),
+            lambda: generators.name(),
+            lambda: generators.paragraph(),
+        ]
+
+    def test_seeded_generators_are_reproducible(self):
+        for make in self.seekable():
+            g1, g2 = make().seed(1, "a"), make().seed(1, "a")
+            self.assertEqual(list(itertools.islice(g1, 600)),
+                             list(itertools.islice(g2, 600)))
+
+    def test_keys_change_the_values(self):
+        g1, g2 = randint(1, 10 ** 6).seed(1, "a"), randint(1, 10 ** 6)
+        g2.seed(1, "b")
+        self.assertNotEqual(list(itertools.islice(g1, 10)),
+                            list(itertools.islice(g2, 10)))
+
+    def test_seek(self):
+        for make in self.seekable():
+            values = list(itertools.islice(make().seed(7), 1000))
+            for i in (0, 1, 255, 256, 700, 999):
+                g = make().seed(7)
+                g.seek(i)
+                self.assertEqual(next(g), values[i])
+
+    def test_seek_backwards_from_the_middle_of_a_block(self):
+        g = generators.normal().seed(3)
+        values = list(itertools.islice(g, 10))
+        g.seek(2)
+        self.assertEqual(next(g), values[2])
+
+    def test_seek_updates_the_fetchers(self):
+        g = randint(1, 10 ** 6).seed(3)
+        fetch = g._fetcher()
+        values = [fetch() for _ in range(300)]
+        g.seek(10)
+        self.assertEqual(fetch(), values[10])
+
+    def test_seek_past_a_finite_generator(self):
+        g = unique(randint(1, 10)).seed(1)
+        g.seek(10)
+        self.assertEqual(list(g), [])
+
+    def test_seek_requires_independent_blocks(self):
+        with self.assertRaises(TypeError):
+            generators.timestamps(0, 1).seek(10)
+
+    def test_seeding_restarts_generators_that_cant_seek(self):
+        g = generators.timestamps(0, 1, jitter=1).seed(2)
+        values = list(itertools.islice(g, 300))
+        self.assertEqual(list(itertools.islice(g.seed(2), 300)), values)
+
+    def test_unseeded_generators_draw_one_value_at_a_time(self):
+        for make in (lambda: choice(range(1000)),
+                     lambda: randint(1, 10 ** 6)):
+            g = make()
+            random.seed(3)
+            first = [next(g), next(g)]
+            random.seed(3)
+            self.assertEqual([next(g), next(g)], first)
+            self.assertIsInstance(next(pickle.loads(pickle.dumps(g))), int)
+
+    def test_seeding_an_unseeded_generator(self):
+        g = randint(1, 10 ** 6)
+        next(g)
+        self.assertEqual(next(g.seed(4)), next(randint(1, 10 ** 6).seed(4)))
+
+    def test_seeding_restarts_the_generator(self):
+        g = randint(1, 10 ** 6).seed(5)
+        first = next(g)
+        next(g)
+        self.assertEqual(next(g.seed(5)), first)
+
+    def test_pickle_keeps_the_stream(self):
+        g = generators.normal().seed(5)
+        values = list(itertools.islice(g, 1000))
+        g.seek(300)
+        g = pickle.loads(pickle.dumps(g))
+        self.assertEqual(list(itertools.islice(g, 700)), values[300:])
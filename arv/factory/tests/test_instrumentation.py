@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+from unittest import mock
+
+from .. import instrumentation
+from ..base import Factory
+from ..generators import Gen
+from ..generators import lazy
+from ..persistance import PersistanceMixin
+
+
+class TestHistogram(TestCase):
+
+    def test_buckets(self):
+        h = instrumentation.Histogram(bounds=(1, 10))
+        for v in (0.5, 1, 5, 20):
+            h.observe(v)
+        self.assertEqual(h.buckets, [2, 1, 1])
+        self.assertEqual(h.count, 4)
+        self.assertEqual(h.total, 26.5)
+        self.assertEqual(h.min, 0.5)
+        self.assertEqual(h.max, 20)
+
+
+class TestRegistry(TestCase):
+
+    def setUp(self):
+        self.registry = instrumentation.Registry()
+
+    def test_counters(self):
+        self.registry.incr("F", "calls")
+        self.registry.incr("F", "calls", 2)
+        self.assertEqual(self.registry.dump()["F"]["counters"], {"calls": 3})
+
+    def test_timings(self):
+        self.registry.timing("F", "foo", "gen", 1.0)
+        self.registry.timing("F", "foo", "gen", 2.0)
+        self.assertEqual(
+            self.registry.dump()["F"]["fields"],
+            {"foo": {"gen": {"count": 2, "total": 3.0}}}
+        )
+
+    def test_histograms(self):
+        self.registry.observe("F", "save", 0.5)
+        h = self.registry.dump()["F"]["histograms"]["save"]
+        self.assertEqual(h["count"], 1)
+
+    def test_reset(self):
+        self.registry.incr("F", "calls")
+        self.registry.reset()
+        self.assertEqual(self.registry.dump(), {})
+
+    def test_callbacks(self):
+        callback = mock.Mock()
+        self.registry.subscribe(callback)
+        self.registry.incr("F", "calls")
+        self.registry.timing("F", "foo", "gen", 1.0)
+        self.registry.observe("F", "save", 2.0)
+        self.assertEqual(
+            callback.call_args_list,
+            [
+                mock.call("counter", "F", "calls", 1),
+                mock.call("timing", "F", "foo.gen", 1.0),
+                mock.call("histogram", "F", "save", 2.0),
+            ]
+        )
+        self.registry.unsubscribe(callback)
+        self.registry.incr("F", "calls")
+        self.assertEqual(callback.call_count, 3)
+
+
+class TestEnableDisable(TestCase):
+
+    def tearDown(self):
+        instrumentation.disable()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(instrumentation.active)
+
+    def test_enable_uses_default_registry(self):
+        instrumentation.enable()
+        self.assertIs(instrumentation.active, instrumentation.registry)
+
+    def test_enable_custom_registry(self):
+        registry = instrumentation.Registry()
+        instrumentation.enable(registry)
+        self.assertIs(instrumentation.active, registry)
+
+    def test_recording_restores_previous_state(self):
+        with instrumentation.recording() as registry:
+            self.assertIs(instrumentation.active, registry)
+        self.assertIsNone(instrumentation.active)
+
+
+class TestFactoryInstrumentation(TestCase):
+
+    def setUp(self):
+        class PetFactory(Factory):
+            defaults = {"name": "Rocky"}
+
+        class PersonFactory(Factory):
+            defaults = {
+                "name": lazy(Gen, ["Bob", "Alice", "Eve"]),
+                "age": 42,
+                "pet": PetFactory,
+            }
+
+        self.PersonFactory = PersonFactory
+
+    def test_nothing_recorded_when_disabled(self):
+        with instrumentation.recording() as registry:
+            pass
+        self.PersonFactory()()
+        self.assertEqual(registry.dump(), {})
+
+    def test_counters(self):
+        with instrumentation.recording() as registry:
+            factory = self.PersonFactory()
+            factory()
+            factory.many(2)
+        metrics = registry.dump()
+        self.assertEqual(
+            metrics["PersonFactory"]["counters"],
+            {"calls": 3, "built": 3, "many": 1}
+        )
+        # ``many`` creates the nested objects with a single ``many``
+        self.assertEqual(
+            metrics["PetFactory"]["counters"],
+            {"calls": 3, "built": 3, "many": 1}
+        )
+
+    def test_field_timings(self):
+        with instrumentation.recording() as registry:
+            factory = self.PersonFactory()
+            factory()
+        fields = registry.dump()["PersonFactory"]["fields"]
+        self.assertEqual(fields["name"]["lazy"]["count"], 1)
+        self.assertEqual(fields["pet"]["lazy"]["count"], 1)
+        self.assertEqual(fields["name"]["gen"]["count"], 1)
+        self.assertEqual(fields["pet"]["factory"]["count"], 1)
+        self.assertNotIn("age", fields)
+
+    def test_instrumentation_name(self):
+        factory = Factory(foo=1)
+        factory.instrumentation_name = "foos"
+        with instrumentation.recording() as registry:
+            factory()
+        self.assertIn("foos", registry.dump())
+
+    def test_same_objects_as_uninstrumented(self):
+        factory1 = self.PersonFactory()
+        factory2 = self.PersonFactory()
+        with instrumentation.recording():
+            objs = factory1.many(3, age=1, pet__name="Toby")
+        self.assertEqual(objs, factory2.many(3, age=1, pet__name="Toby"))
+
+
+class TestPersistanceInstrumentation(TestCase):
+
+    def setUp(self):
+        class Object(object):
+            def __init__(self, **kwargs):
+                self.__dict__.update(kwargs)
+
+        class MyFactory(PersistanceMixin, Factory):
+            constructor = Object
+
+            def _get_fields(self, obj):
+                return list(obj.__dict__.items())
+
+            def _is_persistable(self, obj):
+                return isinstance(obj, Object)
+
+            def _save(self, obj):
+                return obj
+
+        self.factory = MyFactory(foo=42)
+
+    def test_saves(self):
+        with instrumentation.recording() as registry:
+            self.factory.make_many(3)
+        metrics = registry.dump()["MyFactory"]
+        self.assertEqual(metrics["counters"]["saves"], 3)
+        self.assertEqual(metrics["histograms"]["save"]["count"], 3)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+
+from ..base import Factory
+from ..generators import Normal, choice, computed, lazy, randint, count
+from ..memo import BatchMemo
+
+
+class TestBatchMemo(TestCase):
+
+    def test_reuses_columns(self):
+        memo = BatchMemo()
+        values = memo.column(randint(1, 10 ** 6).seed(1), 100)
+        g = randint(1, 10 ** 6).seed(1)
+        self.assertIs(memo.column(g, 100), values)
+        self.assertEqual((memo.hits, memo.misses), (1, 1))
+        self.assertEqual(next(g), next(self.after(100)))
+
+    def after(self, n):
+        g = randint(1, 10 ** 6).seed(1)
+        g.seek(n)
+        return g
+
+    def test_shorter_requests(self):
+        memo = BatchMemo()
+        values = memo.column(randint(1, 10 ** 6).seed(1), 100)
+        self.assertEqual(memo.column(randint(1, 10 ** 6).seed(1), 10),
+                         values[:10])
+
+    def test_key(self):
+        memo = BatchMemo()
+        memo.column(randint(1, 10 ** 6).seed(1), 10)
+        for g in (randint(1, 10 ** 6).seed(2), randint(1, 10).seed(1),
+                  self.after(5)):
+            memo.column(g, 10)
+        self.assertEqual((memo.hits, memo.misses), (0, 4))
+
+    def test_unseeded_generators_are_not_memoized(self):
+        memo = BatchMemo()
+        self.assertIsNone(memo.column(randint(1, 10), 10))
+        self.assertIsNone(memo.column(count(), 10))
+        self.assertEqual(len(memo), 0)
+
+    def test_unpicklable_configuration(self):
+        g = choice([lambda: 1]).seed(1)
+        self.assertIsNone(BatchMemo().column(g, 10))
+
+    def test_lru_eviction(self):
+        size = BatchMemo._size(BatchMemo().column(randint(1, 9).seed(0), 100))
+        memo = BatchMemo(max_bytes=size * 5 // 2)
+        for seed in (1, 2, 1, 3):
+            memo.column(randint(1000, 10 ** 6).seed(seed), 100)
+        self.assertEqual(memo.evictions, 1)
+        self.assertLessEqual(memo.bytes, memo.max_bytes)
+        memo.column(randint(1000, 10 ** 6).seed(1), 100)
+        self.assertEqual(memo.hits, 2)
+
+    def test_columns_larger_than_the_memo_are_not_stored(self):
+        memo = BatchMemo(max_bytes=10)
+        memo.column(randint(1, 10).seed(1), 100)
+        self.assertEqual((len(memo), memo.bytes), (0, 0))
+
+    def test_max_bytes_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            BatchMemo(0)
+
+
+class TestFactoryMemo(TestCase):
+
+    def setUp(self):
+        memo = self.memo = BatchMemo()
+
+        class OrderFactory(Factory):
+            seed = 42
+            defaults = {
+                "id": lazy(count, 1),
+                "status": "open",
+                "amount": Normal(100, 10),
+                "customer": lazy(randint, 1, 1000),
+                "label": computed(lambda status, customer: "%s-%i" % (
+                    status, customer
+                ), depends=["status", "customer"]),
+            }
+
+        self.OrderFactory = OrderFactory
+        self.expected = OrderFactory().many(300, status="closed")
+        OrderFactory.memo = memo
+
+    def test_results_match_a_fresh_run(self):
+        self.OrderFactory().many(300)
+        self.assertEqual(self.OrderFactory().many(300, status="closed"),
+                         self.expected)
+        self.assertEqual(self.memo.hits, 2)
+
+    def test_generators_move_forward(self):
+        memo = self.memo
+        self.OrderFactory().many(300)
+        self.OrderFactory.memo = None
+        fresh = self.OrderFactory()
+        fresh.many(300)
+        expected = fresh.many(10)
+        self.OrderFactory.memo = memo
+        factory = self.OrderFactory()
+        factory.many(300)
+        self.assertEqual(factory.many(10), expected)
+
+    def test_overridden_generators_are_not_consumed(self):
+        self.OrderFactory().many(300, customer=1)
+        self.assertEqual(self.memo.misses, 1)
+
+    def test_shared_generators_are_not_memoized(self):
+        g = randint(1, 10 ** 6).seed(1)
+        factory = Factory(a=g, b=g)
+        factory.memo = self.memo
+        factory.many(10)
+        self.assertEqual(len(self.memo), 0)
+
+    def test_generators_shared_with_nested_factories(self):
+        def make(memo):
+            g = randint(1, 10 ** 6).seed(1)
+
+            class Sub(Factory):
+                defaults = {"v": g}
+
+            class Top(Factory):
+                defaults = {"v": g, "sub": Sub}
+
+            Top.memo = memo
+            return Top()
+
+        self.assertEqual(make(BatchMemo()).many(3), make(None).many(3))
+        factory = make(self.memo)
+        factory.many(3, w=factory._defaults["v"].map(str))
+        self.assertEqual(len(self.memo), 0)
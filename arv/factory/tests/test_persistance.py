@@ -2,17 +2,21 @@
 
 # $Id:$
 
-from __future__ import unicode_literals
-from builtins import object
 
+import itertools
+import pickle
 from unittest import TestCase
-try:
-    from unittest import mock
-except ImportError:
-    import mock
+from unittest import mock
 
+from .. import instrumentation
 from ..base import Factory
+from ..generators import count
+from ..generators import lazy
+from ..generators import related
+from ..persistance import AdaptiveBatchSize
+from ..persistance import HiLo
 from ..persistance import PersistanceMixin
+from ..persistance import hilo
 
 
 class TestPersistanceMixin(TestCase):
@@ -67,6 +71,12 @@ class TestPersistanceMixin(TestCase):
         obj = self.factory.make(foo=1)
         self.assertEqual(obj.foo, 1)
 
+    def test_make_materializes_deferred_objects(self):
+        self.factory.deferred = True
+        obj = self.factory.make()
+        self.assertIsInstance(obj, self.Object)
+        self.assertTrue(obj.persisted)
+
     def test_make_raises_ValueError_if_not_persistable(self):
         with self.assertRaisesRegexp(ValueError, "Non persistable object."):
             self.factory.make(persistable=False)
@@ -81,3 +91,259 @@ class TestPersistanceMixin(TestCase):
                 (5, self.factory.make, {"foo": 1, "bar": "Hello"})
             )
             self.assertEqual(kwargs, {})
+
+
+class TestBatches(TestCase):
+
+    def setUp(self):
+        saved = self.saved = []
+
+        class Object(object):
+            def __init__(self, **kwargs):
+                self.__dict__.update(kwargs)
+
+        class BatchFactory(PersistanceMixin, Factory):
+            constructor = Object
+            batch_size = 4
+            defaults = {"id": lazy(count, 1)}
+
+            def _get_fields(self, obj):
+                return list(obj.__dict__.items())
+
+            def _is_persistable(self, obj):
+                return isinstance(obj, Object)
+
+            def _save_many(self, objs):
+                saved.append([o.id for o in objs])
+                return objs
+
+        self.BatchFactory = BatchFactory
+
+    def test_saves_in_batches(self):
+        objs = self.BatchFactory().make_many(10)
+        self.assertEqual([o.id for o in objs], list(range(1, 11)))
+        self.assertEqual([len(b) for b in self.saved], [4, 4, 2])
+
+    def test_overrides(self):
+        objs = self.BatchFactory().make_many(5, id=0)
+        self.assertEqual({o.id for o in objs}, {0})
+
+    def test_deferred_objects_are_materialized(self):
+        self.BatchFactory.deferred = True
+        objs = self.BatchFactory().make_many(5)
+        self.assertEqual(sum(self.saved, []), [o.id for o in objs])
+
+    def test_non_persistable_objects_raise_ValueError(self):
+        self.BatchFactory.constructor = dict
+        with self.assertRaises(ValueError):
+            self.BatchFactory().make_many(5)
+
+    def test_invalid_batch_size(self):
+        self.BatchFactory.batch_size = 0
+        with self.assertRaises(ValueError):
+            self.BatchFactory().make_many(5)
+
+    def test_adaptive(self):
+        tuner = self.BatchFactory.batch_size = AdaptiveBatchSize(
+            min=2, max=16, start=2
+        )
+        # every batch takes a second, the bigger the better
+        with mock.patch.object(instrumentation, "clock",
+                               itertools.count().__next__):
+            self.BatchFactory().make_many(100)
+        self.assertEqual(sum(map(len, self.saved)), 100)
+        self.assertEqual([len(b) for b in self.saved[:4]], [2, 4, 8, 16])
+        self.assertEqual(tuner.size, 16)
+
+    def test_sizes_are_instrumented(self):
+        with instrumentation.recording() as registry:
+            self.BatchFactory().make_many(10)
+        h = registry.histograms[("BatchFactory", "batch_size")]
+        self.assertEqual((h.count, h.total, h.max), (3, 10, 4))
+        self.assertEqual(h.bounds, instrumentation.SIZE_BOUNDS)
+
+
+class TestAdaptiveBatchSize(TestCase):
+
+    def run_tuner(self, tuner, cost, rounds=40):
+        for _ in range(rounds):
+            tuner.record(tuner.size, cost(tuner.size))
+        return tuner.size
+
+    def test_grows_while_the_throughput_grows(self):
+        tuner = AdaptiveBatchSize(min=1, max=1000, start=1)
+        # constant round trip cost, bigger is better
+        self.assertEqual(self.run_tuner(tuner, lambda n: 1.0 + n), 1000)
+
+    def test_settles_around_the_best_size(self):
+        tuner = AdaptiveBatchSize(min=1, max=100000, start=10)
+        # round trip plus a cost growing with the square of the size,
+        # the best size is 1000
+        size = self.run_tuner(tuner, lambda n: 1.0 + n * 1e-3 + n * n * 1e-6)
+        self.assertTrue(500 <= size <= 2000, size)
+
+    def test_max_latency(self):
+        tuner = AdaptiveBatchSize(min=1, max=1000, start=1, max_latency=50)
+        size = self.run_tuner(tuner, lambda n: float(n))
+        self.assertLessEqual(size, 100)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            AdaptiveBatchSize(min=10, max=1)
+        with self.assertRaises(ValueError):
+            AdaptiveBatchSize(factor=1)
+
+    def test_start_is_clamped(self):
+        self.assertEqual(AdaptiveBatchSize(min=1, max=50).size, 50)
+
+
+class TestHiLo(TestCase):
+
+    def setUp(self):
+        self.allocator = mock.Mock(side_effect=[1, 101])
+        self.gen = HiLo("seq", block_size=3, allocator=self.allocator)
+
+    def test_reserves_blocks_lazily(self):
+        self.assertEqual(self.allocator.call_count, 0)
+        next(self.gen)
+        self.assertEqual(self.allocator.call_args, (("seq", 3), {}))
+
+    def test_one_call_per_block(self):
+        values = [next(self.gen) for _ in range(5)]
+        self.assertEqual(values, [1, 2, 3, 101, 102])
+        self.assertEqual(self.allocator.call_count, 2)
+
+    def test_requires_allocator(self):
+        with self.assertRaises(RuntimeError):
+            next(HiLo())
+
+    def test_requires_positive_block_size(self):
+        with self.assertRaises(ValueError):
+            HiLo(block_size=0)
+
+    def test_bind_does_not_override_allocator(self):
+        self.gen.bind(mock.Mock())
+        self.assertIs(self.gen._allocator, self.allocator)
+
+    def test_pickled_copies_start_with_a_new_block(self):
+        gen = HiLo("seq", block_size=3)
+        gen.bind(self.allocator)
+        self.assertEqual(next(gen), 1)
+        gen._allocator = None
+        copy = pickle.loads(pickle.dumps(gen))
+        copy.bind(self.allocator)
+        self.assertEqual(next(copy), 101)
+        self.assertEqual(next(gen), 2)
+
+    def test_hilo_is_lazy(self):
+        c = hilo("seq", 10)
+        self.assertIsInstance(c, lazy)
+        g = c()
+        self.assertIsInstance(g, HiLo)
+        self.assertEqual(g.sequence, "seq")
+        self.assertEqual(g.block_size, 10)
+
+
+class TestHiLoPersistance(TestCase):
+
+    def setUp(self):
+        class Object(object):
+            def __init__(self, **kwargs):
+                self.__dict__.update(kwargs)
+                self.saved = False
+
+        class MyFactory(PersistanceMixin, Factory):
+            constructor = Object
+            defaults = {"id": hilo("object_seq", 2)}
+            next_id = 1
+
+            def _get_fields(self, obj):
+                return list(obj.__dict__.items())
+
+            def _is_persistable(self, obj):
+                return isinstance(obj, Object)
+
+            def _save(self, obj):
+                obj.saved = True
+                return obj
+
+            def _reserve_ids(self, sequence, count):
+                first = MyFactory.next_id
+                MyFactory.next_id += count
+                return first
+
+        self.MyFactory = MyFactory
+
+    def test_ids_are_assigned_before_saving(self):
+        obj = self.MyFactory()()
+        self.assertEqual(obj.id, 1)
+        self.assertFalse(obj.saved)
+
+    def test_factories_reserve_different_blocks(self):
+        factory1 = self.MyFactory()
+        factory2 = self.MyFactory()
+        ids = [f.make().id for f in (factory1, factory2) * 3]
+        self.assertEqual(ids, [1, 3, 2, 4, 5, 7])
+
+    def test_binds_HiLo_passed_as_arguments(self):
+        factory = self.MyFactory(id=HiLo(block_size=5))
+        self.assertEqual(factory().id, 1)
+        self.assertEqual(self.MyFactory.next_id, 6)
+
+
+class TestRelatedPersistance(TestCase):
+
+    def setUp(self):
+        saved = self.saved = []
+
+        class Object(object):
+            def __init__(self, **kwargs):
+                self.__dict__.update(kwargs)
+
+        class ObjectFactory(PersistanceMixin, Factory):
+            constructor = Object
+
+            def _get_fields(self, obj):
+                return list(obj.__dict__.items())
+
+            def _is_persistable(self, obj):
+                return isinstance(obj, Object)
+
+            def _link_children(self, parent, name, children):
+                for child in children:
+                    child.parent = parent.name
+
+            def _save(self, obj):
+                saved.append(obj.name)
+                return obj
+
+        class LineFactory(ObjectFactory):
+            defaults = {"name": lazy(lambda: iter("abcdef"))}
+
+            def _save_many(self, objs):
+                saved.append([obj.name for obj in objs])
+                return objs
+
+        class OrderFactory(ObjectFactory):
+            defaults = {
+                "name": lazy(lambda: iter("XYZ")),
+                "lines": related(LineFactory,
+                                 count=lazy(lambda: iter([2, 1]))),
+            }
+
+        self.OrderFactory = OrderFactory
+
+    def test_children_are_saved_in_bulk_after_the_parent(self):
+        order = self.OrderFactory().make()
+        self.assertEqual(self.saved, ["X", ["a", "b"]])
+        self.assertEqual([l.parent for l in order.lines], ["X", "X"])
+
+    def test_make_many(self):
+        orders = self.OrderFactory().make_many(2)
+        self.assertEqual(self.saved, ["X", ["a", "b"], "Y", ["c"]])
+        self.assertEqual(orders[1].lines[0].parent, "Y")
+
+    def test_default_save_many_saves_each_object(self):
+        lines = self.OrderFactory()().lines
+        self.OrderFactory()._persist_many(lines)
+        self.assertEqual(self.saved, ["a", "b"])
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import operator
+import pickle
+import threading
+import time
+from unittest import TestCase
+
+from ..base import Factory
+from ..generators import Gen, Normal, count, lazy, mkgen, randint, related
+from ..generators import string, template, timestamps, unique
+from ..producer import CHUNK, SPAN, Producer, _partition
+from ..records import Slots
+
+
+class OrderFactory(Factory):
+    defaults = {"id": lazy(count, 1), "status": "open"}
+
+
+def skus():
+    return unique(randint(1, 10 ** 6))
+
+
+def codes():
+    return template("c-{n}", n=count())
+
+
+class ItemFactory(Factory):
+    seed = 3
+    defaults = {"sku": lazy(skus), "code": lazy(codes)}
+
+
+class SeededFactory(Factory):
+    seed = 3
+    defaults = {"id": lazy(count, 1), "amount": Normal(100, 10),
+                "item": ItemFactory}
+
+
+class TestProducer(TestCase):
+
+    def test_objects_in_order(self):
+        with OrderFactory().producer(n=200) as producer:
+            orders = list(producer)
+        self.assertEqual([o["id"] for o in orders], list(range(1, 201)))
+        self.assertEqual(producer.stats()["consumed"], 200)
+
+    def test_overrides(self):
+        orders = list(OrderFactory().producer(n=3, status="closed"))
+        self.assertEqual({o["status"] for o in orders}, {"closed"})
+
+    def test_endless(self):
+        with OrderFactory().producer(queue_size=10) as producer:
+            it = iter(producer)
+            ids = [next(it)["id"] for _ in range(1000)]
+        self.assertEqual(ids, list(range(1, 1001)))
+
+    def test_queue_is_bounded(self):
+        produced = []
+        factory = Factory(id=mkgen(lambda: produced.append(1)))
+        producer = factory.producer(queue_size=8)
+        time.sleep(0.2)
+        # the queue and the chunk waiting for room in it
+        self.assertLessEqual(len(produced), 16)
+        self.assertEqual(producer.stats()["consumed"], 0)
+        producer.close()
+        self.assertTrue(all(not w.is_alive() for w in producer._workers))
+
+    def test_abandoned_producers_stop(self):
+        producer = OrderFactory().producer(queue_size=1)
+        worker = producer._workers[0]
+        del producer
+        worker.join(1)
+        self.assertFalse(worker.is_alive())
+
+    def test_errors_are_raised_by_the_consumer(self):
+        def fail():
+            raise KeyError("boom")
+
+        producer = Factory(id=mkgen(fail)).producer(n=10)
+        with self.assertRaises(KeyError):
+            list(producer)
+        self.assertEqual(list(producer), [])
+
+    def test_stats(self):
+        producer = OrderFactory().producer(n=CHUNK * 4, queue_size=CHUNK * 4)
+        time.sleep(0.1)
+        list(producer)
+        stats = producer.stats()
+        self.assertEqual(stats["consumed"], CHUNK * 4)
+        self.assertEqual(stats["queued"], 0)
+        self.assertGreater(stats["max_queued"], 0)
+        self.assertGreater(stats["throughput"], 0)
+
+    def test_async_iteration(self):
+        async def consume(producer):
+            return [o["id"] async for o in producer]
+
+        producer = OrderFactory().producer(n=150, queue_size=16)
+        ids = asyncio.run(consume(producer))
+        self.assertEqual(ids, list(range(1, 151)))
+
+    def test_async_consumer_doesnt_block_the_loop(self):
+        release = threading.Event()
+        factory = Factory(id=mkgen(lambda: release.wait()))
+
+        async def consume():
+            async def ticker():
+                await asyncio.sleep(0.05)
+                release.set()
+            task = asyncio.ensure_future(ticker())
+            async for obj in factory.producer(n=1):
+                pass
+            await task
+            return obj
+
+        self.assertEqual(asyncio.run(consume()), {"id": True})
+
+    def test_processes(self):
+        with OrderFactory().producer(n=100, workers=2,
+                                     processes=True) as producer:
+            orders = list(producer)
+        self.assertEqual(sorted(o["id"] for o in orders), list(range(1, 101)))
+
+    def test_objects_that_cant_be_pickled(self):
+        class RecordFactory(OrderFactory):
+            constructor = Slots()
+
+        producer = RecordFactory().producer(n=10, processes=True)
+        with self.assertRaises(pickle.PicklingError):
+            list(producer)
+        self.assertTrue(all(not w.is_alive() for w in producer._workers))
+
+    def test_workers_get_slices_of_the_values(self):
+        factory = SeededFactory()
+        expected = SeededFactory().many(300)
+        with factory.producer(n=300, workers=3, processes=True) as producer:
+            objs = list(producer)
+        key = operator.itemgetter("id")
+        self.assertEqual(sorted(objs, key=key), expected)
+        self.assertEqual(factory()["id"], 1)
+
+    def test_endless_workers(self):
+        with OrderFactory().producer(workers=2, processes=True,
+                                     id=count(5)) as producer:
+            ids = {o["id"] for o, _ in zip(producer, range(500))}
+        self.assertEqual(len(ids), 500)
+        self.assertLessEqual({(i - 5) // SPAN for i in ids}, {0, 1})
+
+    def test_partition(self):
+        factory = Factory(id=count(5), n=randint(1, 10 ** 6).seed(1))
+        copy, kwargs = _partition(factory, {"m": count()}, 1000)
+        obj, = copy.many(1, **kwargs)
+        g = randint(1, 10 ** 6).seed(1)
+        g.seek(1000)
+        self.assertEqual(obj, {"id": 1005, "n": next(g), "m": 1000})
+        self.assertEqual(factory()["id"], 5)
+
+    def test_factories_that_cant_be_split(self):
+        ids = count()
+        for factory in (Factory(a=Gen([1, 2, 3])),
+                        Factory(a=ids, b=string("%i", ids)),
+                        Factory(t=timestamps(0, 1)),
+                        Factory(pets=related(Factory(), count=2))):
+            with self.assertRaises(ValueError):
+                factory.producer(n=10, workers=2, processes=True)
+
+    def test_close_with_large_objects_queued(self):
+        factory = Factory(id=count(), blob=mkgen(lambda: "x" * 5000))
+        producer = factory.producer(processes=True)
+        next(iter(producer))
+        start = time.perf_counter()
+        producer.close()
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertTrue(all(not w.is_alive() for w in producer._workers))
+
+    def test_arguments(self):
+        for kwargs in ({"queue_size": 0}, {"workers": 0}, {"workers": 2}):
+            with self.assertRaises(ValueError):
+                Producer(OrderFactory(), 1, **kwargs)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import json
+from unittest import TestCase
+from unittest import mock
+
+from .. import instrumentation
+from .. import profiling
+from ..base import Factory
+from ..generators import Count
+from ..generators import string
+from ..persistance import PersistanceMixin
+
+
+class PetFactory(Factory):
+    defaults = {"name": "Rocky"}
+
+
+class PersonFactory(Factory):
+    defaults = {
+        "id": Count(),
+        "name": string("user%i"),
+        "pet": PetFactory,
+    }
+
+
+class TestProfile(TestCase):
+
+    def setUp(self):
+        self.factory = PersonFactory()
+        self.report = self.factory.profile(50)
+
+    def test_report_contents(self):
+        d = self.report.as_dict()
+        self.assertEqual(d["factory"], "PersonFactory")
+        self.assertEqual(d["count"], 50)
+        self.assertGreater(d["elapsed"], 0)
+        self.assertGreater(d["bytes_per_object"], 0)
+        self.assertGreaterEqual(d["peak"], 0)
+
+    def test_nested_factories(self):
+        nested = self.report.nested_factories()
+        self.assertEqual(len(nested), 1)
+        self.assertEqual(nested[0]["factory"], "PersonFactory")
+        self.assertEqual(nested[0]["field"], "pet")
+        self.assertEqual(nested[0]["count"], 50)
+
+    def test_generators(self):
+        fields = sorted(g["field"] for g in self.report.generators())
+        self.assertEqual(fields, ["id", "name"])
+
+    def test_generators_honors_top(self):
+        report = profiling.profile(self.factory, 10, top=1)
+        self.assertEqual(len(report.generators()), 1)
+
+    def test_objects_are_created(self):
+        self.assertEqual(self.factory()["id"], 50)
+
+    def test_instrumentation_is_restored(self):
+        self.assertIsNone(instrumentation.active)
+
+    def test_as_json(self):
+        d = json.loads(self.report.as_json())
+        self.assertEqual(d["count"], 50)
+
+    def test_as_text(self):
+        text = self.report.as_text()
+        self.assertIn("Factory: PersonFactory", text)
+        self.assertIn("Objects: 50", text)
+        self.assertIn("PersonFactory.pet", text)
+
+    def test_passes_kwargs(self):
+        with mock.patch.object(self.factory, "many") as many:
+            self.factory.profile(3, name="Bob")
+        many.assert_called_once_with(3, name="Bob")
+
+
+class TestProfileMake(TestCase):
+
+    def test_uses_make_many(self):
+        class MyFactory(PersistanceMixin, Factory):
+            pass
+
+        factory = MyFactory()
+        with mock.patch.object(factory, "make_many") as make_many:
+            factory.profile_make(3, name="Bob")
+        make_many.assert_called_once_with(3, name="Bob")
+
+
+class TestMain(TestCase):
+
+    def test_loads_factory_class(self):
+        factory = profiling._load(__name__ + ":PersonFactory")
+        self.assertIsInstance(factory, PersonFactory)
+
+    def test_prints_report(self):
+        with mock.patch("sys.stdout") as stdout:
+            res = profiling.main([__name__ + ":PersonFactory", "-n", "5",
+                                  "--json"])
+        self.assertEqual(res, 0)
+        output = "".join(c[0][0] for c in stdout.write.call_args_list)
+        self.assertEqual(json.loads(output)["count"], 5)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+import sys
+from unittest import TestCase
+
+from ..base import DELETE, Factory
+from ..generators import Gen, count
+from ..records import LazyRecord, Slots, Tuple, make_slots_class
+
+
+class TestMakeSlotsClass(TestCase):
+
+    def setUp(self):
+        self.cls = make_slots_class("Point", ["x", "y"])
+
+    def test_attributes(self):
+        p = self.cls(x=1, y=2)
+        self.assertEqual((p.x, p.y), (1, 2))
+
+    def test_has_no_dict(self):
+        self.assertFalse(hasattr(self.cls(x=1, y=2), "__dict__"))
+
+    def test_equality(self):
+        self.assertEqual(self.cls(x=1, y=2), self.cls(x=1, y=2))
+        self.assertNotEqual(self.cls(x=1, y=2), self.cls(x=1, y=3))
+
+    def test_repr(self):
+        self.assertEqual(repr(self.cls(x=1, y=2)), "Point(x=1, y=2)")
+
+    def test_asdict(self):
+        self.assertEqual(self.cls(x=1, y=2)._asdict(), {"x": 1, "y": 2})
+
+    def test_field_named_self(self):
+        cls = make_slots_class("Record", ["self"])
+        self.assertEqual(cls(self=1).self, 1)
+
+    def test_missing_field_raises_TypeError(self):
+        with self.assertRaises(TypeError):
+            self.cls(x=1)
+
+    def test_invalid_field_name_raises_ValueError(self):
+        for name in ("not valid", "1x", "class"):
+            with self.assertRaises(ValueError):
+                make_slots_class("Record", [name])
+
+
+class TestRecordFactories(TestCase):
+
+    def make_factory(self, constructor):
+        class PetFactory(Factory):
+            defaults = {"name": "Rocky", "kind": "dog"}
+
+        class PersonFactory(Factory):
+            defaults = {
+                "id": Gen([1, 2, 3]),
+                "name": "Bob",
+                "pet": PetFactory,
+            }
+
+        PersonFactory.constructor = constructor
+        return PersonFactory()
+
+    def test_slots(self):
+        person = self.make_factory(Slots())()
+        self.assertEqual(type(person).__name__, "PersonFactoryRecord")
+        self.assertEqual((person.id, person.name), (1, "Bob"))
+
+    def test_tuple(self):
+        person = self.make_factory(Tuple(name="Person"))()
+        self.assertIsInstance(person, tuple)
+        self.assertEqual(type(person).__name__, "Person")
+        self.assertEqual(person.name, "Bob")
+
+    def test_nested_factories_build_records(self):
+        for constructor in (Slots(), Tuple()):
+            person = self.make_factory(constructor)(pet__name="Toby")
+            self.assertEqual(type(person.pet).__name__, "PetRecord")
+            self.assertEqual((person.pet.name, person.pet.kind),
+                             ("Toby", "dog"))
+
+    def test_not_nested(self):
+        person = self.make_factory(Slots(nested=False))()
+        self.assertEqual(person.pet, {"name": "Rocky", "kind": "dog"})
+
+    def test_nested_factory_is_not_modified(self):
+        pet_factory = Factory(name="Rocky")
+        factory = Factory(pet=pet_factory)
+        factory._resolve_record_constructor(Slots())
+        self.assertEqual(factory().pet.name, "Rocky")
+        self.assertEqual(pet_factory(), {"name": "Rocky"})
+
+    def test_many(self):
+        people = self.make_factory(Slots()).many(3)
+        self.assertEqual([p.id for p in people], [1, 2, 3])
+
+    def test_override(self):
+        person = self.make_factory(Tuple())(name="Alice")
+        self.assertEqual(person.name, "Alice")
+
+    def test_unknown_attribute_raises_TypeError(self):
+        with self.assertRaises(TypeError):
+            self.make_factory(Slots())(age=42)
+
+    def test_delete_raises_TypeError(self):
+        with self.assertRaises(TypeError):
+            self.make_factory(Slots())(name=DELETE)
+
+    def test_smaller_than_dict(self):
+        factory = self.make_factory(Slots(nested=False))
+        self.assertLess(sys.getsizeof(factory()),
+                        sys.getsizeof(Factory(**factory._defaults)()))
+
+
+class TestLazyRecord(TestCase):
+
+    def make_factory(self):
+        class PetFactory(Factory):
+            defaults = {"id": Gen(count(100)), "name": "Rocky"}
+
+        class PersonFactory(Factory):
+            deferred = True
+            defaults = {
+                "id": Gen(count(1)),
+                "name": "Bob",
+                "pet": PetFactory,
+            }
+
+        return PersonFactory()
+
+    def test_returns_a_LazyRecord(self):
+        person = self.make_factory()()
+        self.assertIsInstance(person, LazyRecord)
+        self.assertEqual(list(person), ["id", "name", "pet"])
+
+    def test_nested_objects_are_built_on_first_read(self):
+        person = self.make_factory()()
+        self.assertTrue(person.is_pending("pet"))
+        self.assertEqual(person["pet"], {"id": 100, "name": "Rocky"})
+        self.assertFalse(person.is_pending("pet"))
+        self.assertIs(person["pet"], person["pet"])
+
+    def test_values_do_not_depend_on_read_order(self):
+        factory = self.make_factory()
+        p1, p2 = factory(), factory()
+        self.assertEqual(p2["pet"]["id"], 101)
+        self.assertEqual(p1["pet"]["id"], 100)
+
+    def test_attribute_access(self):
+        person = self.make_factory()()
+        self.assertEqual((person.id, person.name), (1, "Bob"))
+        with self.assertRaises(AttributeError):
+            person.age
+
+    def test_overrides(self):
+        person = self.make_factory()(name="Alice", pet__name="Toby")
+        self.assertEqual(person.name, "Alice")
+        self.assertEqual(person.pet, {"id": 100, "name": "Toby"})
+
+    def test_delete(self):
+        person = self.make_factory()(pet=DELETE)
+        self.assertEqual(list(person), ["id", "name"])
+
+    def test_setitem(self):
+        person = self.make_factory()()
+        person["pet"] = None
+        self.assertIsNone(person.pet)
+
+    def test_materialize(self):
+        factory = self.make_factory()
+        factory.constructor = Slots().resolve(factory, factory._prototype)
+        record = factory()
+        person = record.materialize()
+        self.assertFalse(record.is_pending("pet"))
+        self.assertIs(record["pet"], person.pet)
+        self.assertEqual(type(person).__name__, "PersonFactoryRecord")
+        self.assertEqual(person.pet, {"id": 100, "name": "Rocky"})
+
+    def test_many(self):
+        people = self.make_factory().many(2)
+        self.assertEqual([p.id for p in people], [1, 2])
+        self.assertEqual([p.pet["id"] for p in people], [100, 101])
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+import pickle
+import subprocess
+import sys
+from unittest import TestCase
+
+from ..rng import Stream, digest, mix
+
+
+class TestStream(TestCase):
+
+    def test_blocks_are_deterministic(self):
+        s1, s2 = Stream(42, "Person", "age"), Stream(42, "Person", "age")
+        self.assertEqual(s1.generator(7).random(), s2.generator(7).random())
+
+    def test_blocks_are_independent_of_the_order(self):
+        s = Stream(42)
+        first = s.generator(1).random()
+        s.generator(0).random()
+        self.assertEqual(s.generator(1).random(), first)
+
+    def test_keys_and_blocks_change_the_values(self):
+        values = {
+            Stream(*args).generator(block).random()
+            for args in ((1, ), (2, ), (1, "a"), (1, "b"))
+            for block in (-1, 0, 1)
+        }
+        self.assertEqual(len(values), 12)
+
+    def test_equality(self):
+        self.assertEqual(Stream(1, "a"), Stream(1, "a"))
+        self.assertNotEqual(Stream(1, "a"), Stream(1, "b"))
+        self.assertEqual(len({Stream(1, "a"), Stream(1, "a")}), 1)
+
+    def test_pickle(self):
+        s = pickle.loads(pickle.dumps(Stream(1, "a")))
+        self.assertEqual(s, Stream(1, "a"))
+        self.assertEqual(s.generator(3).random(),
+                         Stream(1, "a").generator(3).random())
+
+    def test_digest_is_stable_across_processes(self):
+        code = "from arv.factory.rng import digest; print(digest(1, 'a'))"
+        out = subprocess.check_output([sys.executable, "-c", code])
+        self.assertEqual(int(out), digest(1, "a"))
+
+    def test_mix(self):
+        self.assertNotEqual(mix(0), mix(1))
+        self.assertLess(mix(2 ** 64 - 1), 2 ** 64)
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+from unittest import mock
+
+from ..base import Factory
+from ..generators import Gen
+from ..records import Slots
+from ..schema import Schema, SchemaError, field
+
+
+class TestSchema(TestCase):
+
+    def setUp(self):
+        self.schema = Schema({
+            "id": field(int, min=1),
+            "name": field(str),
+            "age": field(int, min=0, max=150, nullable=True),
+            "email": field(str, required=False),
+            "kind": field(choices=["dog", "cat"], required=False),
+            "code": field(check=lambda v: v.isupper(), required=False),
+            "pet": Schema({"name": field(str)}),
+        })
+        self.obj = {"id": 1, "name": "Bob", "age": None,
+                    "pet": {"name": "Rocky"}}
+
+    def assertInvalid(self, message, **kwargs):
+        self.obj.update(kwargs)
+        with self.assertRaises(SchemaError) as cm:
+            self.schema.validate(self.obj)
+        self.assertEqual(str(cm.exception), message)
+
+    def test_valid(self):
+        self.assertIs(self.schema.validate(self.obj), self.obj)
+
+    def test_required(self):
+        del self.obj["name"]
+        self.assertInvalid("name: required")
+
+    def test_optional(self):
+        self.schema.validate(self.obj)
+        self.assertNotIn("email", self.obj)
+
+    def test_not_nullable(self):
+        self.assertInvalid("name: must not be None", name=None)
+
+    def test_type(self):
+        self.assertInvalid("name: unexpected type int", name=1)
+
+    def test_min(self):
+        self.assertInvalid("id: 0 < 1", id=0)
+
+    def test_max(self):
+        self.assertInvalid("age: 200 > 150", age=200)
+
+    def test_choices(self):
+        self.schema.validate(dict(self.obj, kind="dog"))
+        self.assertInvalid("kind: invalid choice 'fish'", kind="fish")
+
+    def test_check(self):
+        self.schema.validate(dict(self.obj, code="ABC"))
+        self.assertInvalid("code: check failed for 'abc'", code="abc")
+
+    def test_nested(self):
+        self.assertInvalid("pet.name: unexpected type int",
+                           pet={"name": 1})
+
+    def test_objects_with_attributes(self):
+        class Object(object):
+            def __init__(self, **kwargs):
+                self.__dict__.update(kwargs)
+
+        self.obj["pet"] = Object(name=1)
+        with self.assertRaises(SchemaError):
+            self.schema.validate(Object(**self.obj))
+
+    def test_path(self):
+        with self.assertRaises(SchemaError) as cm:
+            self.schema.validate({}, path="Person.")
+        self.assertTrue(str(cm.exception).startswith("Person."))
+
+    def test_SchemaError_is_a_ValueError(self):
+        self.assertTrue(issubclass(SchemaError, ValueError))
+
+
+class TestFactoryValidation(TestCase):
+
+    def setUp(self):
+        class PersonFactory(Factory):
+            schema = Schema({
+                "id": field(int, min=1),
+                "pet": Schema({"name": field(str)}),
+            })
+            defaults = {
+                "id": Gen([1, 2, 0, 3, 4, 5]),
+                "pet": Factory(name="Rocky"),
+            }
+
+        self.PersonFactory = PersonFactory
+
+    def test_validates_objects(self):
+        factory = self.PersonFactory()
+        factory()
+        factory()
+        with self.assertRaises(SchemaError) as cm:
+            factory()
+        self.assertEqual(str(cm.exception), "PersonFactory.id: 0 < 1")
+
+    def test_validates_nested_objects(self):
+        with self.assertRaises(SchemaError):
+            self.PersonFactory()(pet__name=1)
+
+    def test_validates_records(self):
+        self.PersonFactory.constructor = Slots()
+        with self.assertRaises(SchemaError):
+            self.PersonFactory()(pet__name=1)
+
+    def test_many_full(self):
+        with self.assertRaises(SchemaError):
+            self.PersonFactory().many(6)
+
+    def test_many_sample(self):
+        self.PersonFactory.validation = "sample"
+        self.PersonFactory.validation_sample = 2
+        factory = self.PersonFactory()
+        with self.assertRaises(SchemaError):
+            factory.many(3)
+        self.assertEqual(len(factory.many(2)), 2)
+
+    def test_many_sample_validates_every_kth_object(self):
+        self.PersonFactory.validation = "sample"
+        self.PersonFactory.validation_sample = 2
+        with mock.patch.object(self.PersonFactory.schema, "validate") as m:
+            self.PersonFactory().many(5, id=1)
+            self.assertEqual(m.call_count, 3)
+
+    def test_off(self):
+        self.PersonFactory.validation = "off"
+        factory = self.PersonFactory()
+        self.assertEqual(len(factory.many(6)), 6)
+        factory(id=0)
+
+    def test_invalid_mode_raises_ValueError(self):
+        self.PersonFactory.validation = "sometimes"
+        with self.assertRaises(ValueError):
+            self.PersonFactory()
+
+    def test_deferred_objects_are_validated_by_many(self):
+        self.PersonFactory.deferred = True
+        factory = self.PersonFactory()
+        factory()
+        with self.assertRaises(SchemaError):
+            factory.many(4)
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks for ``arv.factory``.
+
+The benchmarks follow the *asv* conventions: every ``bench_*`` module
+in this package defines classes with an optional ``setup`` method and
+one or more ``time_*`` methods. Each ``time_*`` method is timed in
+isolation, after calling ``setup`` on a fresh instance of its class.
+
+Run them from the project root with:
+
+.. code-block:: sh
+
+   $ python -m benchmarks run --output results.json
+   $ python -m benchmarks compare baseline.json results.json
+
+``compare`` exits with a non zero status when some benchmark is
+slower than the baseline by more than the given threshold.
+
+"""
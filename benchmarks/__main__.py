@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""Command line interface for the benchmarks.
+
+.. code-block:: sh
+
+   $ python -m benchmarks run [-k PATTERN] [-o results.json] [-b baseline.json]
+   $ python -m benchmarks compare baseline.json results.json
+
+"""
+import argparse
+import sys
+
+from . import runner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("run", help="run the benchmarks")
+    p.add_argument("-k", dest="pattern", default=None,
+                   help="run only benchmarks whose name contains PATTERN")
+    p.add_argument("-o", "--output", default=None,
+                   help="write the results to this JSON file")
+    p.add_argument("-b", "--baseline", default=None,
+                   help="compare the results against this JSON file")
+    p.add_argument("-r", "--repeat", type=int, default=runner.DEFAULT_REPEAT)
+    p.add_argument("-t", "--threshold", type=float,
+                   default=runner.DEFAULT_THRESHOLD)
+
+    p = sub.add_parser("compare", help="compare two result files")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument("-t", "--threshold", type=float,
+                   default=runner.DEFAULT_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        current = runner.run(args.pattern, args.repeat, stream=sys.stdout)
+        if args.output:
+            runner.save(current, args.output)
+        if not args.baseline:
+            return 0
+        baseline = runner.load(args.baseline)
+    elif args.command == "compare":
+        baseline = runner.load(args.baseline)
+        current = runner.load(args.current)
+    else:
+        parser.print_help()
+        return 2
+
+    rows, regressions = runner.compare(baseline, current, args.threshold)
+    runner.report(rows, regressions, args.threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""In-memory stand-in for a persistence backend.
+
+"""
+import time
+
+from arv.factory.api import Factory
+from arv.factory.persistance import PersistanceMixin
+
+
+class Row(object):
+    """Minimal model-like object."""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+        self.pk = None
+
+
+class MemoryBackend(object):
+    """Stores rows in a dictionary, assigning sequential primary keys.
+
+    ``round_trip`` simulates the latency of each call, in seconds,
+    spinning so that the time is measured precisely.
+
+    """
+
+    def __init__(self, round_trip=0.0):
+        self.rows = {}
+        self.round_trip = round_trip
+        self._next_pk = 1
+
+    def _wait(self):
+        if self.round_trip:
+            end = time.perf_counter() + self.round_trip
+            while time.perf_counter() < end:
+                pass
+
+    def save(self, obj):
+        self._wait()
+        return self._store(obj)
+
+    def _store(self, obj):
+        obj.pk = self._next_pk
+        self._next_pk += 1
+        self.rows[obj.pk] = obj
+        return obj
+
+    def save_many(self, objs):
+        self._wait()
+        for obj in objs:
+            self._store(obj)
+        return objs
+
+
+class MemoryFactory(PersistanceMixin, Factory):
+    """Persistent factory backed by a ``MemoryBackend``."""
+
+    constructor = Row
+    backend = None
+
+    def _get_fields(self, obj):
+        return [(k, v) for k, v in obj.__dict__.items() if k != "pk"]
+
+    def _is_persistable(self, obj):
+        return isinstance(obj, Row)
+
+    def _link_to_parent(self, parent, name, child):
+        setattr(parent, name + "_id", child.pk)
+
+    def _link_children(self, parent, name, children):
+        for child in children:
+            child.parent_id = parent.pk
+
+    def _save(self, obj):
+        return self.backend.save(obj)
+
+    def _save_many(self, objs):
+        return self.backend.save_many(objs)
@@ -0,0 +1,416 @@
+# -*- coding: utf-8 -*-
+
+"""Object creation benchmarks.
+
+"""
+import asyncio
+import itertools
+import time
+
+from arv.factory.api import Factory
+from arv.factory.api import gen
+from arv.factory.memo import BatchMemo
+from arv.factory.records import Slots
+from arv.factory.records import Tuple
+from arv.factory.schema import Schema
+from arv.factory.schema import field
+
+
+WIDE_FIELDS = 120
+
+
+def make_nested_factory(depth):
+    """Return a factory nesting ``depth`` levels of sub-factories."""
+    factory = Factory(name=gen.string("leaf-%i"), value=gen.count())
+    for i in range(depth):
+        factory = Factory(
+            name=gen.string("level%i-%%i" % i),
+            value=gen.count(),
+            child=factory,
+        )
+    return factory
+
+
+def make_wide_factory(width=WIDE_FIELDS):
+    """Return a factory with ``width`` fields, one in four generated."""
+    kwargs = {}
+    for i in range(width):
+        if i % 4:
+            kwargs["field%03i" % i] = i
+        else:
+            kwargs["field%03i" % i] = gen.count()
+    return Factory(**kwargs)
+
+
+class FlatFactory(object):
+
+    def setup(self):
+        self.factory = Factory(
+            name="Bob",
+            age=42,
+            email=gen.string("user%i@example.com"),
+            id=gen.count(),
+        )
+
+    def time_call(self):
+        self.factory()
+
+    def time_call_with_override(self):
+        self.factory(name="Alice")
+
+    def time_many_100(self):
+        self.factory.many(100)
+
+
+class NestedFactory(object):
+
+    def setup(self):
+        self.shallow = make_nested_factory(1)
+        self.deep = make_nested_factory(5)
+
+    def time_call_depth_1(self):
+        self.shallow()
+
+    def time_call_depth_5(self):
+        self.deep()
+
+    def time_call_depth_5_subattr_override(self):
+        self.deep(child__child__name="override")
+
+    def time_many_100_depth_5(self):
+        self.deep.many(100)
+
+
+class WideFactory(object):
+
+    def setup(self):
+        self.factory = make_wide_factory()
+
+    def time_call(self):
+        self.factory()
+
+    def time_many_100(self):
+        self.factory.many(100)
+
+    def time_eval_factory_arguments(self):
+        self.factory._eval_factory_arguments(self.factory._defaults)
+
+
+class LiteralHeavyFactory(object):
+    """60 literal fields, 3 generated and some mutable literals."""
+
+    def setup(self):
+        kwargs = dict(("field%02i" % i, i) for i in range(60))
+        kwargs.update(
+            id=gen.count(),
+            name=gen.string("user%i"),
+            email=gen.string("user%i@example.com"),
+            tags=["a", "b"],
+            settings={"theme": "dark", "limits": [1, 2, 3]},
+        )
+
+        class Shallow(Factory):
+            copy_literals = "shallow"
+
+        class Deep(Factory):
+            copy_literals = "deep"
+
+        self.factory = Factory(**kwargs)
+        self.shallow = Shallow(**kwargs)
+        self.deep = Deep(**kwargs)
+
+    def time_call(self):
+        self.factory()
+
+    def time_call_copy_shallow(self):
+        self.shallow()
+
+    def time_call_copy_deep(self):
+        self.deep()
+
+
+class Computed(object):
+    """Computed attributes compared to post-processing the objects."""
+
+    def setup(self):
+        self.factory = Factory(
+            first_name=gen.first_name(),
+            last_name=gen.last_name(),
+            full_name=gen.computed(
+                lambda first, last: first + " " + last,
+                depends=["first_name", "last_name"],
+            ),
+        )
+        self.plain = Factory(
+            first_name=gen.first_name(),
+            last_name=gen.last_name(),
+        )
+
+    def time_many_100_computed(self):
+        self.factory.many(100)
+
+    def time_many_100_post_processed(self):
+        for obj in self.plain.many(100):
+            obj["full_name"] = obj["first_name"] + " " + obj["last_name"]
+
+
+class Validation(object):
+    """Cost of the validation modes in ``many``."""
+
+    def setup(self):
+        class Person(Factory):
+            schema = Schema({
+                "id": field(int, min=0),
+                "name": field(str),
+                "age": field(int, min=0, max=150),
+                "pet": Schema({"name": field(str)}),
+            })
+            defaults = {
+                "id": gen.Count(),
+                "name": "Bob",
+                "age": gen.randint(0, 150),
+                "pet": Factory(name="Rocky"),
+            }
+
+        self.factories = {}
+        for mode in ("full", "sample", "off"):
+            self.factories[mode] = type(str(mode), (Person, ), {
+                "validation": mode,
+            })()
+
+    def time_many_100_full(self):
+        self.factories["full"].many(100)
+
+    def time_many_100_sample(self):
+        self.factories["sample"].many(100)
+
+    def time_many_100_off(self):
+        self.factories["off"].many(100)
+
+
+class Records(object):
+    """Record constructors compared to ``dict``."""
+
+    def setup(self):
+        class Pet(Factory):
+            defaults = {"name": "Rocky", "kind": gen.Cycle(["dog", "cat"])}
+
+        defaults = {
+            "id": gen.Count(),
+            "name": "Bob",
+            "email": gen.lazy(gen.string, "user%i@example.com"),
+            "age": 42,
+            "pet": Pet,
+        }
+
+        class AsDict(Factory):
+            pass
+
+        class AsSlots(Factory):
+            constructor = Slots()
+
+        class AsTuple(Factory):
+            constructor = Tuple()
+
+        for cls in (AsDict, AsSlots, AsTuple):
+            cls.defaults = defaults
+        self.dict = AsDict()
+        self.slots = AsSlots()
+        self.tuple = AsTuple()
+        self.dict_obj = self.dict()
+        self.slots_obj = self.slots()
+
+    def time_many_100_dict(self):
+        self.dict.many(100)
+
+    def time_many_100_slots(self):
+        self.slots.many(100)
+
+    def time_many_100_tuple(self):
+        self.tuple.many(100)
+
+    def time_item_access_dict(self):
+        self.dict_obj["name"]
+
+    def time_attribute_access_slots(self):
+        self.slots_obj.name
+
+
+class Deferred(object):
+    """Wide nested objects of which only one field is read."""
+
+    def setup(self):
+        class Eager(Factory):
+            defaults = {
+                "id": gen.Count(),
+                "child": make_nested_factory(5),
+                "other": make_wide_factory(40),
+            }
+
+        class Lazy(Eager):
+            deferred = True
+
+        self.eager = Eager()
+        self.lazy = Lazy()
+
+    def time_read_one_field_eager(self):
+        self.eager()["id"]
+
+    def time_read_one_field_deferred(self):
+        self.lazy()["id"]
+
+    def time_read_all_fields_deferred(self):
+        self.lazy().materialize()
+
+
+class Related(object):
+    """Orders with 1 to 20 lines, built with a ``mkgen`` loop calling
+    the line factory or as related objects."""
+
+    def setup(self):
+        class Line(Factory):
+            defaults = {"sku": gen.string("sku%i"), "price": 10}
+
+        lines = Line()
+        sizes = gen.randint(1, 20)
+
+        class Loop(Factory):
+            defaults = {
+                "id": gen.Count(),
+                "lines": gen.mkgen(
+                    lambda: [lines() for _ in range(next(sizes))]
+                ),
+            }
+
+        class Orders(Factory):
+            defaults = {
+                "id": gen.Count(),
+                "lines": gen.related(Line, count=(1, 20)),
+            }
+
+        self.loop = Loop()
+        self.orders = Orders()
+
+    def time_many_100_mkgen_loop(self):
+        self.loop.many(100)
+
+    def time_many_100_related(self):
+        self.orders.many(100)
+
+
+class Memo(object):
+    """Seeded batches of 1000 orders created again, with an override,
+    by a new factory, with and without a memo."""
+
+    def setup(self):
+        class Orders(Factory):
+            seed = 42
+            defaults = {
+                "status": "open",
+                "customer": gen.lazy(gen.name),
+                "amount": gen.LogNormal(4.0, 1.0),
+                "placed": gen.lazy(gen.randint, 0, 10 ** 6),
+            }
+
+        class MemoOrders(Orders):
+            memo = BatchMemo()
+
+        self.orders = Orders
+        self.memo_orders = MemoOrders
+        MemoOrders().many(1000)
+
+    def time_many_1000_again(self):
+        self.orders().many(1000, status="closed")
+
+    def time_many_1000_again_memo(self):
+        self.memo_orders().many(1000, status="closed")
+
+
+class Producer(object):
+    """A load generator sending 1000 nested objects in requests of
+    100, each taking 0.5ms of I/O, creating them inline or in the
+    background."""
+
+    def setup(self):
+        self.factory = make_nested_factory(3)
+
+    def _send(self, objects):
+        list(objects)
+        time.sleep(0.0005)
+
+    def time_inline_1000(self):
+        for _ in range(10):
+            self._send(self.factory.many(100))
+
+    def time_producer_1000(self):
+        with self.factory.producer(n=1000, queue_size=256) as objects:
+            objects = iter(objects)
+            for _ in range(10):
+                self._send(itertools.islice(objects, 100))
+
+
+async def _lookup(value):
+    # simulated I/O bound source
+    await asyncio.sleep(0.001)
+    return value
+
+
+class AsyncSources(object):
+    """Two I/O bound fields, awaited one by one or gathered."""
+
+    def setup(self):
+        self.factory = Factory(
+            id=gen.mkgen(_lookup, 1),
+            name=gen.mkgen(_lookup, "Bob"),
+        )
+
+    async def _sequential(self, n):
+        for _ in range(n):
+            obj = self.factory()
+            obj["id"] = await obj["id"]
+            obj["name"] = await obj["name"]
+
+    def time_await_one_by_one_10(self):
+        asyncio.run(self._sequential(10))
+
+    def time_amany_10(self):
+        asyncio.run(self.factory.amany(10))
+
+
+class Instantiation(object):
+
+    def setup(self):
+        class Pet(Factory):
+            defaults = {
+                "name": "Rocky",
+                "kind": gen.Cycle(["dog", "cat"]),
+            }
+
+        class Person(Factory):
+            defaults = {
+                "id": gen.Count(),
+                "name": "Bob",
+                "email": gen.lazy(gen.string, "user%i@example.com"),
+                "pet": Pet,
+                "other_pet": gen.lazy(Pet, name="Toby"),
+                "tags": gen.mkconstructor(gen.cycle, ["a", "b"]),
+            }
+
+        self.Pet = Pet
+        self.Person = Person
+        self.person = Person(name="Alice")
+
+    def time_flat_metafactory(self):
+        self.Pet()
+
+    def time_nested_metafactory(self):
+        self.Person()
+
+    def time_nested_metafactory_with_kwargs(self):
+        self.Person(name="Alice", id=1)
+
+    def time_nested_metafactory_first_call(self):
+        self.Person()()
+
+    def time_fork(self):
+        self.person.fork(id=1)
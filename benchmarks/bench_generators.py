@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+"""Value generator benchmarks.
+
+Each benchmark consumes 1000 values from a generator, so the reported
+time divided by 1000 is the cost per value.
+
+"""
+import datetime
+import itertools
+import random
+import time
+
+from arv.factory.api import gen
+
+
+VALUES = 1000
+
+
+def consume(g, n=VALUES):
+    for _ in itertools.islice(g, n):
+        pass
+
+
+class BuiltinGenerators(object):
+
+    def setup(self):
+        self.gen = gen.Gen(itertools.repeat(1))
+        self.count = gen.count()
+        self.cycle = gen.cycle(range(10))
+        self.choice = gen.choice(range(10))
+        self.randint = gen.randint(0, 1000)
+        self.string = gen.string("user%i")
+        self.template = gen.template(
+            "user-{id:06d}@{domain}", id=gen.count(), domain="example.com"
+        )
+        self.mkgen = gen.mkgen(random.random)
+        self.unique_small = gen.choice(range(VALUES))
+        self.unique_huge = gen.unique(gen.randint(0, 10 ** 12))
+        self.seeded = gen.randint(0, 1000).seed(42)
+
+    def time_gen(self):
+        consume(self.gen)
+
+    def time_count(self):
+        consume(self.count)
+
+    def time_cycle(self):
+        consume(self.cycle)
+
+    def time_choice(self):
+        consume(self.choice)
+
+    def time_randint(self):
+        consume(self.randint)
+
+    def time_string(self):
+        consume(self.string)
+
+    def time_template(self):
+        consume(self.template)
+
+    def time_mkgen(self):
+        consume(self.mkgen)
+
+    def time_unique_small_domain(self):
+        consume(gen.unique(self.unique_small))
+
+    def time_unique_huge_domain(self):
+        consume(self.unique_huge)
+
+    def time_seeded_randint(self):
+        consume(self.seeded)
+
+    def time_seek(self):
+        self.seeded.seek(10 ** 9)
+        consume(self.seeded)
+
+
+class Providers(object):
+
+    def setup(self):
+        self.first_name = gen.first_name()
+        self.name = gen.name()
+        self.email = gen.email()
+        self.address = gen.address()
+        self.company = gen.company()
+        self.sentence = gen.sentence()
+
+    def time_first_name(self):
+        consume(self.first_name)
+
+    def time_name(self):
+        consume(self.name)
+
+    def time_email(self):
+        consume(self.email)
+
+    def time_address(self):
+        consume(self.address)
+
+    def time_company(self):
+        consume(self.company)
+
+    def time_sentence(self):
+        consume(self.sentence)
+
+
+class Distributions(object):
+
+    def setup(self):
+        start = datetime.datetime(2020, 1, 1)
+        self.normal = gen.normal()
+        self.lognormal = gen.lognormal()
+        self.exponential = gen.exponential()
+        self.zipf = gen.zipf()
+        self.date = gen.date(start.date(), datetime.date(2030, 1, 1))
+        self.datetime = gen.datetime(start, datetime.datetime(2030, 1, 1))
+        self.timestamps = gen.timestamps(start, 1, 1)
+
+    def time_normal(self):
+        consume(self.normal)
+
+    def time_lognormal(self):
+        consume(self.lognormal)
+
+    def time_exponential(self):
+        consume(self.exponential)
+
+    def time_zipf(self):
+        consume(self.zipf)
+
+    def time_date(self):
+        consume(self.date)
+
+    def time_datetime(self):
+        consume(self.datetime)
+
+    def time_timestamps(self):
+        consume(self.timestamps)
+
+
+class Combinators(object):
+    """Fused combinators compared to equivalent nested ``mkgen``."""
+
+    def setup(self):
+        self.fused = gen.count().map(str).filter(None).map(len)
+        strings = gen.mkgen(next, gen.count().map(str))
+        self.nested = gen.mkgen(lambda: len(next(strings)))
+        self.zipped = gen.count().zip(gen.cycle("ab"))
+        self.batched = gen.count().batched(10)
+
+    def time_fused_map_filter_map(self):
+        consume(self.fused)
+
+    def time_nested_mkgen(self):
+        consume(self.nested)
+
+    def time_zip(self):
+        consume(self.zipped)
+
+    def time_batched(self):
+        consume(self.batched, VALUES // 10)
+
+
+class LazyConstructors(object):
+
+    def setup(self):
+        self.Count = gen.Count()
+        self.Cycle = gen.Cycle((1, 2, 3))
+        self.lazy = gen.lazy(gen.string, "user%i")
+        self.constructor = gen.mkconstructor(itertools.count, 1)
+
+    def time_Count(self):
+        self.Count()
+
+    def time_Cycle(self):
+        self.Cycle()
+
+    def time_lazy(self):
+        self.lazy()
+
+    def time_mkconstructor(self):
+        self.constructor()
+
+
+def _slow(x):
+    time.sleep(0.0005)
+    return x
+
+
+class Prefetch(object):
+    """Slow ``mkgen`` function called in series or prefetched."""
+
+    def setup(self):
+        self.serial = gen.mkgen(_slow, 1)
+        self.prefetched = gen.prefetch(gen.mkgen(_slow, 1), buffer=64,
+                                       workers=8)
+
+    def teardown(self):
+        self.prefetched.close()
+
+    def time_serial(self):
+        consume(self.serial, 100)
+
+    def time_prefetched(self):
+        consume(self.prefetched, 100)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+"""Import time benchmarks.
+
+Each benchmark starts a fresh interpreter, ``time_startup`` measures
+the interpreter alone and is the reference for the others.
+
+"""
+import os
+import subprocess
+import sys
+
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (_ROOT, env.get("PYTHONPATH")) if p
+    )
+    subprocess.check_call([sys.executable, "-c", code], env=env)
+
+
+class Import(object):
+
+    def time_startup(self):
+        _run("pass")
+
+    def time_api(self):
+        _run("import arv.factory.api")
+
+    def time_api_gen(self):
+        _run("from arv.factory.api import gen")
+
+    def time_api_factory(self):
+        _run("from arv.factory.api import Factory")
+
+    def time_api_all(self):
+        _run("from arv.factory.api import *")
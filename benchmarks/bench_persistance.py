@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""Persistence benchmarks against an in-memory backend.
+
+"""
+from arv.factory.api import gen
+from arv.factory.persistance import AdaptiveBatchSize
+
+from .backend import MemoryBackend
+from .backend import MemoryFactory
+
+
+class Persistance(object):
+
+    def setup(self):
+        backend = MemoryBackend()
+
+        class Pet(MemoryFactory):
+            defaults = {"name": gen.string("pet%i")}
+
+        class Person(MemoryFactory):
+            defaults = {
+                "name": gen.string("person%i"),
+                "age": 42,
+                "pet": Pet,
+            }
+
+        class Line(MemoryFactory):
+            defaults = {"sku": gen.string("sku%i")}
+
+        class Order(MemoryFactory):
+            defaults = {"lines": gen.related(Line, count=10)}
+
+        Pet.backend = backend
+        Person.backend = backend
+        Line.backend = backend
+        Order.backend = backend
+        self.backend = backend
+        self.pets = Pet()
+        self.persons = Person()
+        self.orders = Order()
+
+    def teardown(self):
+        self.backend.rows.clear()
+
+    def time_make(self):
+        self.pets.make()
+
+    def time_make_nested(self):
+        self.persons.make()
+
+    def time_make_many_100(self):
+        self.pets.make_many(100)
+
+    def time_make_many_100_nested(self):
+        self.persons.make_many(100)
+
+    def time_make_many_100_related(self):
+        self.orders.make_many(100)
+
+
+class Batches(object):
+    """1000 objects saved with a 50us round trip per call, one by one,
+    in batches of 100 or in batches of adaptive size."""
+
+    def setup(self):
+        backend = MemoryBackend(round_trip=50e-6)
+
+        class Pet(MemoryFactory):
+            defaults = {"name": gen.string("pet%i"), "age": 3}
+
+        class Batched(Pet):
+            batch_size = 100
+
+        class Adaptive(Pet):
+            batch_size = AdaptiveBatchSize(min=10, max=1000)
+
+        Pet.backend = backend
+        self.backend = backend
+        self.pets = Pet()
+        self.batched = Batched()
+        self.adaptive = Adaptive()
+
+    def teardown(self):
+        self.backend.rows.clear()
+
+    def time_make_many_1000(self):
+        self.pets.make_many(1000)
+
+    def time_make_many_1000_batch_100(self):
+        self.batched.make_many(1000)
+
+    def time_make_many_1000_adaptive(self):
+        self.adaptive.make_many(1000)
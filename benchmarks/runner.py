@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark discovery, timing and comparison.
+
+"""
+import datetime
+import importlib
+import inspect
+import json
+import pkgutil
+import platform
+import sys
+import timeit
+
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 1.25
+
+
+def discover(package="benchmarks", pattern=None):
+    """Return a sorted list of ``(name, class, method_name)`` tuples.
+
+    ``name`` is the fully qualified benchmark name,
+    ``module.Class.time_method``, without the package prefix. If
+    ``pattern`` is given only benchmarks whose name contains it are
+    returned.
+
+    """
+    pkg = importlib.import_module(package)
+    res = []
+    for info in pkgutil.iter_modules(pkg.__path__):
+        if not info[1].startswith("bench_"):
+            continue
+        module = importlib.import_module(package + "." + info[1])
+        for cname, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for mname in sorted(dir(cls)):
+                if not mname.startswith("time_"):
+                    continue
+                name = "%s.%s.%s" % (info[1], cname, mname)
+                if pattern is None or pattern in name:
+                    res.append((name, cls, mname))
+    res.sort(key=lambda i: i[0])
+    return res
+
+
+def time_benchmark(cls, method_name, repeat=DEFAULT_REPEAT):
+    """Time a single benchmark.
+
+    Returns the best time per call, in seconds. The number of calls
+    per measurement is calibrated so that a measurement lasts at
+    least 0.2 seconds.
+
+    """
+    instance = cls()
+    setup = getattr(instance, "setup", None)
+    if setup is not None:
+        setup()
+    timer = timeit.Timer(getattr(instance, method_name))
+    number, _ = timer.autorange()
+    timings = timer.repeat(repeat=repeat, number=number)
+    teardown = getattr(instance, "teardown", None)
+    if teardown is not None:
+        teardown()
+    return min(timings) / number
+
+
+def run(pattern=None, repeat=DEFAULT_REPEAT, stream=None):
+    """Run the benchmarks and return the results as a dictionary.
+
+    """
+    results = {}
+    for name, cls, method_name in discover(pattern=pattern):
+        results[name] = time_benchmark(cls, method_name, repeat)
+        if stream is not None:
+            print("%-70s %s" % (name, format_time(results[name])),
+                  file=stream)
+    return {
+        "meta": {
+            "date": datetime.datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Compare two result dictionaries.
+
+    Returns a list of ``(name, baseline_time, current_time, ratio)``
+    for every benchmark present in both results, sorted by ratio in
+    decreasing order, and a list with the names of the benchmarks
+    whose ratio exceeds ``threshold``.
+
+    """
+    rows = []
+    regressions = []
+    old = baseline["results"]
+    new = current["results"]
+    for name in sorted(set(old) & set(new)):
+        ratio = new[name] / old[name] if old[name] else float("inf")
+        rows.append((name, old[name], new[name], ratio))
+        if ratio > threshold:
+            regressions.append(name)
+    rows.sort(key=lambda r: r[3], reverse=True)
+    return rows, regressions
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1.0), ("ms", 1e3), ("us", 1e6)):
+        if seconds * scale >= 1.0:
+            return "%8.3f %s" % (seconds * scale, unit)
+    return "%8.3f ns" % (seconds * 1e9)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def report(rows, regressions, threshold, stream=sys.stdout):
+    for name, old, new, ratio in rows:
+        mark = "REGRESSION" if name in regressions else ""
+        print("%-70s %s %s %6.2fx %s" % (
+            name, format_time(old), format_time(new), ratio, mark
+        ), file=stream)
+    if regressions:
+        print("\n%i benchmark(s) slower than %.2fx the baseline." % (
+            len(regressions), threshold
+        ), file=stream)
@@ -30,8 +30,6 @@
 # extensions coming with Sphinx (named 'sphinx.ext.*') or your custom
 # ones.
 
-from __future__ import unicode_literals
-
 extensions = [
     'sphinx.ext.autodoc',
     'sphinx.ext.doctest',
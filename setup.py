@@ -1,5 +1,4 @@
-from __future__ import unicode_literals
-from setuptools import setup, find_packages
+from setuptools import setup, find_namespace_packages
 
 version = "0.2.10"
 
@@ -12,9 +11,6 @@ setup(
     # http://pypi.python.org/pypi?:action=list_classifiers
     classifiers=[
         "Programming Language :: Python",
-        "Programming Language :: Python :: 2.7",
-        "Programming Language :: Python :: 3.5",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
@@ -27,15 +23,14 @@ setup(
     author_email='alexis.roda.villalonga@gmail.com',
     url='https://github.com/patxoca/arv.factory',
     license='GPL',
-    packages=find_packages(exclude=['ez_setup']),
-    namespace_packages=['arv'],
+    packages=find_namespace_packages(include=['arv.*']),
     include_package_data=True,
     zip_safe=False,
     install_requires=[
         'setuptools',
         # -*- Extra requirements: -*-
-        "future",
     ],
+    python_requires=">=3.7",
     entry_points="""
     # -*- Entry points: -*-
     """,